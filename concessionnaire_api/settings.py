@@ -7,6 +7,8 @@ Configuration complète avec Django REST Framework et JWT.
 from pathlib import Path
 from datetime import timedelta
 
+from decouple import Csv, config
+
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
 
@@ -41,6 +43,14 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    # Métriques Prometheus par route (voir vehicules/metrics.py)
+    'vehicules.metrics.MetricsMiddleware',
+    # Profilage (Server-Timing), inactif sauf si VEHICULES_PROFILING (voir vehicules/profiling.py)
+    'vehicules.profiling.ProfilingMiddleware',
+    # Lectures des vues GET sur les répliques, inactif sans réplique (voir vehicules/db_router.py)
+    'vehicules.db_router.ReplicaRoutingMiddleware',
+    # 503 (Retry-After) hors de l'API lorsque le pool de hachage est saturé (voir vehicules/hashing.py)
+    'vehicules.hashing.HashingUnavailableMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -78,9 +88,118 @@ DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': BASE_DIR / 'db.sqlite3',
+        # Connexions persistantes (secondes, 0 : une connexion par requête),
+        # vérifiées avant d'être réutilisées
+        'CONN_MAX_AGE': config('VEHICULES_DB_CONN_MAX_AGE', default=60, cast=int),
+        'CONN_HEALTH_CHECKS': True,
     }
 }
 
+# Pragmas appliqués à chaque nouvelle connexion SQLite (voir vehicules/sqlite.py) :
+# 'production' (WAL, synchronous=NORMAL, cache, mmap, busy_timeout) ou 'default'
+VEHICULES_SQLITE_PROFILE = config('VEHICULES_SQLITE_PROFILE', default='production')
+VEHICULES_SQLITE_PRAGMAS = {}  # surcharges, ex. {'mmap_size': 0}
+
+# Répliques en lecture (voir vehicules/db_router.py), déclarées par variables
+# d'environnement ou dans un fichier .env, ex. pour tester avec des copies
+# SQLite (manage.py sync_replicas) :
+#   VEHICULES_DB_REPLICA_FILES=replica1.sqlite3,replica2.sqlite3
+for index, name in enumerate(config('VEHICULES_DB_REPLICA_FILES', default='', cast=Csv()), start=1):
+    DATABASES[f'replica{index}'] = {
+        **DATABASES['default'],
+        'NAME': BASE_DIR / name,
+        # Tests : les répliques désignent la base de test principale
+        'TEST': {'MIRROR': 'default'},
+    }
+
+# Lectures des vues GET sur une connexion en lecture seule au fichier principal
+# (alias readonly, routé comme une réplique sans retard)
+if config('VEHICULES_DB_READ_ONLY', default=False, cast=bool):
+    DATABASES['readonly'] = {
+        **DATABASES['default'],
+        'NAME': f"file:{DATABASES['default']['NAME']}?mode=ro",
+        'TEST': {'MIRROR': 'default'},
+    }
+
+DATABASE_ROUTERS = ['vehicules.db_router.ReplicaRouter']
+VEHICULES_DB_REPLICAS = [alias for alias in DATABASES if alias != 'default']
+# 'round_robin', 'random', 'client' ou chemin pointé d'une classe
+VEHICULES_DB_REPLICA_POLICY = config('VEHICULES_DB_REPLICA_POLICY', default='round_robin')
+# Lectures sur la base principale après une écriture du même client (secondes)
+VEHICULES_DB_STICKY_SECONDS = config('VEHICULES_DB_STICKY_SECONDS', default=5, cast=float)
+# Payloads mis en cache construits sur la base principale (aucun payload figé
+# par une réplique en retard, au prix de la charge sur la principale) ; sinon
+# un client qui vient d'écrire contourne le cache des réponses
+VEHICULES_DB_CACHE_BUILDS_ON_PRIMARY = config('VEHICULES_DB_CACHE_BUILDS_ON_PRIMARY', default=False, cast=bool)
+
+
+# Cache
+# https://docs.djangoproject.com/en/4.2/topics/cache/
+
+# Local-memory : un cache par processus, valable pour un seul processus
+# serveur (runserver, gunicorn -w 1). Avec plusieurs processus, utiliser un
+# cache partagé, ex. :
+#   'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+#   'LOCATION': '/var/tmp/concessionnaire-api-cache',
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'concessionnaire-api',
+    }
+}
+
+# Nombre de processus du serveur (gunicorn lit aussi WEB_CONCURRENCY) : au-delà
+# de 1, `manage.py check` refuse un cache local-memory (voir vehicules/checks.py)
+VEHICULES_SERVER_PROCESSES = config('WEB_CONCURRENCY', default=1, cast=int)
+
+# Cache des réponses GET de l'API vehicules (voir vehicules/cache.py)
+VEHICULES_CACHE_ALIAS = 'default'
+VEHICULES_CACHE_TIMEOUT = 300  # secondes, 0 pour désactiver
+VEHICULES_CACHE_LOCK_TIMEOUT = 10  # attente maximale pendant une reconstruction
+
+# Cache des utilisateurs authentifiés par JWT, propre à chaque processus
+# (voir vehicules/authentication.py)
+VEHICULES_AUTH_CACHE_SIZE = 1024  # nombre maximal d'utilisateurs
+VEHICULES_AUTH_CACHE_TTL = 60  # secondes, 0 pour désactiver
+
+# Hachage des mots de passe dans un pool de threads borné (voir vehicules/hashing.py)
+VEHICULES_HASHING_WORKERS = 2  # 0 : hachage sur le thread de la requête
+VEHICULES_HASHING_QUEUE_SIZE = 2  # au-delà, réponse 503 (Retry-After)
+# WORKERS + QUEUE_SIZE doit rester inférieur au nombre de threads par worker du serveur
+
+
+# Profilage des requêtes : en-tête Server-Timing et tampon des requêtes lentes
+# (voir vehicules/profiling.py)
+VEHICULES_PROFILING = False
+VEHICULES_PROFILING_SLOW_MS = 200  # seuil du tampon des requêtes lentes
+VEHICULES_PROFILING_BUFFER_SIZE = 100  # requêtes lentes conservées par processus
+
+
+# Métriques HTTP par route, au format Prometheus sur /internal/metrics/
+# (voir vehicules/metrics.py)
+VEHICULES_METRICS = True
+# Répertoire partagé par les workers (ex. '/dev/shm/vehicules-metrics' avec
+# gunicorn, vidé au démarrage) ; None : métriques du seul processus qui répond
+VEHICULES_METRICS_DIR = None
+VEHICULES_METRICS_ALLOWED_IPS = ['127.0.0.1', '::1']  # adresses ou réseaux CIDR
+
+
+# Codec JSON des réponses et des requêtes : 'auto' (orjson s'il est installé,
+# sinon json), 'orjson', 'json' ou chemin d'une classe (voir vehicules/formats.py)
+VEHICULES_JSON_CODEC = 'auto'
+
+
+# Password hashing
+# https://docs.djangoproject.com/en/4.2/topics/auth/passwords/
+
+PASSWORD_HASHERS = [
+    'vehicules.hashing.PooledPBKDF2PasswordHasher',
+    'django.contrib.auth.hashers.PBKDF2SHA1PasswordHasher',
+    'django.contrib.auth.hashers.Argon2PasswordHasher',
+    'django.contrib.auth.hashers.BCryptSHA256PasswordHasher',
+    'django.contrib.auth.hashers.ScryptPasswordHasher',
+]
+
 
 # Password validation
 # https://docs.djangoproject.com/en/4.2/ref/settings/#auth-password-validators
@@ -127,19 +246,26 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 # Django REST Framework configuration
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': (
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        # JWTAuthentication avec cache des utilisateurs (voir vehicules/authentication.py)
+        'vehicules.authentication.CachedJWTAuthentication',
     ),
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.IsAuthenticated',
     ],
-    'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
+    'DEFAULT_PAGINATION_CLASS': 'vehicules.pagination.KeysetCursorPagination',
     'PAGE_SIZE': 20,
+    # JSON encodé par orjson lorsqu'il est installé, MessagePack sur demande
+    # (Accept / Content-Type: application/msgpack) ; voir vehicules/formats.py
     'DEFAULT_RENDERER_CLASSES': [
-        'rest_framework.renderers.JSONRenderer',
+        'vehicules.renderers.FastJSONRenderer',
+        'vehicules.renderers.MessagePackRenderer',
     ],
     'DEFAULT_PARSER_CLASSES': [
-        'rest_framework.parsers.JSONParser',
+        'vehicules.parsers.FastJSONParser',
+        'vehicules.parsers.MessagePackParser',
     ],
+    # 503 (Retry-After) lorsque le pool de hachage est saturé (voir vehicules/hashing.py)
+    'EXCEPTION_HANDLER': 'vehicules.hashing.exception_handler',
     # Configuration pour la documentation OpenAPI
     'DEFAULT_SCHEMA_CLASS': 'drf_spectacular.openapi.AutoSchema',
 }
@@ -153,9 +279,22 @@ SIMPLE_JWT = {
     'ALGORITHM': 'HS256',
     'SIGNING_KEY': SECRET_KEY,
     'AUTH_HEADER_TYPES': ('Bearer',),
+    # Rotation avec liste noire des tokens révoqués (voir vehicules/blacklist.py)
+    'TOKEN_REFRESH_SERIALIZER': 'vehicules.blacklist.TokenRefreshSerializer',
 }
 
+# Liste noire des tokens JWT (voir vehicules/blacklist.py)
+VEHICULES_BLACKLIST_SYNC_INTERVAL = 1  # secondes avant qu'un processus voie une révocation faite ailleurs
+VEHICULES_BLACKLIST_REBUILD_INTERVAL = 600  # reconstruction complète du filtre de Bloom
+VEHICULES_BLACKLIST_PRUNE_INTERVAL = 3600  # purge des entrées expirées, 0 pour désactiver
+VEHICULES_BLACKLIST_CHECK_ACCESS = False  # vérifier aussi les tokens d'accès
+
 # Configuration drf-spectacular pour la documentation OpenAPI
+# Schéma précalculé servi par /api/schema/ : artefacts JSON et YAML relus au
+# démarrage et régénérés si le code change (voir vehicules/openapi.py) ;
+# None : schéma généré par chaque processus et conservé en mémoire
+VEHICULES_SCHEMA_DIR = BASE_DIR / 'schema'
+
 SPECTACULAR_SETTINGS = {
     'TITLE': 'API Concessionnaire & Véhicules',
     'DESCRIPTION': 'API REST Django pour gérer des concessionnaires et leurs véhicules. Documentation complète avec authentification JWT.',
@@ -163,6 +302,8 @@ SPECTACULAR_SETTINGS = {
     'SERVE_INCLUDE_SCHEMA': False,
     'COMPONENT_SPLIT_REQUEST': True,
     'SCHEMA_PATH_PREFIX': '/api/',
+    # Charge la documentation des vues (vehicules/docs.py) avant chaque génération
+    'DEFAULT_GENERATOR_CLASS': 'vehicules.docs.SchemaGenerator',
     'TAGS': [
         {'name': 'Authentification', 'description': 'Endpoints pour la gestion des utilisateurs et tokens JWT'},
         {'name': 'Concessionnaires', 'description': 'Gestion des concessionnaires'},
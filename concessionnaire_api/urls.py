@@ -10,24 +10,30 @@ from rest_framework_simplejwt.views import (
     TokenObtainPairView,
     TokenRefreshView,
 )
-from drf_spectacular.views import (
-    SpectacularAPIView,
-    SpectacularSwaggerView,
-    SpectacularRedocView,
-)
-from vehicules.user_views import UserCreateView
+from vehicules.metrics import metrics_view
+from vehicules.openapi import SchemaView, lazy_view
+from vehicules.user_views import TokenRevokeView, UserCreateView
+from vehicules.views import SlowRequestsView
 
 urlpatterns = [
     path('admin/', admin.site.urls),
-    # Documentation OpenAPI (style FastAPI)
-    path('api/schema/', SpectacularAPIView.as_view(), name='schema'),
-    path('api/docs/', SpectacularSwaggerView.as_view(url_name='schema'), name='swagger-ui'),
-    path('api/redoc/', SpectacularRedocView.as_view(url_name='schema'), name='redoc'),
+    # Documentation OpenAPI (style FastAPI) ; schéma précalculé (voir vehicules/openapi.py)
+    path('api/schema/', SchemaView.as_view(), name='schema'),
+    # Vues de drf-spectacular importées à la première visite (démarrage plus rapide)
+    path('api/docs/', lazy_view('drf_spectacular.views.SpectacularSwaggerView', url_name='schema'), name='swagger-ui'),
+    path('api/redoc/', lazy_view('drf_spectacular.views.SpectacularRedocView', url_name='schema'), name='redoc'),
     # Authentification JWT
     path('api/users/', UserCreateView.as_view(), name='user-create'),
     path('api/token/', TokenObtainPairView.as_view(), name='token_obtain_pair'),
     path('api/refresh_token/', TokenRefreshView.as_view(), name='token_refresh'),
+    path('api/token/revoke/', TokenRevokeView.as_view(), name='token_revoke'),
+    # Profilage (staff)
+    path('api/profiling/slow-requests/', SlowRequestsView.as_view(), name='profiling-slow-requests'),
+    # Métriques Prometheus (réseau interne uniquement)
+    path('internal/metrics/', metrics_view, name='metrics'),
     # API endpoints
+    # Variantes asynchrones des GET, pour un déploiement ASGI (voir vehicules/async_views.py)
+    path('api/async/', include('vehicules.async_urls')),
     path('api/', include('vehicules.urls')),
 ]
 
@@ -3,6 +3,7 @@ Configuration de l'interface d'administration Django.
 """
 
 from django.contrib import admin
+from . import search
 from .models import Concessionnaire, Vehicule
 
 
@@ -19,5 +20,15 @@ class VehiculeAdmin(admin.ModelAdmin):
     """Administration des véhicules."""
     list_display = ['id', 'marque', 'type', 'chevaux', 'prix_ht', 'concessionnaire']
     list_filter = ['type', 'concessionnaire']
-    search_fields = ['marque', 'concessionnaire__nom']
-
+    search_fields = ['marque', 'reference', 'concessionnaire__nom']
+    
+    def get_search_results(self, request, queryset, search_term):
+        """
+        Recherche servie par l'index plein texte (voir search.py) plutôt que
+        par des icontains sur toute la table : chaque mot est cherché comme
+        préfixe dans la marque, la référence et le nom du concessionnaire.
+        """
+        terms = search.split_terms(search_term)
+        if not terms or not search.is_enabled():
+            return super().get_search_results(request, queryset, search_term)
+        return queryset.filter(pk__in=search.matching_ids(terms)), False
@@ -1,7 +1,22 @@
 from django.apps import AppConfig
+from django.db.backends.signals import connection_created
+from django.db.models.signals import post_migrate
 
 
 class VehiculesConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'vehicules'
 
+    def ready(self):
+        # Connexion des signaux d'invalidation du cache
+        from . import signals  # noqa: F401
+        # Invalidation du cache des utilisateurs de l'authentification JWT
+        from . import authentication  # noqa: F401
+        # Vérifications système (cache partagé entre processus)
+        from . import checks  # noqa: F401
+        # Index de recherche plein texte (table FTS5 et triggers SQLite)
+        from .search import install_after_migrate
+        post_migrate.connect(install_after_migrate, sender=self)
+        # Pragmas SQLite du profil configuré, sur chaque nouvelle connexion
+        from .sqlite import configure_connection
+        connection_created.connect(configure_connection, dispatch_uid='vehicules_sqlite_profile')
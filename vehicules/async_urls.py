@@ -0,0 +1,30 @@
+"""
+URLs des variantes asynchrones (ASGI) des endpoints GET.
+
+Montées sous /api/async/ : mêmes chemins et mêmes réponses que vehicules/urls.py.
+"""
+
+from django.urls import path
+from .async_views import (
+    AsyncConcessionnaireListView,
+    AsyncConcessionnaireDetailView,
+    AsyncConcessionnaireVehiculesListView,
+    AsyncConcessionnaireVehiculeDetailView,
+)
+
+app_name = 'vehicules_async'
+
+urlpatterns = [
+    path('concessionnaires/', AsyncConcessionnaireListView.as_view(), name='concessionnaire-list'),
+    path('concessionnaires/<int:id>/', AsyncConcessionnaireDetailView.as_view(), name='concessionnaire-detail'),
+    path(
+        'concessionnaires/<int:id>/vehicules/',
+        AsyncConcessionnaireVehiculesListView.as_view(),
+        name='concessionnaire-vehicules-list'
+    ),
+    path(
+        'concessionnaires/<int:id>/vehicules/<int:vehicule_id>/',
+        AsyncConcessionnaireVehiculeDetailView.as_view(),
+        name='concessionnaire-vehicule-detail'
+    ),
+]
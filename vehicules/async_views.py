@@ -0,0 +1,170 @@
+"""
+Variantes asynchrones (ASGI) des endpoints GET de l'API.
+
+Sous ASGI, chaque APIView synchrone de views.py occupe un thread pendant toute
+la requête (sync_to_async). Les vues ci-dessous sont des vues Django
+asynchrones : authentification JWT (AsyncJWTAuthentication) et lectures via
+l'ORM asynchrone (``aget``, ``async for``), sans thread réservé entre deux
+requêtes SQL. Un seul processus peut ainsi garder ouvertes des milliers de
+connexions de clients lents.
+
+DRF 3.14 ne gère pas les vues asynchrones : AsyncAPIView reprend le minimum
+nécessaire (authentification, permissions IsAuthenticated, format des erreurs,
+rendu JSON). Les réponses sont identiques à celles des vues synchrones, sans
+cache des réponses ni requêtes conditionnelles (ETag), dont l'implémentation
+est synchrone.
+
+Routes : /api/async/... (voir async_urls.py).
+"""
+
+from django.core.exceptions import ObjectDoesNotExist
+from django.http import HttpResponse
+from django.views import View
+from rest_framework import exceptions, status
+from rest_framework.request import Request
+
+from . import profiling
+from .authentication import AsyncJWTAuthentication
+from .fast_serializers import (
+    ConcessionnaireValuesSerializer,
+    VehiculeValuesSerializer,
+    VehiculeDetailValuesSerializer,
+    requested_fields
+)
+from .filters import VehiculeFilterSerializer
+from .models import Concessionnaire, Vehicule
+from .pagination import KeysetCursorPagination
+from .renderers import FastJSONRenderer
+
+
+class AsyncAPIView(View):
+    """
+    Vue asynchrone authentifiée par JWT, au format de réponse de DRF.
+
+    Les sous-classes définissent des méthodes ``async def get(...)`` qui
+    retournent des données sérialisables (dict ou liste).
+    """
+    authentication_class = AsyncJWTAuthentication
+    renderer = FastJSONRenderer()
+    http_method_names = ['get', 'head']
+
+    async def dispatch(self, request, *args, **kwargs):
+        # Request de DRF : query_params, build_absolute_uri... pour la pagination
+        drf_request = Request(request)
+        try:
+            await self.authenticate(drf_request)
+            handler = getattr(self, request.method.lower(), None)
+            if request.method.lower() not in self.http_method_names or handler is None:
+                raise exceptions.MethodNotAllowed(request.method)
+            data = await handler(drf_request, *args, **kwargs)
+        except exceptions.APIException as exc:
+            return self.error_response(exc)
+        return self.render(data, status.HTTP_200_OK)
+
+    async def authenticate(self, request):
+        authenticator = self.authentication_class()
+        result = await authenticator.aauthenticate(request)
+        if result is None:
+            raise exceptions.NotAuthenticated()
+        request.user, request.auth = result
+
+    def render(self, data, status_code, headers=None):
+        with profiling.phase('render'):
+            content = self.renderer.render(data)
+        response = HttpResponse(content, status=status_code, content_type='application/json')
+        for name, value in (headers or {}).items():
+            response[name] = value
+        return response
+
+    def error_response(self, exc):
+        detail = exc.detail
+        data = detail if isinstance(detail, (list, dict)) else {'detail': detail}
+        headers = {}
+        if isinstance(exc, (exceptions.NotAuthenticated, exceptions.AuthenticationFailed)):
+            # Même en-tête que DRF : 401 et non 403 pour un client non authentifié
+            headers['WWW-Authenticate'] = self.authentication_class().authenticate_header(None)
+        return self.render(data, exc.status_code, headers)
+
+
+async def aget_or_404(queryset, **kwargs):
+    try:
+        return await queryset.aget(**kwargs)
+    except ObjectDoesNotExist:
+        raise exceptions.NotFound()
+
+
+class AsyncConcessionnaireListView(AsyncAPIView):
+    """
+    Liste des concessionnaires (asynchrone).
+
+    GET /api/async/concessionnaires/
+    """
+    pagination_class = KeysetCursorPagination
+
+    async def get(self, request):
+        concessionnaires = ConcessionnaireValuesSerializer.values(Concessionnaire.objects.all())
+        paginator = self.pagination_class()
+        page = await paginator.apaginate_queryset(concessionnaires, request, view=self)
+        serializer = ConcessionnaireValuesSerializer(page, many=True)
+        return paginator.get_paginated_response(serializer.data).data
+
+
+class AsyncConcessionnaireDetailView(AsyncAPIView):
+    """
+    Détails d'un concessionnaire (asynchrone).
+
+    GET /api/async/concessionnaires/<id>/
+    """
+
+    async def get(self, request, id):
+        concessionnaire = await aget_or_404(
+            ConcessionnaireValuesSerializer.values(Concessionnaire.objects.all()),
+            pk=id
+        )
+        return ConcessionnaireValuesSerializer(concessionnaire).data
+
+
+class AsyncConcessionnaireVehiculesListView(AsyncAPIView):
+    """
+    Liste filtrée des véhicules d'un concessionnaire (asynchrone).
+
+    GET /api/async/concessionnaires/<id>/vehicules/
+    """
+    pagination_class = KeysetCursorPagination
+
+    async def get(self, request, id):
+        filters = VehiculeFilterSerializer(data=request.query_params)
+        filters.is_valid(raise_exception=True)
+        # Lu par la pagination ; None : tri par défaut du modèle
+        self.ordering = filters.get_ordering()
+        fields = requested_fields(request, VehiculeValuesSerializer)
+
+        if not await Concessionnaire.objects.filter(pk=id).aexists():
+            raise exceptions.NotFound()
+        queryset = filters.filter_queryset(Vehicule.objects.filter(concessionnaire_id=id))
+        paginator = self.pagination_class()
+        vehicules = VehiculeValuesSerializer.values(
+            queryset,
+            extra=paginator.get_ordering_fields(request, queryset, self),
+            fields=fields
+        )
+        page = await paginator.apaginate_queryset(vehicules, request, view=self)
+        serializer = VehiculeValuesSerializer(page, many=True, fields=fields)
+        return paginator.get_paginated_response(serializer.data).data
+
+
+class AsyncConcessionnaireVehiculeDetailView(AsyncAPIView):
+    """
+    Détails d'un véhicule d'un concessionnaire (asynchrone).
+
+    GET /api/async/concessionnaires/<id>/vehicules/<vehicule_id>/
+    """
+
+    async def get(self, request, id, vehicule_id):
+        fields = requested_fields(request, VehiculeDetailValuesSerializer)
+        vehicule = await aget_or_404(
+            VehiculeDetailValuesSerializer.values(Vehicule.objects.all(), fields=fields),
+            pk=vehicule_id,
+            concessionnaire_id=id
+        )
+        return VehiculeDetailValuesSerializer(vehicule, fields=fields).data
@@ -0,0 +1,197 @@
+"""
+Authentification JWT avec cache des utilisateurs par processus.
+
+JWTAuthentication de simplejwt relit l'utilisateur en base à chaque requête,
+alors que le token d'accès prouve déjà son identité. CachedJWTAuthentication
+conserve les utilisateurs résolus dans un cache borné (LRU) avec durée de vie,
+indexé par l'identifiant contenu dans le token : une requête authentifiée
+n'exécute plus de requête SQL pour l'utilisateur tant qu'il est en cache.
+
+Avec ``VEHICULES_BLACKLIST_CHECK_ACCESS``, les tokens d'accès sont aussi
+comparés à la liste noire (voir blacklist.py ; sans requête SQL dans la quasi
+totalité des cas).
+
+Le cache est propre à chaque processus. L'enregistrement ou la suppression
+d'un utilisateur (y compris sa désactivation) l'en retire immédiatement dans
+le processus courant (signaux post_save / post_delete) ; dans les autres
+processus, et pour les écritures qui n'émettent pas de signaux
+(QuerySet.update), la durée de vie ``VEHICULES_AUTH_CACHE_TTL`` borne le délai
+de prise en compte.
+"""
+
+import copy
+import threading
+import time
+from collections import OrderedDict
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.settings import api_settings as jwt_settings
+from rest_framework_simplejwt.utils import get_md5_hash_password
+
+from . import blacklist, profiling
+
+
+class UserCache:
+    """Cache LRU borné, avec durée de vie, partagé par les threads d'un processus."""
+
+    def __init__(self):
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def get_max_size():
+        return getattr(settings, 'VEHICULES_AUTH_CACHE_SIZE', 1024)
+
+    @staticmethod
+    def get_ttl():
+        """Durée de vie des entrées en secondes ; 0 désactive le cache."""
+        return getattr(settings, 'VEHICULES_AUTH_CACHE_TTL', 60)
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires, user = entry
+            if expires <= time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return user
+
+    def set(self, key, user):
+        ttl = self.get_ttl()
+        if not ttl:
+            return
+        with self._lock:
+            self._entries[key] = (time.monotonic() + ttl, user)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.get_max_size():
+                self._entries.popitem(last=False)
+
+    def delete(self, key):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+
+user_cache = UserCache()
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    """
+    JWTAuthentication avec cache des utilisateurs (voir UserCache).
+
+    Seuls les utilisateurs actifs sont mis en cache. Chaque requête reçoit une
+    copie de l'utilisateur en cache : les caches de permissions que Django
+    pose sur l'instance (``_perm_cache``...) ne survivent pas à la requête.
+    """
+
+    def authenticate(self, request):
+        with profiling.phase('auth'):
+            return super().authenticate(request)
+
+    def get_validated_token(self, raw_token):
+        validated_token = super().get_validated_token(raw_token)
+        if blacklist.check_access_tokens() and blacklist.is_revoked(
+            validated_token.get(jwt_settings.JTI_CLAIM)
+        ):
+            raise InvalidToken(_('Token is blacklisted'))
+        return validated_token
+
+    def get_user(self, validated_token):
+        key = self._cache_key(validated_token)
+        if key is None:
+            # Laisse simplejwt lever l'erreur habituelle
+            return super().get_user(validated_token)
+
+        user = user_cache.get(key)
+        if user is None:
+            user = super().get_user(validated_token)
+            user_cache.set(key, user)
+        else:
+            self._check_password_unchanged(user, validated_token)
+        return copy.copy(user)
+
+    @staticmethod
+    def _cache_key(validated_token):
+        user_id = validated_token.get(jwt_settings.USER_ID_CLAIM)
+        # Le token contient l'identifiant sérialisé en JSON : clé normalisée en texte
+        return None if user_id is None else str(user_id)
+
+    @staticmethod
+    def _check_password_unchanged(user, validated_token):
+        if jwt_settings.CHECK_REVOKE_TOKEN and validated_token.get(
+            jwt_settings.REVOKE_TOKEN_CLAIM
+        ) != get_md5_hash_password(user.password):
+            raise AuthenticationFailed(
+                _("The user's password has been changed."), code='password_changed'
+            )
+
+
+class AsyncJWTAuthentication(CachedJWTAuthentication):
+    """
+    Variante asynchrone de CachedJWTAuthentication pour les vues de
+    async_views.py : l'utilisateur est lu avec l'ORM asynchrone (``aget``)
+    lorsqu'il n'est pas en cache.
+    """
+
+    async def aauthenticate(self, request):
+        """Retourne (utilisateur, token validé), ou None sans en-tête d'authentification."""
+        with profiling.phase('auth'):
+            return await self._aauthenticate(request)
+
+    async def _aauthenticate(self, request):
+        header = self.get_header(request)
+        if header is None:
+            return None
+        raw_token = self.get_raw_token(header)
+        if raw_token is None:
+            return None
+        if blacklist.check_access_tokens():
+            # La liste noire peut interroger la base
+            validated_token = await sync_to_async(self.get_validated_token)(raw_token)
+        else:
+            validated_token = self.get_validated_token(raw_token)
+        return await self.aget_user(validated_token), validated_token
+
+    async def aget_user(self, validated_token):
+        key = self._cache_key(validated_token)
+        if key is None:
+            raise InvalidToken(_('Token contained no recognizable user identification'))
+
+        user = user_cache.get(key)
+        if user is not None:
+            self._check_password_unchanged(user, validated_token)
+            return copy.copy(user)
+
+        try:
+            user = await self.user_model.objects.aget(
+                **{jwt_settings.USER_ID_FIELD: validated_token[jwt_settings.USER_ID_CLAIM]}
+            )
+        except self.user_model.DoesNotExist:
+            raise AuthenticationFailed(_('User not found'), code='user_not_found')
+        if not user.is_active:
+            raise AuthenticationFailed(_('User is inactive'), code='user_inactive')
+        self._check_password_unchanged(user, validated_token)
+        user_cache.set(key, user)
+        return copy.copy(user)
+
+
+@receiver(post_save, sender=settings.AUTH_USER_MODEL)
+@receiver(post_delete, sender=settings.AUTH_USER_MODEL)
+def invalidate_user_cache(sender, instance, **kwargs):
+    """Modification, désactivation ou suppression d'un utilisateur."""
+    user_cache.delete(str(getattr(instance, jwt_settings.USER_ID_FIELD)))
@@ -0,0 +1,281 @@
+"""
+Benchmark des endpoints de l'API (client de test, dans le processus).
+
+Chaque route de vehicules/urls.py et chaque endpoint JWT est rejoué par un
+ou plusieurs scénarios ; pour chacun sont mesurés la latence (p50, p95, p99),
+le débit (requêtes successives) et le nombre de requêtes SQL par requête.
+
+Les résultats sont enregistrés en JSON et comparés à une référence
+(``benchmarks/baseline.json``) : une hausse du nombre de requêtes SQL, ou de
+la latence médiane (p50, plus stable que le p95) au-delà de la tolérance, est
+signalée comme une régression. Les latences
+dépendent de la machine : la référence doit être produite sur la même machine
+(ou le même type de runner CI) que les mesures comparées.
+
+Utilisé par la commande ``manage.py bench_api``.
+"""
+
+import json
+import platform
+import sqlite3
+import statistics
+import time
+from dataclasses import dataclass
+from typing import Callable, Optional
+
+import django
+from django.contrib.auth.models import Permission, User
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken, RefreshToken
+
+from . import urls as vehicules_urls
+from .models import Vehicule
+
+PASSWORD = 'benchmark-password-1'
+# Les endpoints qui hachent un mot de passe (PBKDF2) sont rejoués moins souvent
+SLOW_RATIO = 10
+WARMUP = 5
+# En dessous de cet écart (ms), une hausse du p50 est considérée comme du bruit
+NOISE_FLOOR_MS = 1.0
+# Ids par appel du scénario POST de lecture groupée
+BATCH_SIZE = 1000
+
+
+@dataclass
+class Scenario:
+    """Un endpoint et ses paramètres ; ``prepare(i)`` retourne (url, corps) de la i-ème requête."""
+    name: str
+    method: str
+    prepare: Callable[[int], tuple]
+    route: Optional[str] = None
+    slow: bool = False
+    # Appelé avec chaque réponse (ex. token suivant d'une rotation)
+    on_response: Optional[Callable] = None
+
+
+def build_scenarios(concessionnaire_id, vehicule_ids, user):
+    """
+    Scénarios couvrant chaque route de vehicules/urls.py et les endpoints JWT.
+
+    ``vehicule_ids`` : véhicules du concessionnaire (le premier pour la vue
+    détail, jusqu'à BATCH_SIZE pour la lecture groupée).
+    """
+    def route(name, **kwargs):
+        return reverse(f'{vehicules_urls.app_name}:{name}', kwargs=kwargs)
+
+    def get(name, query='', **kwargs):
+        url = route(name, **kwargs) + query
+        return lambda i: (url, None)
+
+    conc = {'id': concessionnaire_id}
+    vehicule_id = vehicule_ids[0]
+    batch_url = route('vehicule-batch')
+    batch_ids = vehicule_ids[:BATCH_SIZE]
+    bulk_url = route('concessionnaire-vehicules-bulk', **conc)
+    bulk_items = [
+        {'type': 'auto', 'marque': 'Benchmark', 'chevaux': 100 + i, 'prix_ht': 15000.0 + i}
+        for i in range(10)
+    ]
+    # Rotation : chaque réponse fournit le token de rafraîchissement suivant
+    refresh_tokens = [str(RefreshToken.for_user(user))]
+
+    scenarios = [
+        Scenario('concessionnaires', 'GET', get('concessionnaire-list'), 'concessionnaire-list'),
+        Scenario('concessionnaire', 'GET', get('concessionnaire-detail', **conc), 'concessionnaire-detail'),
+        Scenario('stats', 'GET', get('concessionnaire-stats-list'), 'concessionnaire-stats-list'),
+        Scenario('stats concessionnaire', 'GET', get('concessionnaire-stats', **conc), 'concessionnaire-stats'),
+        Scenario('vehicules', 'GET', get('concessionnaire-vehicules-list', **conc), 'concessionnaire-vehicules-list'),
+        Scenario(
+            'vehicules filtrés',
+            'GET',
+            get('concessionnaire-vehicules-list', '?type=auto&prix_ht_max=20000&ordering=-prix_ht', **conc),
+            'concessionnaire-vehicules-list'
+        ),
+        Scenario(
+            'vehicules champs partiels',
+            'GET',
+            get('concessionnaire-vehicules-list', '?fields=id,marque,prix_ht', **conc),
+            'concessionnaire-vehicules-list'
+        ),
+        Scenario(
+            'vehicule',
+            'GET',
+            get('concessionnaire-vehicule-detail', vehicule_id=vehicule_id, **conc),
+            'concessionnaire-vehicule-detail'
+        ),
+        Scenario('recherche', 'GET', get('vehicule-search', '?q=peu'), 'vehicule-search'),
+        Scenario(
+            'lecture groupée (100)',
+            'GET',
+            get('vehicule-batch', '?ids=' + ','.join(str(pk) for pk in batch_ids[:100])),
+            'vehicule-batch'
+        ),
+        Scenario(
+            f'lecture groupée ({len(batch_ids)})',
+            'POST',
+            lambda i: (batch_url, {'ids': batch_ids}),
+            'vehicule-batch'
+        ),
+        Scenario(
+            'creation en masse (10)',
+            'POST',
+            lambda i: (bulk_url, bulk_items),
+            'concessionnaire-vehicules-bulk'
+        ),
+        Scenario(
+            'token',
+            'POST',
+            lambda i: ('/api/token/', {'username': user.username, 'password': PASSWORD}),
+            slow=True
+        ),
+        Scenario(
+            'refresh_token',
+            'POST',
+            lambda i: ('/api/refresh_token/', {'refresh': refresh_tokens[-1]}),
+            on_response=lambda response: refresh_tokens.append(response.data['refresh'])
+        ),
+        Scenario(
+            'token/revoke',
+            'POST',
+            lambda i: ('/api/token/revoke/', {'refresh': str(RefreshToken.for_user(user))})
+        ),
+        Scenario(
+            'users',
+            'POST',
+            lambda i: ('/api/users/', {
+                'username': f'benchmark-{i}',
+                'email': f'benchmark-{i}@example.com',
+                'password': PASSWORD,
+            }),
+            slow=True
+        ),
+    ]
+    return scenarios
+
+
+def missing_routes(scenarios):
+    """Routes de vehicules/urls.py sans scénario."""
+    covered = {scenario.route for scenario in scenarios}
+    return [pattern.name for pattern in vehicules_urls.urlpatterns if pattern.name not in covered]
+
+
+def create_user():
+    """Utilisateur du benchmark, autorisé à créer des véhicules en masse."""
+    user = User.objects.create_user(username='benchmark', password=PASSWORD)
+    user.user_permissions.add(Permission.objects.get(
+        codename='add_vehicule', content_type__app_label=Vehicule._meta.app_label
+    ))
+    return user
+
+
+def run(scenarios, user, requests, stdout=None):
+    """Rejoue chaque scénario ``requests`` fois ; retourne les mesures par scénario."""
+    client = APIClient()
+    client.credentials(HTTP_AUTHORIZATION=f'Bearer {AccessToken.for_user(user)}')
+    results = {}
+    for scenario in scenarios:
+        count = max(5, requests // SLOW_RATIO) if scenario.slow else requests
+        name = f'{scenario.method} {scenario.name}'
+        # Requêtes de chauffe non mesurées (cache des utilisateurs, connexions, imports)
+        for i in range(-1 if scenario.slow else -WARMUP, 0):
+            _send(client, scenario, *scenario.prepare(i))
+        timings, queries = [], []
+        for i in range(count):
+            # Préparation (ex. génération d'un token) hors de la mesure
+            url, data = scenario.prepare(i)
+            with CaptureQueriesContext(connection) as context:
+                start = time.perf_counter()
+                _send(client, scenario, url, data)
+                timings.append(time.perf_counter() - start)
+            queries.append(len(context.captured_queries))
+        results[name] = summarize(timings, queries)
+        if stdout is not None:
+            stdout.write(format_result(name, results[name]))
+    return results
+
+
+def _send(client, scenario, url, data):
+    if scenario.method == 'GET':
+        response = client.get(url)
+    else:
+        response = client.post(url, data, format='json')
+    if response.status_code >= 400:
+        raise RuntimeError(f'{scenario.method} {url} : statut {response.status_code}')
+    if scenario.on_response is not None:
+        scenario.on_response(response)
+
+
+def summarize(timings, queries):
+    timings = sorted(timings)
+    return {
+        'requests': len(timings),
+        'p50_ms': round(statistics.median(timings) * 1000, 3),
+        'p95_ms': round(_percentile(timings, 95) * 1000, 3),
+        'p99_ms': round(_percentile(timings, 99) * 1000, 3),
+        'rps': round(len(timings) / sum(timings), 1),
+        'queries': statistics.median_low(queries),
+    }
+
+
+def _percentile(sorted_values, percent):
+    return sorted_values[min(len(sorted_values) - 1, int(len(sorted_values) * percent / 100))]
+
+
+def format_result(name, result):
+    return (
+        f"{name:32} p50={result['p50_ms']:8.2f} ms p95={result['p95_ms']:8.2f} ms "
+        f"p99={result['p99_ms']:8.2f} ms {result['rps']:8.1f} req/s  {result['queries']} requêtes SQL"
+    )
+
+
+def metadata(**parameters):
+    """Contexte des mesures, enregistré avec les résultats."""
+    return {
+        'date': timezone.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'django': django.get_version(),
+        'sqlite': sqlite3.sqlite_version,
+        'machine': platform.machine(),
+        **parameters,
+    }
+
+
+def save(path, meta, results):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(
+        json.dumps({'meta': meta, 'results': results}, indent=2, ensure_ascii=False, sort_keys=True) + '\n',
+        encoding='utf-8'
+    )
+
+
+def load(path):
+    return json.loads(path.read_text(encoding='utf-8'))
+
+
+def compare(results, baseline, tolerance):
+    """
+    Compare les résultats à la référence ; retourne (lignes du rapport, régressions).
+
+    Régression : plus de requêtes SQL qu'en référence, ou p50 supérieur de
+    plus de ``tolerance`` (fraction) et de plus de NOISE_FLOOR_MS.
+    """
+    lines, regressions = [], []
+    for name, reference in sorted(baseline['results'].items()):
+        current = results.get(name)
+        if current is None:
+            lines.append(f'{name:32} absent des résultats')
+            continue
+        delta = (current['p50_ms'] - reference['p50_ms']) / reference['p50_ms'] if reference['p50_ms'] else 0
+        lines.append(
+            f"{name:32} p50 {reference['p50_ms']:8.2f} → {current['p50_ms']:8.2f} ms ({delta:+.0%})  "
+            f"requêtes SQL {reference['queries']} → {current['queries']}"
+        )
+        if current['queries'] > reference['queries']:
+            regressions.append(f"{name} : {current['queries']} requêtes SQL au lieu de {reference['queries']}")
+        if delta > tolerance and current['p50_ms'] - reference['p50_ms'] > NOISE_FLOOR_MS:
+            regressions.append(f"{name} : p50 de {current['p50_ms']:.2f} ms au lieu de {reference['p50_ms']:.2f} ms")
+    return lines, regressions
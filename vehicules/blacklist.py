@@ -0,0 +1,237 @@
+"""
+Liste noire des tokens JWT (rotation des tokens de rafraîchissement et
+révocation explicite).
+
+Les tokens révoqués sont stockés dans la table TokenRevoque (clé : ``jti``).
+Chaque processus garde devant cette table un filtre de Bloom, reconstruit
+depuis la base et complété par synchronisation incrémentale (au plus une
+requête par ``VEHICULES_BLACKLIST_SYNC_INTERVAL``) : un token absent du
+filtre n'est certainement pas révoqué et est accepté sans requête SQL ; seuls
+les tokens présents dans le filtre (révoqués ou faux positifs, ~0,1 %) sont
+vérifiés en base.
+
+Lors d'une rotation (POST /api/refresh_token/), l'ancien token de
+rafraîchissement est révoqué par un INSERT sur la colonne unique ``jti`` :
+c'est cet INSERT, et non le filtre, qui garantit qu'un même token ne peut être
+utilisé qu'une fois, y compris en cas de rejeu concurrent sur un autre
+processus. Une rotation coûte ainsi une seule écriture.
+
+Les entrées expirées sont purgées en arrière-plan par un thread de chaque
+processus (``VEHICULES_BLACKLIST_PRUNE_INTERVAL``) ou par la commande
+``manage.py prune_token_blacklist``.
+"""
+
+import hashlib
+import logging
+import math
+import threading
+import time
+
+from django.conf import settings
+from django.db import IntegrityError, connection, transaction
+from django.db.models import Max
+from django.utils import timezone
+from django.utils.translation import gettext_lazy as _
+from rest_framework import serializers
+from rest_framework_simplejwt.exceptions import InvalidToken, TokenError
+from rest_framework_simplejwt.serializers import TokenRefreshSerializer as BaseTokenRefreshSerializer
+from rest_framework_simplejwt.settings import api_settings as jwt_settings
+from rest_framework_simplejwt.tokens import RefreshToken
+from rest_framework_simplejwt.utils import datetime_from_epoch
+
+from .models import TokenRevoque
+
+logger = logging.getLogger(__name__)
+
+# Capacité minimale du filtre : évite les reconstructions à répétition au démarrage
+MIN_CAPACITY = 10000
+ERROR_RATE = 0.001
+
+
+def get_sync_interval():
+    """Délai maximal (secondes) avant qu'un processus voie une révocation faite par un autre."""
+    return getattr(settings, 'VEHICULES_BLACKLIST_SYNC_INTERVAL', 1)
+
+
+def get_rebuild_interval():
+    return getattr(settings, 'VEHICULES_BLACKLIST_REBUILD_INTERVAL', 600)
+
+
+def get_prune_interval():
+    """Intervalle (secondes) de la purge en arrière-plan ; 0 la désactive."""
+    return getattr(settings, 'VEHICULES_BLACKLIST_PRUNE_INTERVAL', 3600)
+
+
+def check_access_tokens():
+    """Vérifier aussi les tokens d'accès à chaque requête (voir authentication.py) ?"""
+    return getattr(settings, 'VEHICULES_BLACKLIST_CHECK_ACCESS', False)
+
+
+class BloomFilter:
+    """Filtre de Bloom : aucun faux négatif, ``error_rate`` de faux positifs à capacité nominale."""
+
+    def __init__(self, capacity, error_rate=ERROR_RATE):
+        self.capacity = max(capacity, 1)
+        self.size = max(8, math.ceil(-self.capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hash_count = max(1, round(self.size / self.capacity * math.log(2)))
+        self.bits = bytearray((self.size + 7) // 8)
+        self.count = 0
+
+    def _positions(self, key):
+        # Double hachage (Kirsch-Mitzenmacher) à partir d'un seul condensé
+        digest = hashlib.blake2b(key.encode(), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], 'little')
+        h2 = int.from_bytes(digest[8:], 'little') | 1
+        return [(h1 + i * h2) % self.size for i in range(self.hash_count)]
+
+    def add(self, key):
+        for position in self._positions(key):
+            self.bits[position >> 3] |= 1 << (position & 7)
+        self.count += 1
+
+    def __contains__(self, key):
+        return all(self.bits[position >> 3] & (1 << (position & 7)) for position in self._positions(key))
+
+
+class RevocationIndex:
+    """Filtre de Bloom des jti révoqués, propre au processus."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._filter = None
+        self._last_id = 0
+        self._built_at = self._synced_at = 0.0
+        self._pruner = None
+
+    def might_contain(self, jti):
+        self._refresh()
+        return jti in self._filter
+
+    def add(self, jti):
+        with self._lock:
+            if self._filter is not None:
+                self._filter.add(jti)
+
+    def reset(self):
+        with self._lock:
+            self._filter = None
+
+    def _refresh(self):
+        now = time.monotonic()
+        with self._lock:
+            if (
+                self._filter is None
+                or now - self._built_at >= get_rebuild_interval()
+                or self._filter.count > self._filter.capacity
+            ):
+                self._rebuild(now)
+            elif now - self._synced_at >= get_sync_interval():
+                self._sync(now)
+
+    def _rebuild(self, now):
+        # Les entrées expirées ne sont pas rechargées
+        revoked = TokenRevoque.objects.filter(expire_le__gt=timezone.now())
+        bloom = BloomFilter(max(MIN_CAPACITY, 2 * revoked.count()))
+        last_id = TokenRevoque.objects.aggregate(last_id=Max('id'))['last_id'] or 0
+        for jti in revoked.filter(id__lte=last_id).values_list('jti', flat=True).iterator(chunk_size=5000):
+            bloom.add(jti)
+        self._filter, self._last_id = bloom, last_id
+        self._built_at = self._synced_at = now
+        self._start_pruner()
+
+    def _sync(self, now):
+        for pk, jti in TokenRevoque.objects.filter(id__gt=self._last_id).values_list('id', 'jti'):
+            self._filter.add(jti)
+            self._last_id = max(self._last_id, pk)
+        self._synced_at = now
+
+    def _start_pruner(self):
+        if self._pruner is None and get_prune_interval():
+            self._pruner = threading.Thread(target=_prune_loop, name='token-blacklist-pruner', daemon=True)
+            self._pruner.start()
+
+
+index = RevocationIndex()
+
+
+def is_revoked(jti):
+    """Le token est-il révoqué ? Requête SQL uniquement si le filtre de Bloom le contient."""
+    if jti is None or not index.might_contain(jti):
+        return False
+    return TokenRevoque.objects.filter(jti=jti).exists()
+
+
+def revoke(token):
+    """
+    Révoque un token simplejwt ; retourne False s'il l'était déjà (jti déjà
+    présent : rejeu, éventuellement concurrent).
+    """
+    jti = token[jwt_settings.JTI_CLAIM]
+    try:
+        with transaction.atomic():
+            TokenRevoque.objects.create(
+                jti=jti,
+                token_type=token[jwt_settings.TOKEN_TYPE_CLAIM],
+                expire_le=datetime_from_epoch(token['exp']),
+            )
+    except IntegrityError:
+        return False
+    index.add(jti)
+    return True
+
+
+def prune():
+    """Supprime les entrées expirées ; retourne leur nombre."""
+    deleted, _by_model = TokenRevoque.objects.filter(expire_le__lte=timezone.now()).delete()
+    return deleted
+
+
+def _prune_loop():
+    while True:
+        time.sleep(get_prune_interval())
+        try:
+            prune()
+        except Exception:
+            logger.exception('Échec de la purge de la liste noire des tokens')
+        finally:
+            # Connexion propre à ce thread : inutile de la garder ouverte entre deux purges
+            connection.close()
+
+
+class TokenRefreshSerializer(BaseTokenRefreshSerializer):
+    """
+    Rafraîchissement avec liste noire (voir TOKEN_REFRESH_SERIALIZER).
+
+    Refuse un token révoqué et, avec BLACKLIST_AFTER_ROTATION, révoque le
+    token présenté avant d'en émettre un nouveau.
+    """
+
+    def validate(self, attrs):
+        refresh = self.token_class(attrs['refresh'])
+        if is_revoked(refresh.get(jwt_settings.JTI_CLAIM)):
+            raise InvalidToken(_('Token is blacklisted'))
+
+        data = {'access': str(refresh.access_token)}
+
+        if jwt_settings.ROTATE_REFRESH_TOKENS:
+            if jwt_settings.BLACKLIST_AFTER_ROTATION and not revoke(refresh):
+                # Le même token vient d'être utilisé par une autre requête
+                raise InvalidToken(_('Token is blacklisted'))
+            refresh.set_jti()
+            refresh.set_exp()
+            refresh.set_iat()
+            data['refresh'] = str(refresh)
+
+        return data
+
+
+class TokenRevokeSerializer(serializers.Serializer):
+    """Révocation d'un token de rafraîchissement (déconnexion)."""
+    refresh = serializers.CharField(help_text='Token de rafraîchissement à révoquer')
+
+    def validate(self, attrs):
+        try:
+            attrs['token'] = RefreshToken(attrs['refresh'])
+        except TokenError as exc:
+            raise InvalidToken(exc.args[0])
+        return attrs
@@ -0,0 +1,99 @@
+"""
+Import en masse de véhicules pour l'API Concessionnaire & Véhicules.
+
+VehiculeBulkValidator valide un lot complet d'éléments avec les règles des
+champs de VehiculeSerializer, sans instancier un serializer par élément :
+les champs sont extraits une seule fois, puis ``run_validation`` est appelé
+directement sur chaque valeur. Les erreurs sont rapportées par élément.
+
+bulk_create_vehicules insère ensuite les véhicules valides par paquets dans
+une seule transaction.
+"""
+
+from django.conf import settings
+from django.db import transaction
+from rest_framework import serializers
+from rest_framework.fields import SkipField, empty
+from rest_framework.settings import api_settings
+
+from .models import Vehicule
+from .serializers import VehiculeSerializer
+from .signals import inventaires_modifies_en_masse
+
+
+def get_batch_size():
+    """Taille par défaut des paquets de bulk_create."""
+    return getattr(settings, 'VEHICULES_BULK_BATCH_SIZE', 1000)
+
+
+def get_max_items():
+    """Nombre maximal de véhicules acceptés par appel."""
+    return getattr(settings, 'VEHICULES_BULK_MAX_ITEMS', 50000)
+
+
+class VehiculeBulkValidator:
+    """
+    Valide une liste de véhicules avec les règles de VehiculeSerializer.
+
+    Le concessionnaire est imposé par l'URL : le champ 'concessionnaire'
+    n'est pas lu dans les éléments.
+    """
+    serializer_class = VehiculeSerializer
+    exclude = ('concessionnaire',)
+
+    def __init__(self):
+        self.fields = [
+            (name, field)
+            for name, field in self.serializer_class().fields.items()
+            if not field.read_only and name not in self.exclude
+        ]
+
+    def validate(self, items):
+        """
+        Retourne (valeurs validées, erreurs).
+
+        Les valeurs validées sont des couples (index, données) ; les erreurs
+        sont des dictionnaires ``{'index': i, 'errors': {champ: [messages]}}``.
+        """
+        valid, errors = [], []
+        invalid_message = serializers.Serializer.default_error_messages['invalid']
+        for index, item in enumerate(items):
+            if not isinstance(item, dict):
+                errors.append({
+                    'index': index,
+                    'errors': {
+                        api_settings.NON_FIELD_ERRORS_KEY: [
+                            str(invalid_message).format(datatype=type(item).__name__)
+                        ]
+                    },
+                })
+                continue
+
+            data, item_errors = {}, {}
+            for name, field in self.fields:
+                try:
+                    data[field.source] = field.run_validation(item.get(name, empty))
+                except serializers.ValidationError as exc:
+                    item_errors[name] = exc.detail
+                except SkipField:
+                    pass
+            if item_errors:
+                errors.append({'index': index, 'errors': item_errors})
+            else:
+                valid.append((index, data))
+        return valid, errors
+
+
+def bulk_create_vehicules(concessionnaire, rows, batch_size=None):
+    """Insère les véhicules validés par paquets, dans une seule transaction."""
+    batch_size = batch_size or get_batch_size()
+    with transaction.atomic():
+        created = Vehicule.objects.bulk_create(
+            [Vehicule(concessionnaire_id=concessionnaire.pk, **data) for data in rows],
+            batch_size=batch_size
+        )
+        # bulk_create n'émet pas de signaux : marqueurs et cache mis à jour ici
+        if created:
+            inventaires_modifies_en_masse([concessionnaire.pk])
+    return created
+
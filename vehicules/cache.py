@@ -0,0 +1,187 @@
+"""
+Cache des réponses GET de l'API Concessionnaire & Véhicules.
+
+Les payloads sérialisés (listes et détails) sont stockés dans le cache Django
+sous des clés qui incluent des numéros de version :
+
+- version globale des concessionnaires : liste des concessionnaires ;
+- version d'un concessionnaire : son détail et le détail de ses véhicules
+  (qui exposent concessionnaire_nom) ;
+- version de l'inventaire d'un concessionnaire : la liste de ses véhicules et
+  ses statistiques d'inventaire.
+
+L'invalidation (voir signals.py) consiste à incrémenter la bonne version ou à
+supprimer la clé de détail d'un véhicule : les anciennes entrées ne sont plus
+jamais lues et expirent d'elles-mêmes. Fonctionne avec les backends
+locmem et fichiers de Django.
+
+Protection contre l'effet de meute : lorsqu'une clé est absente, une seule
+requête (celle qui obtient le verrou via ``cache.add``) reconstruit le
+payload ; les autres attendent qu'il apparaisse dans le cache.
+
+Les payloads sont construits sur une réplique comme les autres lectures, ou
+sur la base principale avec ``VEHICULES_DB_CACHE_BUILDS_ON_PRIMARY``. Dans le
+premier cas, un client qui vient d'écrire contourne le cache (voir
+db_router.py).
+"""
+
+import hashlib
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+
+from . import db_router
+
+_GLOBAL_VERSION_KEY = 'vehicules:concessionnaires:version'
+_POLL_INTERVAL = 0.05
+
+
+def get_cache():
+    return caches[getattr(settings, 'VEHICULES_CACHE_ALIAS', 'default')]
+
+
+def get_timeout():
+    """Durée de vie des payloads en secondes ; 0 désactive le cache."""
+    return getattr(settings, 'VEHICULES_CACHE_TIMEOUT', 300)
+
+
+def _concessionnaire_version_key(concessionnaire_id):
+    return f'vehicules:concessionnaire:{concessionnaire_id}:version'
+
+
+def _inventaire_version_key(concessionnaire_id):
+    return f'vehicules:concessionnaire:{concessionnaire_id}:inventaire:version'
+
+
+def _get_versions(*version_keys):
+    """
+    Retourne les versions demandées, en initialisant celles qui manquent.
+
+    Une version absente (jamais créée ou évincée du cache) est initialisée à
+    partir de l'horloge et non à 0, pour ne jamais retomber sur une version
+    déjà utilisée par des payloads obsolètes encore présents.
+    """
+    cache = get_cache()
+    versions = cache.get_many(version_keys)
+    for key in version_keys:
+        if key not in versions:
+            cache.add(key, time.time_ns(), timeout=None)
+            versions[key] = cache.get(key)
+    return [versions[key] for key in version_keys]
+
+
+def _bump(version_key):
+    cache = get_cache()
+    try:
+        cache.incr(version_key)
+    except ValueError:
+        cache.set(version_key, time.time_ns(), timeout=None)
+
+
+def _request_suffix(request):
+    # Les liens de pagination sont absolus : l'hôte fait partie de la clé
+    return hashlib.md5(request.build_absolute_uri().encode()).hexdigest()
+
+
+def concessionnaires_list_key(request):
+    (version,) = _get_versions(_GLOBAL_VERSION_KEY)
+    return f'vehicules:concessionnaires:v{version}:{_request_suffix(request)}'
+
+
+def concessionnaire_detail_key(concessionnaire_id):
+    (version,) = _get_versions(_concessionnaire_version_key(concessionnaire_id))
+    return f'vehicules:concessionnaire:{concessionnaire_id}:v{version}'
+
+
+def vehicules_list_key(request, concessionnaire_id):
+    version, inventaire = _get_versions(
+        _concessionnaire_version_key(concessionnaire_id),
+        _inventaire_version_key(concessionnaire_id),
+    )
+    return (
+        f'vehicules:concessionnaire:{concessionnaire_id}:v{version}'
+        f':inventaire:v{inventaire}:{_request_suffix(request)}'
+    )
+
+
+def concessionnaire_stats_key(concessionnaire_id):
+    version, inventaire = _get_versions(
+        _concessionnaire_version_key(concessionnaire_id),
+        _inventaire_version_key(concessionnaire_id),
+    )
+    return f'vehicules:concessionnaire:{concessionnaire_id}:v{version}:inventaire:v{inventaire}:stats'
+
+
+def vehicule_detail_key(concessionnaire_id, vehicule_id):
+    (version,) = _get_versions(_concessionnaire_version_key(concessionnaire_id))
+    return f'vehicules:concessionnaire:{concessionnaire_id}:v{version}:vehicule:{vehicule_id}'
+
+
+def get_or_build(key, build):
+    """
+    Retourne le payload en cache pour ``key``, ou le construit avec ``build()``.
+
+    Les exceptions levées par ``build`` (ex. Http404) ne sont pas mises en
+    cache et libèrent le verrou.
+    """
+    timeout = get_timeout()
+    if not timeout:
+        return build()
+    if db_router.is_sticky() and not db_router.get_cache_builds_on_primary():
+        # Lecture de ses propres écritures : le cache peut contenir un payload
+        # construit depuis une réplique en retard
+        return build()
+
+    cache = get_cache()
+    payload = cache.get(key)
+    if payload is not None:
+        return payload
+
+    lock_key = f'{key}:lock'
+    lock_timeout = getattr(settings, 'VEHICULES_CACHE_LOCK_TIMEOUT', 10)
+    if cache.add(lock_key, True, timeout=lock_timeout):
+        try:
+            payload = _build(build)
+            cache.set(key, payload, timeout=timeout)
+        finally:
+            cache.delete(lock_key)
+        return payload
+
+    # Une autre requête reconstruit ce payload : on attend son résultat
+    deadline = time.monotonic() + lock_timeout
+    while time.monotonic() < deadline:
+        time.sleep(_POLL_INTERVAL)
+        payload = cache.get(key)
+        if payload is not None:
+            return payload
+        if cache.get(lock_key) is None:
+            break
+
+    # Verrou expiré ou relâché sans résultat (erreur) : on construit nous-mêmes
+    payload = _build(build)
+    cache.set(key, payload, timeout=timeout)
+    return payload
+
+
+def _build(build):
+    if db_router.get_cache_builds_on_primary():
+        with db_router.use_primary():
+            return build()
+    return build()
+
+
+def invalidate_concessionnaires():
+    _bump(_GLOBAL_VERSION_KEY)
+
+
+def invalidate_concessionnaire(concessionnaire_id):
+    _bump(_concessionnaire_version_key(concessionnaire_id))
+
+
+def invalidate_inventaire(concessionnaire_id):
+    _bump(_inventaire_version_key(concessionnaire_id))
+
+
+def invalidate_vehicule(concessionnaire_id, vehicule_id):
+    get_cache().delete(vehicule_detail_key(concessionnaire_id, vehicule_id))
@@ -0,0 +1,41 @@
+"""
+Vérifications système (``manage.py check``, lancées aussi au démarrage du serveur).
+
+Cache des réponses (cache.py) : les versions des clés ne sont incrémentées
+que dans le processus qui écrit. Avec un cache local-memory et plusieurs
+processus serveur, les autres processus continueraient de servir leurs
+anciens payloads jusqu'à leur expiration (``VEHICULES_CACHE_TIMEOUT``). Le
+nombre de processus est lu dans ``VEHICULES_SERVER_PROCESSES`` (variable
+d'environnement ``WEB_CONCURRENCY``, également lue par gunicorn).
+"""
+
+from django.conf import settings
+from django.core.cache.backends.locmem import LocMemCache
+from django.core.checks import Error, Tags, register
+
+from . import cache, db_router
+
+
+def get_server_processes():
+    """Nombre de processus du serveur qui partagent le cache des réponses."""
+    return getattr(settings, 'VEHICULES_SERVER_PROCESSES', 1)
+
+
+@register(Tags.caches)
+def check_shared_cache(app_configs, **kwargs):
+    processes = get_server_processes()
+    if processes <= 1 or not isinstance(cache.get_cache(), LocMemCache):
+        return []
+    # Sans cache des réponses ni répliques (marquage des clients), rien n'est partagé
+    if not cache.get_timeout() and not db_router.get_replicas():
+        return []
+    return [Error(
+        f'Le cache {getattr(settings, "VEHICULES_CACHE_ALIAS", "default")!r} est local à chaque processus '
+        f'(LocMemCache) alors que VEHICULES_SERVER_PROCESSES = {processes} : les invalidations '
+        'd\'un processus ne seraient pas vues par les autres.',
+        hint=(
+            'Configurer un cache partagé dans CACHES (FileBasedCache, Redis...), '
+            'ou VEHICULES_CACHE_TIMEOUT = 0 pour désactiver le cache des réponses.'
+        ),
+        id='vehicules.E001',
+    )]
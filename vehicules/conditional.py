@@ -0,0 +1,103 @@
+"""
+GET conditionnels (ETag / Last-Modified) pour l'API Concessionnaire & Véhicules.
+
+Les fonctions de ce module alimentent le décorateur ``condition`` de Django :
+elles ne lisent que les marqueurs de modification des modèles (une requête
+SQL légère, sans sérialisation) pour calculer un ETag fort et une date de
+dernière modification. Si le client envoie If-None-Match / If-Modified-Since
+et que rien n'a changé, la vue n'est pas exécutée et une réponse 304 est
+renvoyée.
+
+Les marqueurs sont :
+- ``Concessionnaire.modifie_le`` : modification du concessionnaire lui-même ;
+- ``Concessionnaire.inventaire_version`` / ``inventaire_modifie_le`` :
+  mis à jour (voir signals.py) à chaque écriture sur un de ses véhicules ;
+- ``Vehicule.modifie_le`` : modification du véhicule.
+"""
+
+import hashlib
+
+from django.db.models import Count, Max
+from django.views.decorators.http import condition
+
+from .models import Concessionnaire, Vehicule
+
+
+def _memoize(func):
+    """Calcule le marqueur une seule fois par requête (partagé entre ETag et Last-Modified)."""
+    attribute = f'_marker_{func.__name__}'
+
+    def wrapper(request, **kwargs):
+        if not hasattr(request, attribute):
+            setattr(request, attribute, func(request, **kwargs))
+        return getattr(request, attribute)
+
+    return wrapper
+
+
+def _representation(request):
+    # Une même URL peut être rendue en JSON, NDJSON ou MessagePack, et ses
+    # paramètres (?fields=) changent la représentation : l'ETag doit différer
+    return f'{request.get_full_path()}|{getattr(request, "accepted_media_type", "")}'
+
+
+def _etag(*parts):
+    return hashlib.md5(':'.join(str(part) for part in parts).encode()).hexdigest()
+
+
+@_memoize
+def _concessionnaires_marker(request):
+    marker = Concessionnaire.objects.aggregate(
+        modifie_le=Max('modifie_le'),
+        total=Count('id')
+    )
+    # Le nombre de concessionnaires fait partie de l'ETag pour refléter les
+    # suppressions, que la date maximale ne voit pas.
+    return marker['modifie_le'], _etag(
+        marker['modifie_le'], marker['total'], _representation(request)
+    )
+
+
+@_memoize
+def _concessionnaire_marker(request, id):
+    modifie_le = Concessionnaire.objects.filter(pk=id).values_list(
+        'modifie_le', flat=True
+    ).first()
+    if modifie_le is None:
+        return None, None
+    return modifie_le, _etag(id, modifie_le, _representation(request))
+
+
+@_memoize
+def _inventaire_marker(request, id):
+    marker = Concessionnaire.objects.filter(pk=id).values_list(
+        'modifie_le', 'inventaire_version', 'inventaire_modifie_le'
+    ).first()
+    if marker is None:
+        return None, None
+    modifie_le, version, inventaire_modifie_le = marker
+    last_modified = max(filter(None, (modifie_le, inventaire_modifie_le)))
+    return last_modified, _etag(id, modifie_le, version, _representation(request))
+
+
+@_memoize
+def _vehicule_marker(request, id, vehicule_id):
+    marker = Vehicule.objects.filter(pk=vehicule_id, concessionnaire_id=id).values_list(
+        'modifie_le', 'concessionnaire__modifie_le'
+    ).first()
+    if marker is None:
+        return None, None
+    return max(marker), _etag(id, vehicule_id, *marker, _representation(request))
+
+
+def _conditional(marker):
+    return condition(
+        etag_func=lambda request, **kwargs: marker(request, **kwargs)[1],
+        last_modified_func=lambda request, **kwargs: marker(request, **kwargs)[0],
+    )
+
+
+concessionnaires_condition = _conditional(_concessionnaires_marker)
+concessionnaire_condition = _conditional(_concessionnaire_marker)
+inventaire_condition = _conditional(_inventaire_marker)
+vehicule_condition = _conditional(_vehicule_marker)
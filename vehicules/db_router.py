@@ -0,0 +1,321 @@
+"""
+Routage des lectures vers des répliques de la base (DATABASE_ROUTERS).
+
+Les répliques sont déclarées par variables d'environnement (python-decouple,
+voir settings.py) et listées dans ``VEHICULES_DB_REPLICAS`` (alias de
+DATABASES). ReplicaRoutingMiddleware marque chaque requête ; ReplicaRouter
+n'envoie une lecture vers une réplique que si :
+
+- la requête est un GET ou un HEAD servi par une vue de l'application
+  ``vehicules`` ;
+- le modèle lu appartient à ``vehicules`` (hors ``PRIMARY_ONLY_MODELS`` : une
+  révocation de token doit être vue immédiatement) ;
+- la requête n'a encore rien écrit, et aucune transaction n'est ouverte sur la
+  base principale (lecture de ses propres écritures non validées) ;
+- la lecture n'a pas lieu dans un bloc ``use_primary()`` ;
+- le client n'a pas écrit depuis moins de ``VEHICULES_DB_STICKY_SECONDS``
+  (lecture de ses propres écritures malgré le retard des répliques). Le
+  client est identifié par l'utilisateur de son JWT (``user_id``, stable
+  d'un rafraîchissement de token à l'autre), ou à défaut par son adresse IP ;
+  le marquage est stocké dans le cache Django (partagé entre processus avec
+  un backend partagé).
+
+Les payloads mis en cache (cache.get_or_build) sont construits comme les
+autres lectures, sur une réplique. Une réplique en retard sur une
+invalidation peut alors mettre en cache, sous la nouvelle version, un payload
+antérieur à l'écriture, jusqu'à la prochaine invalidation ou l'expiration du
+cache. Un client qui vient d'écrire (``is_sticky()``) contourne donc le cache
+des réponses : il ne lit ni n'alimente le cache et relit toujours ses propres
+écritures sur la base principale.
+``VEHICULES_DB_CACHE_BUILDS_ON_PRIMARY = True`` construit ces payloads sur la
+base principale (plus de charge sur celle-ci, aucun payload obsolète) ; les
+clients qui viennent d'écrire utilisent alors le cache comme les autres.
+
+Une seule réplique est choisie par requête, à la première lecture, selon
+``VEHICULES_DB_REPLICA_POLICY`` :
+
+- ``'round_robin'`` (défaut) : chacune à tour de rôle (par processus) ;
+- ``'random'`` : tirage aléatoire ;
+- ``'client'`` : toujours la même réplique pour un même client (lectures
+  monotones) ;
+- chemin pointé d'une classe qui expose ``choose(replicas, state)``.
+
+Les écritures vont toujours vers la base principale, de même que les lectures
+faites hors d'une requête (commandes). Les lectures des réponses en flux
+(StreamingHttpResponse, lues après le retour du middleware) suivent le
+routage de leur requête. Sans réplique déclarée, le middleware est retiré de
+la chaîne (MiddlewareNotUsed) et le routeur laisse Django utiliser
+``default``.
+"""
+
+import hashlib
+import itertools
+import random
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.utils.module_loading import import_string
+from rest_framework_simplejwt.exceptions import TokenBackendError
+from rest_framework_simplejwt.settings import api_settings as jwt_settings
+from rest_framework_simplejwt.state import token_backend
+
+from . import cache as response_cache
+
+PRIMARY = DEFAULT_DB_ALIAS
+READ_METHODS = ('GET', 'HEAD')
+ROUTED_APPS = ('vehicules',)
+PRIMARY_ONLY_MODELS = {'vehicules.tokenrevoque'}
+_STICKY_KEY_PREFIX = 'vehicules:db-primary:'
+
+_current = ContextVar('vehicules_db_routing', default=None)
+
+
+def get_replicas():
+    """Alias des répliques (DATABASES) ; liste vide : routage désactivé."""
+    return getattr(settings, 'VEHICULES_DB_REPLICAS', [])
+
+
+def get_sticky_seconds():
+    """Durée pendant laquelle un client qui vient d'écrire lit sur la base principale."""
+    return getattr(settings, 'VEHICULES_DB_STICKY_SECONDS', 5)
+
+
+def get_cache_builds_on_primary():
+    """Payloads mis en cache construits sur la base principale plutôt que sur une réplique ?"""
+    return getattr(settings, 'VEHICULES_DB_CACHE_BUILDS_ON_PRIMARY', False)
+
+
+class RequestState:
+    """Routage d'une requête en cours."""
+
+    def __init__(self, client):
+        self.client = client
+        self.read_view = False
+        self.sticky = False
+        self.wrote = False
+        self.primary_depth = 0
+        self.replica = None
+
+
+class RoundRobinPolicy:
+    """Chaque réplique à tour de rôle."""
+    name = 'round_robin'
+
+    def __init__(self):
+        self._counter = itertools.count()
+
+    def choose(self, replicas, state):
+        return replicas[next(self._counter) % len(replicas)]
+
+
+class RandomPolicy:
+    """Réplique tirée au hasard."""
+    name = 'random'
+
+    def choose(self, replicas, state):
+        return random.choice(replicas)
+
+
+class ClientPolicy:
+    """Toujours la même réplique pour un même client."""
+    name = 'client'
+
+    def choose(self, replicas, state):
+        return replicas[int(state.client[:8], 16) % len(replicas)]
+
+
+POLICIES = {
+    'round_robin': RoundRobinPolicy,
+    'random': RandomPolicy,
+    'client': ClientPolicy,
+}
+
+_policy = (None, None)
+
+
+def get_policy():
+    """Politique configurée (instance partagée, recréée si le réglage change)."""
+    global _policy
+    name = getattr(settings, 'VEHICULES_DB_REPLICA_POLICY', 'round_robin')
+    configured, policy = _policy
+    if configured != name:
+        policy = POLICIES[name]() if name in POLICIES else import_string(name)()
+        _policy = (name, policy)
+    return policy
+
+
+def is_sticky():
+    """La requête en cours vient d'un client qui vient d'écrire (ou a écrit elle-même) ?"""
+    state = _current.get()
+    return state is not None and (state.sticky or state.wrote)
+
+
+@contextmanager
+def use_primary():
+    """Lectures du bloc sur la base principale, y compris pendant une vue de lecture."""
+    state = _current.get()
+    if state is None:
+        yield
+        return
+    state.primary_depth += 1
+    try:
+        yield
+    finally:
+        state.primary_depth -= 1
+
+
+def _is_routed(model):
+    return model._meta.app_label in ROUTED_APPS and model._meta.label_lower not in PRIMARY_ONLY_MODELS
+
+
+class ReplicaRouter:
+    """Voir la docstring du module ; déclaré dans DATABASE_ROUTERS."""
+
+    def db_for_read(self, model, **hints):
+        state = _current.get()
+        if (
+            state is None or not state.read_view or state.sticky or state.wrote or state.primary_depth
+            or not _is_routed(model) or connections[PRIMARY].in_atomic_block
+        ):
+            return None
+        if state.replica is None:
+            replicas = get_replicas()
+            if not replicas:
+                return None
+            state.replica = get_policy().choose(replicas, state)
+        return state.replica
+
+    def db_for_write(self, model, **hints):
+        state = _current.get()
+        if state is not None:
+            state.wrote = True
+        # Instance lue sur une réplique : écrite sur la base principale
+        instance = hints.get('instance')
+        if instance is not None and instance._state.db in get_replicas():
+            return PRIMARY
+        return None
+
+    def allow_relation(self, obj1, obj2, **hints):
+        databases = {PRIMARY, *get_replicas()}
+        if obj1._state.db in databases and obj2._state.db in databases:
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # Les répliques sont des copies de la base principale (voir sync_replicas)
+        if db in get_replicas():
+            return False
+        return None
+
+
+def _token_user_id(request):
+    """
+    Utilisateur du JWT de la requête, ou None.
+
+    La signature n'est pas vérifiée : l'identifiant ne sert qu'au routage, et
+    une requête au token invalide est refusée par l'authentification avant
+    toute écriture.
+    """
+    parts = request.META.get(jwt_settings.AUTH_HEADER_NAME, '').split()
+    if len(parts) != 2 or parts[0] not in jwt_settings.AUTH_HEADER_TYPES:
+        return None
+    try:
+        payload = token_backend.decode(parts[1], verify=False)
+    except TokenBackendError:
+        return None
+    user_id = payload.get(jwt_settings.USER_ID_CLAIM)
+    return None if user_id is None else str(user_id)
+
+
+def _client_key(request):
+    user_id = _token_user_id(request)
+    identity = f'user:{user_id}' if user_id is not None else f"ip:{request.META.get('REMOTE_ADDR', '')}"
+    return hashlib.sha256(identity.encode()).hexdigest()
+
+
+def _stream_with_state(content, state):
+    # Chaque paquet est produit avec le routage de la requête
+    iterator = iter(content)
+    while True:
+        token = _current.set(state)
+        try:
+            chunk = next(iterator)
+        except StopIteration:
+            return
+        finally:
+            _current.reset(token)
+        yield chunk
+
+
+async def _astream_with_state(content, state):
+    iterator = aiter(content)
+    while True:
+        token = _current.set(state)
+        try:
+            chunk = await anext(iterator)
+        except StopAsyncIteration:
+            return
+        finally:
+            _current.reset(token)
+        yield chunk
+
+
+class ReplicaRoutingMiddleware:
+    """Voir la docstring du module ; à placer avant les middlewares qui lisent la base."""
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not get_replicas():
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        state = self.start(request)
+        token = _current.set(state)
+        try:
+            response = self.get_response(request)
+        finally:
+            _current.reset(token)
+        return self.finish(state, response)
+
+    async def __acall__(self, request):
+        state = self.start(request)
+        token = _current.set(state)
+        try:
+            response = await self.get_response(request)
+        finally:
+            _current.reset(token)
+        return self.finish(state, response)
+
+    def start(self, request):
+        state = RequestState(_client_key(request))
+        if request.method in READ_METHODS:
+            state.sticky = response_cache.get_cache().get(_STICKY_KEY_PREFIX + state.client) is not None
+        return state
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        state = _current.get()
+        if state is not None and request.method in READ_METHODS:
+            module = getattr(view_func, 'view_class', view_func).__module__
+            state.read_view = module.split('.')[0] in ROUTED_APPS
+        return None
+
+    def finish(self, state, response):
+        if state.wrote and get_sticky_seconds():
+            response_cache.get_cache().set(_STICKY_KEY_PREFIX + state.client, True, timeout=get_sticky_seconds())
+        if response.streaming and state.read_view:
+            content = response.streaming_content
+            response.streaming_content = (
+                _astream_with_state(content, state) if response.is_async else _stream_with_state(content, state)
+            )
+        return response
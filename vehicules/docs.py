@@ -0,0 +1,594 @@
+"""
+Documentation OpenAPI des vues (drf-spectacular), chargée à la demande.
+
+Les métadonnées de documentation (``extend_schema``, paramètres, exemples)
+ne servent qu'à générer le schéma. Elles sont donc déclarées ici, et non dans
+views.py et user_views.py, et appliquées aux vues à l'import de ce module :
+un worker qui ne sert pas le schéma n'importe ni drf_spectacular.utils ni ces
+objets, ce qui raccourcit le démarrage (voir ``manage.py bench_startup``).
+
+Ce module est importé par le générateur de schéma du projet
+(``SPECTACULAR_SETTINGS['DEFAULT_GENERATOR_CLASS']``), donc par
+``manage.py spectacular``, ``manage.py build_schema`` et /api/schema/ (voir
+openapi.py) avant toute génération.
+"""
+
+from drf_spectacular.contrib.rest_framework_simplejwt import SimpleJWTScheme
+from drf_spectacular.extensions import OpenApiSerializerFieldExtension
+from drf_spectacular.generators import SchemaGenerator as BaseSchemaGenerator
+from drf_spectacular.types import OpenApiTypes
+from drf_spectacular.utils import (
+    OpenApiExample,
+    OpenApiParameter,
+    extend_schema,
+    extend_schema_view,
+    inline_serializer
+)
+from rest_framework import serializers
+
+from . import blacklist
+from .authentication import CachedJWTAuthentication
+from .fast_serializers import FIELDS_QUERY_PARAM
+from .filters import VehiculeFilterSerializer
+from .multiget import MAX_ID, IdListField, VehiculeBatchSerializer
+from .search import VehiculeSearchSerializer
+from .serializers import (
+    ConcessionnaireSerializer,
+    InventaireStatsSerializer,
+    VehiculeSerializer,
+    VehiculeDetailSerializer
+)
+from .streaming import STREAM_QUERY_PARAM
+from .user_views import TokenRevokeView, UserCreateView
+from .views import (
+    ConcessionnaireListView,
+    ConcessionnaireDetailView,
+    ConcessionnaireStatsListView,
+    ConcessionnaireStatsView,
+    ConcessionnaireVehiculesListView,
+    ConcessionnaireVehiculeDetailView,
+    ConcessionnaireVehiculesBulkView,
+    VehiculeBatchView,
+    VehiculeSearchView,
+    SlowRequestsView
+)
+
+
+class SchemaGenerator(BaseSchemaGenerator):
+    """Générateur du projet : son import applique la documentation de ce module."""
+
+
+class CachedJWTScheme(SimpleJWTScheme):
+    """Documentation OpenAPI : même schéma Bearer (jwtAuth) que JWTAuthentication."""
+    target_class = CachedJWTAuthentication
+    match_subclasses = True
+
+
+class IdListFieldExtension(OpenApiSerializerFieldExtension):
+    """Documentation OpenAPI : liste d'ids entiers (répétés ou séparés par des virgules en GET)."""
+    target_class = IdListField
+
+    def map_serializer_field(self, auto_schema, direction):
+        return {'type': 'array', 'items': {'type': 'integer', 'minimum': 1, 'maximum': MAX_ID}}
+
+
+# Paramètre ?fields= des endpoints qui renvoient des véhicules
+VEHICULE_FIELDS_PARAMETER = OpenApiParameter(
+    name=FIELDS_QUERY_PARAM,
+    type=OpenApiTypes.STR,
+    location=OpenApiParameter.QUERY,
+    description=(
+        'Champs à renvoyer, séparés par des virgules (défaut : tous). '
+        'Champs disponibles : id, type, marque, chevaux, prix_ht, concessionnaire, concessionnaire_nom.'
+    ),
+    required=False,
+)
+
+
+extend_schema_view(
+    get=extend_schema(
+        tags=['Concessionnaires'],
+        summary='Liste tous les concessionnaires',
+        description='Retourne la liste paginée (par curseur) de tous les concessionnaires enregistrés, triée par nom.',
+        parameters=[
+            OpenApiParameter(
+                name=STREAM_QUERY_PARAM,
+                type=OpenApiTypes.BOOL,
+                location=OpenApiParameter.QUERY,
+                description='Liste complète non paginée, envoyée en streaming',
+                required=False,
+            ),
+        ],
+        responses={
+            200: ConcessionnaireSerializer(many=True),
+            401: {'description': 'Non authentifié - Token JWT requis'},
+        },
+        examples=[
+            # Un élément de la liste : drf-spectacular l'insère dans la page
+            # ({'next': ..., 'previous': null, 'results': [...]})
+            OpenApiExample(
+                'Exemple de réponse',
+                value={
+                    'id': 1,
+                    'nom': 'AutoPlus Paris'
+                },
+                response_only=True,
+            ),
+        ],
+    ),
+)(ConcessionnaireListView)
+
+
+extend_schema_view(
+    get=extend_schema(
+        tags=['Concessionnaires'],
+        summary='Détails d\'un concessionnaire',
+        description='Retourne les informations détaillées d\'un concessionnaire spécifique.',
+        parameters=[
+            OpenApiParameter(
+                name='id',
+                type=OpenApiTypes.INT,
+                location=OpenApiParameter.PATH,
+                description='ID du concessionnaire',
+                required=True,
+            ),
+        ],
+        responses={
+            200: ConcessionnaireSerializer,
+            401: {'description': 'Non authentifié - Token JWT requis'},
+            404: {'description': 'Concessionnaire non trouvé'},
+        },
+        examples=[
+            OpenApiExample(
+                'Exemple de réponse',
+                value={
+                    'id': 1,
+                    'nom': 'AutoPlus Paris'
+                },
+                response_only=True,
+            ),
+        ],
+    ),
+)(ConcessionnaireDetailView)
+
+
+extend_schema_view(
+    get=extend_schema(
+        tags=['Concessionnaires'],
+        summary='Statistiques d\'inventaire de tous les concessionnaires',
+        description='Retourne, pour chaque concessionnaire, le nombre de véhicules (autos et motos) et les prix HT et puissances moyens, minimaux et maximaux.',
+        responses={
+            200: InventaireStatsSerializer(many=True),
+            401: {'description': 'Non authentifié - Token JWT requis'},
+        },
+    ),
+)(ConcessionnaireStatsListView)
+
+
+extend_schema_view(
+    get=extend_schema(
+        tags=['Concessionnaires'],
+        summary='Statistiques d\'inventaire d\'un concessionnaire',
+        description='Retourne le nombre de véhicules (autos et motos) du concessionnaire et les prix HT et puissances moyens, minimaux et maximaux.',
+        parameters=[
+            OpenApiParameter(
+                name='id',
+                type=OpenApiTypes.INT,
+                location=OpenApiParameter.PATH,
+                description='ID du concessionnaire',
+                required=True,
+            ),
+        ],
+        responses={
+            200: InventaireStatsSerializer,
+            401: {'description': 'Non authentifié - Token JWT requis'},
+            404: {'description': 'Concessionnaire non trouvé'},
+        },
+        examples=[
+            OpenApiExample(
+                'Exemple de réponse',
+                value={
+                    'concessionnaire': 1,
+                    'concessionnaire_nom': 'AutoPlus Paris',
+                    'nombre': 2,
+                    'nombre_autos': 1,
+                    'nombre_motos': 1,
+                    'prix_ht_moyen': 18500.0,
+                    'prix_ht_min': 12000.0,
+                    'prix_ht_max': 25000.0,
+                    'chevaux_moyen': 100.0,
+                    'chevaux_min': 80,
+                    'chevaux_max': 120
+                },
+                response_only=True,
+            ),
+        ],
+    ),
+)(ConcessionnaireStatsView)
+
+
+extend_schema_view(
+    get=extend_schema(
+        tags=['Véhicules'],
+        summary='Liste des véhicules d\'un concessionnaire',
+        description='Retourne la liste paginée (par curseur) des véhicules appartenant à un concessionnaire spécifique, triée par marque puis type par défaut. Filtres optionnels : type, marque, plages de chevaux et de prix HT ; tri au choix via ordering.',
+        parameters=[
+            OpenApiParameter(
+                name='id',
+                type=OpenApiTypes.INT,
+                location=OpenApiParameter.PATH,
+                description='ID du concessionnaire',
+                required=True,
+            ),
+            OpenApiParameter(
+                name=STREAM_QUERY_PARAM,
+                type=OpenApiTypes.BOOL,
+                location=OpenApiParameter.QUERY,
+                description='Liste complète non paginée, envoyée en streaming',
+                required=False,
+            ),
+            VEHICULE_FIELDS_PARAMETER,
+            VehiculeFilterSerializer,
+        ],
+        responses={
+            200: VehiculeSerializer(many=True),
+            401: {'description': 'Non authentifié - Token JWT requis'},
+            404: {'description': 'Concessionnaire non trouvé'},
+        },
+        examples=[
+            OpenApiExample(
+                'Exemple de réponse',
+                value={
+                    'id': 1,
+                    'type': 'auto',
+                    'marque': 'Peugeot',
+                    'chevaux': 120,
+                    'prix_ht': 25000.0,
+                    'concessionnaire': 1,
+                    'concessionnaire_nom': 'AutoPlus Paris'
+                },
+                response_only=True,
+            ),
+        ],
+    ),
+)(ConcessionnaireVehiculesListView)
+
+
+extend_schema_view(
+    get=extend_schema(
+        tags=['Véhicules'],
+        summary='Détails d\'un véhicule',
+        description='Retourne les informations détaillées d\'un véhicule spécifique appartenant à un concessionnaire.',
+        parameters=[
+            OpenApiParameter(
+                name='id',
+                type=OpenApiTypes.INT,
+                location=OpenApiParameter.PATH,
+                description='ID du concessionnaire',
+                required=True,
+            ),
+            OpenApiParameter(
+                name='vehicule_id',
+                type=OpenApiTypes.INT,
+                location=OpenApiParameter.PATH,
+                description='ID du véhicule',
+                required=True,
+            ),
+            VEHICULE_FIELDS_PARAMETER,
+        ],
+        responses={
+            200: VehiculeDetailSerializer,
+            401: {'description': 'Non authentifié - Token JWT requis'},
+            404: {'description': 'Concessionnaire ou véhicule non trouvé'},
+        },
+        examples=[
+            OpenApiExample(
+                'Exemple de réponse',
+                value={
+                    'id': 1,
+                    'type': 'auto',
+                    'marque': 'Peugeot',
+                    'chevaux': 120,
+                    'prix_ht': 25000.0,
+                    'concessionnaire': 1,
+                    'concessionnaire_nom': 'AutoPlus Paris'
+                },
+                response_only=True,
+            ),
+        ],
+    ),
+)(ConcessionnaireVehiculeDetailView)
+
+
+extend_schema_view(
+    post=extend_schema(
+        tags=['Véhicules'],
+        summary='Création de véhicules en masse',
+        description=(
+            'Crée en une seule transaction une liste de véhicules pour un concessionnaire. '
+            'Tous les éléments sont validés avec les règles de VehiculeSerializer ; les erreurs '
+            'sont rapportées par élément (index dans la liste). Par défaut, aucun véhicule '
+            'n\'est créé si un élément est invalide ; avec partial=1, les éléments valides '
+            'sont créés et les autres rapportés.'
+        ),
+        parameters=[
+            OpenApiParameter(
+                name='id',
+                type=OpenApiTypes.INT,
+                location=OpenApiParameter.PATH,
+                description='ID du concessionnaire',
+                required=True,
+            ),
+            OpenApiParameter(
+                name='partial',
+                type=OpenApiTypes.BOOL,
+                location=OpenApiParameter.QUERY,
+                description='Créer les éléments valides même si d\'autres sont invalides',
+                required=False,
+            ),
+            OpenApiParameter(
+                name='batch_size',
+                type=OpenApiTypes.INT,
+                location=OpenApiParameter.QUERY,
+                description='Taille des paquets d\'insertion (bulk_create)',
+                required=False,
+            ),
+        ],
+        request=VehiculeSerializer(many=True),
+        responses={
+            201: {'description': 'Véhicules créés'},
+            400: {'description': 'Éléments invalides (aucun véhicule créé sans partial=1)'},
+            401: {'description': 'Non authentifié - Token JWT requis'},
+            403: {'description': 'Permission vehicules.add_vehicule requise'},
+            404: {'description': 'Concessionnaire non trouvé'},
+        },
+        examples=[
+            # Un élément de la liste : drf-spectacular l'insère dans le tableau du corps
+            OpenApiExample(
+                'Requête valide',
+                value={'type': 'auto', 'marque': 'Peugeot', 'chevaux': 120, 'prix_ht': 25000.0},
+                request_only=True,
+            ),
+            OpenApiExample(
+                'Réponse avec erreurs',
+                value={
+                    'created': 0,
+                    'errors': [
+                        {'index': 1, 'errors': {'type': ['« camion » n\'est pas un choix valide.']}}
+                    ]
+                },
+                response_only=True,
+                status_codes=['400'],
+            ),
+        ],
+    ),
+)(ConcessionnaireVehiculesBulkView)
+
+
+extend_schema_view(
+    get=extend_schema(
+        tags=['Véhicules'],
+        summary='Recherche de véhicules',
+        description='Recherche les véhicules de tous les concessionnaires dont la marque, la référence ou le nom du concessionnaire commencent par chacun des mots donnés. Les résultats sont classés par pertinence.',
+        parameters=[VehiculeSearchSerializer, VEHICULE_FIELDS_PARAMETER],
+        responses={
+            200: inline_serializer(
+                'VehiculeSearchResponse',
+                fields={'results': VehiculeSerializer(many=True)}
+            ),
+            400: {'description': 'Paramètre q manquant ou invalide'},
+            401: {'description': 'Non authentifié - Token JWT requis'},
+        },
+        examples=[
+            OpenApiExample(
+                'Exemple de réponse',
+                value={
+                    'results': [
+                        {
+                            'id': 1,
+                            'type': 'auto',
+                            'marque': 'Peugeot',
+                            'chevaux': 120,
+                            'prix_ht': 25000.0,
+                            'concessionnaire': 1,
+                            'concessionnaire_nom': 'AutoPlus Paris'
+                        }
+                    ]
+                },
+                response_only=True,
+            ),
+        ],
+    ),
+)(VehiculeSearchView)
+
+
+# Réponse et exemple communs au GET et au POST de VehiculeBatchView
+VEHICULE_BATCH_RESPONSES = {
+    200: inline_serializer(
+        'VehiculeBatchResponse',
+        fields={
+            # null à la position d'un id inconnu
+            'results': serializers.ListField(child=VehiculeDetailSerializer(allow_null=True)),
+            'missing': serializers.ListField(child=serializers.IntegerField()),
+        }
+    ),
+    400: {'description': 'Identifiants manquants, invalides ou trop nombreux'},
+    401: {'description': 'Non authentifié - Token JWT requis'},
+}
+VEHICULE_BATCH_EXAMPLE = OpenApiExample(
+    'Exemple de réponse (ids=1,99,1)',
+    value={
+        'results': [
+            {
+                'id': 1,
+                'type': 'auto',
+                'marque': 'Peugeot',
+                'chevaux': 120,
+                'prix_ht': 25000.0,
+                'concessionnaire': 1,
+                'concessionnaire_nom': 'AutoPlus Paris'
+            },
+            None,
+            {
+                'id': 1,
+                'type': 'auto',
+                'marque': 'Peugeot',
+                'chevaux': 120,
+                'prix_ht': 25000.0,
+                'concessionnaire': 1,
+                'concessionnaire_nom': 'AutoPlus Paris'
+            }
+        ],
+        'missing': [99]
+    },
+    response_only=True,
+)
+VEHICULE_BATCH_DESCRIPTION = (
+    'Résout une liste d\'identifiants de véhicules en une seule requête SQL. Les résultats suivent '
+    'l\'ordre de la demande ; un identifiant inconnu (ou d\'un autre concessionnaire que celui '
+    'demandé) donne null à sa position et figure dans missing.'
+)
+
+
+extend_schema_view(
+    get=extend_schema(
+        tags=['Véhicules'],
+        summary='Lecture groupée de véhicules',
+        description=VEHICULE_BATCH_DESCRIPTION + ' Pour les longues listes, préférer le POST.',
+        parameters=[VehiculeBatchSerializer, VEHICULE_FIELDS_PARAMETER],
+        responses=VEHICULE_BATCH_RESPONSES,
+        examples=[VEHICULE_BATCH_EXAMPLE],
+    ),
+    post=extend_schema(
+        tags=['Véhicules'],
+        summary='Lecture groupée de véhicules (corps JSON)',
+        description=VEHICULE_BATCH_DESCRIPTION,
+        parameters=[VEHICULE_FIELDS_PARAMETER],
+        request=VehiculeBatchSerializer,
+        responses=VEHICULE_BATCH_RESPONSES,
+        examples=[
+            OpenApiExample(
+                'Requête',
+                value={'ids': [1, 99, 1], 'concessionnaire': 1},
+                request_only=True,
+            ),
+            VEHICULE_BATCH_EXAMPLE,
+        ],
+    ),
+)(VehiculeBatchView)
+
+
+extend_schema_view(
+    get=extend_schema(
+        tags=['Profilage'],
+        summary='Requêtes lentes récentes',
+        description=(
+            'Requêtes plus lentes que VEHICULES_PROFILING_SLOW_MS conservées par ce processus '
+            '(de la plus récente à la plus ancienne), avec leurs phases et leurs requêtes SQL '
+            'les plus lentes. Vide si le profilage est désactivé. Réservé au staff.'
+        ),
+        responses={200: OpenApiTypes.OBJECT},
+    ),
+)(SlowRequestsView)
+
+
+extend_schema_view(
+    post=extend_schema(
+        tags=['Authentification'],
+        summary='Créer un nouvel utilisateur',
+        description='Crée un nouveau compte utilisateur. Cet endpoint est public et ne nécessite pas d\'authentification.',
+        request={
+            'application/json': {
+                'type': 'object',
+                'properties': {
+                    'username': {
+                        'type': 'string',
+                        'description': 'Nom d\'utilisateur unique',
+                        'example': 'john_doe'
+                    },
+                    'email': {
+                        'type': 'string',
+                        'format': 'email',
+                        'description': 'Adresse email',
+                        'example': 'john@example.com'
+                    },
+                    'password': {
+                        'type': 'string',
+                        'format': 'password',
+                        'description': 'Mot de passe',
+                        'example': 'motdepasse123'
+                    }
+                },
+                'required': ['username', 'email', 'password']
+            }
+        },
+        responses={
+            201: {
+                'description': 'Utilisateur créé avec succès',
+                'content': {
+                    'application/json': {
+                        'example': {
+                            'message': 'Utilisateur créé avec succès.',
+                            'username': 'john_doe',
+                            'email': 'john@example.com'
+                        }
+                    }
+                }
+            },
+            400: {
+                'description': 'Erreur de validation',
+                'content': {
+                    'application/json': {
+                        'example': {
+                            'error': 'Les champs username, email et password sont requis.'
+                        }
+                    }
+                }
+            },
+            503: {
+                'description': 'Trop de demandes d\'authentification en cours (en-tête Retry-After)',
+                'content': {
+                    'application/json': {
+                        'example': {
+                            'detail': 'Trop de demandes d\'authentification en cours, réessayez dans un instant.'
+                        }
+                    }
+                }
+            }
+        },
+        examples=[
+            OpenApiExample(
+                'Requête valide',
+                value={
+                    'username': 'john_doe',
+                    'email': 'john@example.com',
+                    'password': 'motdepasse123'
+                },
+                request_only=True,
+            ),
+            OpenApiExample(
+                'Réponse succès',
+                value={
+                    'message': 'Utilisateur créé avec succès.',
+                    'username': 'john_doe',
+                    'email': 'john@example.com'
+                },
+                response_only=True,
+            ),
+        ],
+    ),
+)(UserCreateView)
+
+
+extend_schema_view(
+    post=extend_schema(
+        tags=['Authentification'],
+        summary='Révoquer un token de rafraîchissement',
+        description='Ajoute le token de rafraîchissement (et le token d\'accès utilisé pour la requête, le cas échéant) à la liste noire : il ne pourra plus être utilisé.',
+        request=blacklist.TokenRevokeSerializer,
+        responses={
+            204: {'description': 'Token révoqué'},
+            401: {'description': 'Token invalide ou expiré'},
+        },
+    ),
+)(TokenRevokeView)
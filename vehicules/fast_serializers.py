@@ -0,0 +1,185 @@
+"""
+Sérialisation rapide en lecture seule pour l'API Concessionnaire & Véhicules.
+
+Les serializers DRF instancient un objet modèle par ligne puis parcourent
+leurs champs un par un. Pour les endpoints GET, ValuesSerializer produit la
+même sortie directement à partir des lignes ``.values()`` du queryset, selon
+un plan de champs compilé une seule fois par classe à partir du
+ModelSerializer de référence.
+
+Le plan ne contient que les champs déclarés dans ``Meta.fields`` du
+serializer de référence : le champ 'siret' ne peut donc jamais être lu ni
+exposé par ce chemin.
+
+Champs partiels : ``?fields=id,marque,prix_ht`` restreint la sortie et les
+colonnes lues (``.values()``) aux champs demandés, parmi ceux du plan
+(``requested_fields``). La jointure sur le concessionnaire n'est faite que si
+``concessionnaire_nom`` est demandé.
+"""
+
+import copy
+
+from django.db.models import F
+from rest_framework import serializers
+from rest_framework.utils.serializer_helpers import ReturnDict, ReturnList
+
+from . import profiling
+from .serializers import (
+    ConcessionnaireSerializer,
+    VehiculeSerializer,
+    VehiculeDetailSerializer
+)
+
+# Champs dont to_representation() est l'identité sur les valeurs lues en base
+_IDENTITY_FIELDS = (serializers.IntegerField, serializers.CharField)
+
+FIELDS_QUERY_PARAM = 'fields'
+
+
+class FieldPlan:
+    """Plan de sérialisation compilé : clés de sortie, lookups ORM et conversions."""
+
+    def __init__(self, serializer_class):
+        self.keys = []
+        self.lookups = {}
+        self.converters = []
+        for name, field in serializer_class().fields.items():
+            if field.write_only:
+                continue
+            lookup = '__'.join(field.source_attrs)
+            self.keys.append(name)
+            self.lookups[name] = lookup
+            converter = _compile_converter(field)
+            if converter is not None:
+                self.converters.append((name, converter))
+        self._subsets = {}
+
+    def subset(self, fields):
+        """Plan restreint aux champs ``fields`` (dans l'ordre du plan), conservé pour les appels suivants."""
+        key = frozenset(fields)
+        plan = self._subsets.get(key)
+        if plan is None:
+            plan = copy.copy(self)
+            plan.keys = [name for name in self.keys if name in key]
+            plan.lookups = {name: self.lookups[name] for name in plan.keys}
+            plan.converters = [(name, converter) for name, converter in self.converters if name in key]
+            plan._subsets = {}
+            self._subsets[key] = plan
+        return plan
+
+    def values(self, queryset, extra=()):
+        """
+        Retourne ``queryset.values()`` restreint aux colonnes du plan.
+
+        Les clés des lignes sont directement les noms de champs de sortie ;
+        ``extra`` ajoute des colonnes supplémentaires (ex. champs de tri).
+        """
+        fields = [name for name in self.keys if self.lookups[name] == name]
+        expressions = {
+            name: F(lookup) for name, lookup in self.lookups.items() if lookup != name
+        }
+        fields += [field for field in extra if field not in self.lookups]
+        return queryset.values(*fields, **expressions)
+
+    def to_representation(self, row):
+        data = {key: row[key] for key in self.keys}
+        for key, converter in self.converters:
+            value = data[key]
+            if value is not None:
+                data[key] = converter(value)
+        return data
+
+
+class ValuesSerializer:
+    """
+    Serializer en lecture seule construit sur les lignes ``.values()``.
+
+    Les sous-classes indiquent le ModelSerializer de référence dans
+    ``serializer_class`` ; la sortie est identique à celle de ce dernier.
+    Utilisation :
+
+        rows = VehiculeValuesSerializer.values(queryset)
+        serializer = VehiculeValuesSerializer(rows, many=True)
+        serializer.data
+
+    ``fields`` (voir ``requested_fields``) restreint les colonnes lues et la
+    sortie ; il doit être le même pour ``values()`` et le serializer.
+    """
+    serializer_class = None
+
+    def __init__(self, instance, many=False, fields=None):
+        self.instance = instance
+        self.many = many
+        self.fields = fields
+
+    @classmethod
+    def get_plan(cls, fields=None):
+        # Compilé au premier appel puis conservé sur la classe
+        plan = cls.__dict__.get('_plan')
+        if plan is None:
+            plan = FieldPlan(cls.serializer_class)
+            cls._plan = plan
+        return plan if fields is None else plan.subset(fields)
+
+    @classmethod
+    def values(cls, queryset, extra=(), fields=None):
+        return cls.get_plan(fields).values(queryset, extra)
+
+    @property
+    def data(self):
+        plan = self.get_plan(self.fields)
+        with profiling.phase('serialize'):
+            if self.many:
+                return ReturnList(
+                    [plan.to_representation(row) for row in self.instance],
+                    serializer=self
+                )
+            return ReturnDict(plan.to_representation(self.instance), serializer=self)
+
+
+class ConcessionnaireValuesSerializer(ValuesSerializer):
+    """Équivalent rapide de ConcessionnaireSerializer (siret exclu)."""
+    serializer_class = ConcessionnaireSerializer
+
+
+class VehiculeValuesSerializer(ValuesSerializer):
+    """Équivalent rapide de VehiculeSerializer."""
+    serializer_class = VehiculeSerializer
+
+
+class VehiculeDetailValuesSerializer(ValuesSerializer):
+    """Équivalent rapide de VehiculeDetailSerializer."""
+    serializer_class = VehiculeDetailSerializer
+
+
+def requested_fields(request, values_serializer_class):
+    """
+    Champs demandés par ``?fields=a,b`` (None : tous les champs).
+
+    Seuls les champs du plan sont acceptés (400 sinon) : 'siret' ne peut
+    jamais être demandé.
+    """
+    value = request.query_params.get(FIELDS_QUERY_PARAM)
+    if not value:
+        return None
+    fields = [name.strip() for name in value.split(',') if name.strip()]
+    available = values_serializer_class.get_plan().keys
+    unknown = [name for name in fields if name not in available]
+    if unknown:
+        raise serializers.ValidationError({
+            FIELDS_QUERY_PARAM: [
+                f'Champ inconnu : {name}. Champs disponibles : {", ".join(available)}.'
+                for name in unknown
+            ]
+        })
+    return fields or None
+
+
+def _compile_converter(field):
+    """Retourne la fonction de conversion d'un champ, ou None si inutile."""
+    if isinstance(field, serializers.PrimaryKeyRelatedField):
+        # .values() renvoie déjà la clé primaire de la relation
+        return field.pk_field.to_representation if field.pk_field else None
+    if type(field) in _IDENTITY_FIELDS:
+        return None
+    return field.to_representation
@@ -0,0 +1,107 @@
+"""
+Filtres et tris de la liste des véhicules d'un concessionnaire.
+
+VehiculeFilterSerializer valide les paramètres de requête (type, marque,
+plages de chevaux et de prix HT, tri) et les applique au queryset. Chaque
+combinaison filtre/tri est servie par un des index composites de
+``Vehicule.Meta.indexes`` (tous commencent par concessionnaire), celui du
+tri : la page est lue dans l'ordre de l'index, sans tri des résultats ; la
+commande ``manage.py check_query_plans`` le vérifie avec EXPLAIN QUERY PLAN.
+
+Une plage de valeurs sur une autre colonne que celle du tri (ex. prix HT
+maximal, tri par marque) est appliquée sur ``colonne + 0``, une expression
+qu'aucun index ne sert. Sans cela, SQLite (sans statistiques ANALYZE)
+préfère l'index de la colonne filtrée et trie toutes les lignes retenues à
+chaque page (USE TEMP B-TREE FOR ORDER BY).
+"""
+
+from django.db.models import F
+from rest_framework import serializers
+
+from .models import Vehicule
+
+# Valeur du paramètre ``ordering`` -> tri appliqué. ``id`` suit le sens du
+# premier champ pour que l'index puisse être parcouru dans un seul sens.
+ORDERINGS = {
+    'marque': ('marque', 'type', 'id'),
+    '-marque': ('-marque', '-type', '-id'),
+    'prix_ht': ('prix_ht', 'id'),
+    '-prix_ht': ('-prix_ht', '-id'),
+    'chevaux': ('chevaux', 'id'),
+    '-chevaux': ('-chevaux', '-id'),
+}
+
+# Paramètre de filtre -> lookup ORM
+LOOKUPS = {
+    'type': 'type',
+    'marque': 'marque',
+    'chevaux_min': 'chevaux__gte',
+    'chevaux_max': 'chevaux__lte',
+    'prix_ht_min': 'prix_ht__gte',
+    'prix_ht_max': 'prix_ht__lte',
+}
+# Paramètre de plage -> colonne filtrée
+RANGES = {
+    'chevaux_min': 'chevaux',
+    'chevaux_max': 'chevaux',
+    'prix_ht_min': 'prix_ht',
+    'prix_ht_max': 'prix_ht',
+}
+
+
+class VehiculeFilterSerializer(serializers.Serializer):
+    """
+    Paramètres de filtrage et de tri de GET /api/concessionnaires/<id>/vehicules/.
+
+    Tous les paramètres sont optionnels ; les autres paramètres de la requête
+    (cursor, page_size, stream...) sont ignorés.
+    """
+    type = serializers.ChoiceField(
+        choices=Vehicule.TYPE_CHOICES,
+        required=False,
+        help_text='Type de véhicule (auto ou moto)'
+    )
+    marque = serializers.CharField(
+        max_length=64,
+        required=False,
+        help_text='Marque exacte'
+    )
+    chevaux_min = serializers.IntegerField(required=False, help_text='Puissance minimale')
+    chevaux_max = serializers.IntegerField(required=False, help_text='Puissance maximale')
+    prix_ht_min = serializers.FloatField(required=False, help_text='Prix HT minimal')
+    prix_ht_max = serializers.FloatField(required=False, help_text='Prix HT maximal')
+    ordering = serializers.ChoiceField(
+        choices=list(ORDERINGS),
+        required=False,
+        help_text='Tri des résultats (préfixe - pour un tri décroissant)'
+    )
+
+    def validate(self, attrs):
+        for field in ('chevaux', 'prix_ht'):
+            minimum = attrs.get(f'{field}_min')
+            maximum = attrs.get(f'{field}_max')
+            if minimum is not None and maximum is not None and minimum > maximum:
+                raise serializers.ValidationError(
+                    {f'{field}_min': f'Doit être inférieur ou égal à {field}_max.'}
+                )
+        return attrs
+
+    def filter_queryset(self, queryset):
+        sorted_by = (self.get_ordering() or Vehicule._meta.ordering)[0].lstrip('-')
+        filters = {}
+        for name, lookup in LOOKUPS.items():
+            if name not in self.validated_data:
+                continue
+            field = RANGES.get(name)
+            if field is not None and field != sorted_by:
+                # Plage hors de la colonne du tri : condition non indexable (voir la docstring du module)
+                alias = f'{field}_hors_index'
+                queryset = queryset.alias(**{alias: F(field) + 0})
+                lookup = alias + lookup[len(field):]
+            filters[lookup] = self.validated_data[name]
+        return queryset.filter(**filters)
+
+    def get_ordering(self):
+        """Tri demandé, ou None pour le tri par défaut du modèle."""
+        ordering = self.validated_data.get('ordering')
+        return ORDERINGS[ordering] if ordering else None
@@ -0,0 +1,342 @@
+"""
+Encodage des corps de requête et de réponse : JSON et MessagePack.
+
+JSON : le codec est choisi par ``VEHICULES_JSON_CODEC`` :
+
+- ``'auto'`` (défaut) : orjson (extension C, dépendance optionnelle) s'il est
+  installé, sinon le module ``json`` de la bibliothèque standard ;
+- ``'orjson'`` ou ``'json'`` : codec imposé ;
+- chemin pointé d'une classe (ex. ``'monprojet.codecs.UJSONCodec'``) qui
+  expose ``dumps(data) -> bytes`` et ``loads(bytes)``.
+
+Les deux codecs intégrés produisent le même JSON que le JSONRenderer de DRF
+(compact, UTF-8 non échappé, U+2028/U+2029 échappés), à deux différences près
+pour orjson : l'écriture de quelques flottants extrêmes (``1e16`` au lieu de
+``1e+16``) et les flottants non finis (NaN, ±Infinity), écrits ``null`` là où
+DRF lève ValueError. orjson n'a pas d'option pour les refuser et les chercher
+dans les données coûterait plus que l'encodage lui-même. Les types non
+natifs (datetime, Decimal, UUID, chaînes paresseuses...) sont convertis par
+l'encodeur de DRF.
+
+MessagePack : le paquet ``msgpack`` (optionnel) s'il est installé, sinon une
+implémentation en Python pur des types utilisés par l'API (nil, booléens,
+entiers, flottants, chaînes, binaires, tableaux, dictionnaires).
+
+Utilisé par renderers.py et parsers.py.
+"""
+
+import json
+import struct
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.utils.module_loading import import_string
+from rest_framework.utils import encoders
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+
+def _default(obj):
+    # Conversion des types non natifs, comme le JSONRenderer de DRF
+    return _drf_encoder.default(obj)
+
+
+_drf_encoder = encoders.JSONEncoder()
+
+
+class StdlibJSONCodec:
+    """Module json de la bibliothèque standard, réglages du JSONRenderer de DRF."""
+    name = 'json'
+
+    def dumps(self, data):
+        content = json.dumps(
+            data,
+            cls=encoders.JSONEncoder,
+            ensure_ascii=False,
+            allow_nan=False,
+            separators=(',', ':')
+        )
+        # Valides en JSON mais pas en JavaScript (voir JSONRenderer)
+        content = content.replace('\u2028', '\\u2028').replace('\u2029', '\\u2029')
+        return content.encode()
+
+    def loads(self, content):
+        return json.loads(content, parse_constant=_reject_constant)
+
+
+def _reject_constant(name):
+    raise ValueError(f'Valeur JSON invalide : {name}')
+
+
+class OrjsonCodec:
+    """orjson : encodage et décodage en C."""
+    name = 'orjson'
+
+    def __init__(self):
+        if orjson is None:
+            raise ImproperlyConfigured('VEHICULES_JSON_CODEC = "orjson" : le paquet orjson n\'est pas installé.')
+        # datetime : format de DRF (millisecondes, 'Z') plutôt que celui d'orjson
+        self.options = orjson.OPT_PASSTHROUGH_DATETIME
+
+    def dumps(self, data):
+        content = orjson.dumps(data, default=_default, option=self.options)
+        if b'\xe2\x80\xa8' in content or b'\xe2\x80\xa9' in content:
+            content = content.replace(b'\xe2\x80\xa8', b'\\u2028').replace(b'\xe2\x80\xa9', b'\\u2029')
+        return content
+
+    def loads(self, content):
+        return orjson.loads(content)
+
+
+JSON_CODECS = {
+    'json': StdlibJSONCodec,
+    'orjson': OrjsonCodec,
+}
+
+_json_codec = (None, None)
+
+
+def get_json_codec():
+    """Codec JSON configuré (instance partagée, recréée si le réglage change)."""
+    global _json_codec
+    name = getattr(settings, 'VEHICULES_JSON_CODEC', 'auto')
+    configured, codec = _json_codec
+    if configured != name:
+        if name == 'auto':
+            codec = OrjsonCodec() if orjson is not None else StdlibJSONCodec()
+        elif name in JSON_CODECS:
+            codec = JSON_CODECS[name]()
+        else:
+            codec = import_string(name)()
+        _json_codec = (name, codec)
+    return codec
+
+
+class MsgpackCodec:
+    """Paquet msgpack (extension C)."""
+    name = 'msgpack'
+
+    def __init__(self):
+        if msgpack is None:
+            raise ImproperlyConfigured('Le paquet msgpack n\'est pas installé.')
+
+    def dumps(self, data):
+        return msgpack.packb(data, default=_default, use_bin_type=True)
+
+    def loads(self, content):
+        return msgpack.unpackb(content, raw=False, strict_map_key=False)
+
+
+class PurePythonMessagePackCodec:
+    """Implémentation en Python pur, utilisée lorsque msgpack n'est pas installé."""
+    name = 'python'
+
+    def dumps(self, data):
+        parts = []
+        _pack(data, parts.append)
+        return b''.join(parts)
+
+    def loads(self, content):
+        content = bytes(content)
+        value, offset = _unpack(content, 0)
+        if offset != len(content):
+            raise ValueError('Données MessagePack en trop après la valeur.')
+        return value
+
+
+def get_msgpack_codec():
+    return MsgpackCodec() if msgpack is not None else _pure_python_msgpack
+
+
+_pure_python_msgpack = PurePythonMessagePackCodec()
+
+# Encodage MessagePack (https://github.com/msgpack/msgpack/blob/master/spec.md)
+_UINT8, _UINT16, _UINT32, _UINT64 = struct.Struct('>B'), struct.Struct('>H'), struct.Struct('>I'), struct.Struct('>Q')
+_INT8, _INT16, _INT32, _INT64 = struct.Struct('>b'), struct.Struct('>h'), struct.Struct('>i'), struct.Struct('>q')
+_FLOAT32, _FLOAT64 = struct.Struct('>f'), struct.Struct('>d')
+# Profondeur maximale d'imbrication des conversions par _default
+_MAX_DEFAULT_DEPTH = 32
+
+
+def _pack_int(value, write):
+    if 0 <= value < 0x80:
+        write(_UINT8.pack(value))
+    elif -0x20 <= value < 0:
+        write(_INT8.pack(value))
+    elif value > 0:
+        if value <= 0xff:
+            write(b'\xcc' + _UINT8.pack(value))
+        elif value <= 0xffff:
+            write(b'\xcd' + _UINT16.pack(value))
+        elif value <= 0xffffffff:
+            write(b'\xce' + _UINT32.pack(value))
+        elif value <= 0xffffffffffffffff:
+            write(b'\xcf' + _UINT64.pack(value))
+        else:
+            raise OverflowError(f'Entier trop grand pour MessagePack : {value}')
+    elif value >= -0x80:
+        write(b'\xd0' + _INT8.pack(value))
+    elif value >= -0x8000:
+        write(b'\xd1' + _INT16.pack(value))
+    elif value >= -0x80000000:
+        write(b'\xd2' + _INT32.pack(value))
+    elif value >= -0x8000000000000000:
+        write(b'\xd3' + _INT64.pack(value))
+    else:
+        raise OverflowError(f'Entier trop petit pour MessagePack : {value}')
+
+
+def _pack_str(value, write):
+    encoded = value.encode()
+    length = len(encoded)
+    if length < 32:
+        write(_UINT8.pack(0xa0 | length) + encoded)
+    elif length <= 0xff:
+        write(b'\xd9' + _UINT8.pack(length) + encoded)
+    elif length <= 0xffff:
+        write(b'\xda' + _UINT16.pack(length) + encoded)
+    else:
+        write(b'\xdb' + _UINT32.pack(length) + encoded)
+
+
+def _pack_bin(value, write):
+    length = len(value)
+    if length <= 0xff:
+        write(b'\xc4' + _UINT8.pack(length))
+    elif length <= 0xffff:
+        write(b'\xc5' + _UINT16.pack(length))
+    else:
+        write(b'\xc6' + _UINT32.pack(length))
+    write(bytes(value))
+
+
+def _pack_header(length, fix, code16, code32, write):
+    if length < 16:
+        write(_UINT8.pack(fix | length))
+    elif length <= 0xffff:
+        write(code16 + _UINT16.pack(length))
+    else:
+        write(code32 + _UINT32.pack(length))
+
+
+def _pack(value, write, depth=0):
+    # Types exacts les plus fréquents d'abord, puis sous-classes (ReturnDict...)
+    kind = type(value)
+    if kind is str:
+        _pack_str(value, write)
+    elif value is None:
+        write(b'\xc0')
+    elif kind is bool:
+        write(b'\xc3' if value else b'\xc2')
+    elif kind is int:
+        _pack_int(value, write)
+    elif kind is float:
+        write(b'\xcb' + _FLOAT64.pack(value))
+    elif isinstance(value, dict):
+        _pack_header(len(value), 0x80, b'\xde', b'\xdf', write)
+        for key, item in value.items():
+            _pack(key, write, depth)
+            _pack(item, write, depth)
+    elif isinstance(value, (list, tuple)):
+        _pack_header(len(value), 0x90, b'\xdc', b'\xdd', write)
+        for item in value:
+            _pack(item, write, depth)
+    elif isinstance(value, str):
+        _pack_str(str(value), write)
+    elif isinstance(value, bool):
+        write(b'\xc3' if value else b'\xc2')
+    elif isinstance(value, int):
+        _pack_int(int(value), write)
+    elif isinstance(value, float):
+        write(b'\xcb' + _FLOAT64.pack(float(value)))
+    elif isinstance(value, (bytes, bytearray, memoryview)):
+        _pack_bin(value, write)
+    elif depth < _MAX_DEFAULT_DEPTH:
+        _pack(_default(value), write, depth + 1)
+    else:
+        raise TypeError(f'Type non sérialisable en MessagePack : {kind.__name__}')
+
+
+def _read(content, offset, size):
+    end = offset + size
+    if end > len(content):
+        raise ValueError('Données MessagePack tronquées.')
+    return content[offset:end], end
+
+
+def _unpack_struct(content, offset, fmt):
+    data, offset = _read(content, offset, fmt.size)
+    return fmt.unpack(data)[0], offset
+
+
+def _unpack_items(content, offset, length):
+    items = []
+    for _ in range(length):
+        item, offset = _unpack(content, offset)
+        items.append(item)
+    return items, offset
+
+
+def _unpack_map(content, offset, length):
+    result = {}
+    for _ in range(length):
+        key, offset = _unpack(content, offset)
+        if isinstance(key, list):
+            raise ValueError('Clé MessagePack invalide : tableau.')
+        result[key], offset = _unpack(content, offset)
+    return result, offset
+
+
+def _unpack(content, offset):
+    if offset >= len(content):
+        raise ValueError('Données MessagePack tronquées.')
+    code = content[offset]
+    offset += 1
+    if code < 0x80:
+        return code, offset
+    if code >= 0xe0:
+        return code - 0x100, offset
+    if 0xa0 <= code <= 0xbf:
+        data, offset = _read(content, offset, code & 0x1f)
+        return data.decode(), offset
+    if 0x90 <= code <= 0x9f:
+        return _unpack_items(content, offset, code & 0x0f)
+    if 0x80 <= code <= 0x8f:
+        return _unpack_map(content, offset, code & 0x0f)
+    if code == 0xc0:
+        return None, offset
+    if code in (0xc2, 0xc3):
+        return code == 0xc3, offset
+    if code in _NUMBERS:
+        return _unpack_struct(content, offset, _NUMBERS[code])
+    if code in _STRINGS:
+        length, offset = _unpack_struct(content, offset, _STRINGS[code])
+        data, offset = _read(content, offset, length)
+        return data.decode(), offset
+    if code in _BINARIES:
+        length, offset = _unpack_struct(content, offset, _BINARIES[code])
+        return _read(content, offset, length)
+    if code in (0xdc, 0xdd):
+        length, offset = _unpack_struct(content, offset, _UINT16 if code == 0xdc else _UINT32)
+        return _unpack_items(content, offset, length)
+    if code in (0xde, 0xdf):
+        length, offset = _unpack_struct(content, offset, _UINT16 if code == 0xde else _UINT32)
+        return _unpack_map(content, offset, length)
+    raise ValueError(f'Type MessagePack non pris en charge : 0x{code:02x}')
+
+
+_NUMBERS = {
+    0xca: _FLOAT32, 0xcb: _FLOAT64,
+    0xcc: _UINT8, 0xcd: _UINT16, 0xce: _UINT32, 0xcf: _UINT64,
+    0xd0: _INT8, 0xd1: _INT16, 0xd2: _INT32, 0xd3: _INT64,
+}
+_STRINGS = {0xd9: _UINT8, 0xda: _UINT16, 0xdb: _UINT32}
+_BINARIES = {0xc4: _UINT8, 0xc5: _UINT16, 0xc6: _UINT32}
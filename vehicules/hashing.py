@@ -0,0 +1,149 @@
+"""
+Hachage des mots de passe dans un pool de threads borné.
+
+Un hachage PBKDF2 (600 000 itérations) coûte plusieurs centaines de
+millisecondes de CPU. Exécuté sur le thread de la requête (création de compte,
+POST /api/token/), une rafale d'inscriptions ou de connexions occupe tous les
+threads du serveur et affame les lectures.
+
+PooledPBKDF2PasswordHasher (premier de PASSWORD_HASHERS) exécute chaque
+calcul dans un pool de ``VEHICULES_HASHING_WORKERS`` threads, avec au plus
+``VEHICULES_HASHING_QUEUE_SIZE`` calculs en attente : au-delà, la requête est
+refusée immédiatement (503 avec Retry-After) au lieu de bloquer un thread du
+serveur. La requête attend son hachage sur son thread : la somme des deux
+réglages doit rester inférieure au nombre de threads de chaque worker du
+serveur, afin que les autres threads restent disponibles pour les lectures.
+Le calcul PBKDF2 d'OpenSSL libère le GIL : les lectures continuent
+pendant les hachages.
+
+Tous les hachages passent par le pool (inscription, vérification d'un mot de
+passe par ModelBackend, y compris le hachage factice d'un utilisateur
+inconnu, administration). Le format des hachages (``pbkdf2_sha256``) ne change
+pas : les mots de passe existants restent valides.
+
+Le hasher lève HashingUnavailable, une exception sans lien avec DRF : elle
+est convertie en 503 par ``exception_handler`` (REST_FRAMEWORK) dans les vues
+de l'API et par HashingUnavailableMiddleware ailleurs (connexion à
+l'administration). Les commandes (createsuperuser, changepassword) ont leur
+propre pool, que leur unique hachage ne peut pas saturer.
+"""
+
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.contrib.auth.hashers import PBKDF2PasswordHasher
+from django.http import HttpResponse
+from rest_framework import status
+from rest_framework.exceptions import APIException
+from rest_framework.views import exception_handler as drf_exception_handler
+
+
+def get_workers():
+    """Nombre de threads de hachage ; 0 : hachage sur le thread de la requête."""
+    return getattr(settings, 'VEHICULES_HASHING_WORKERS', 2)
+
+
+def get_queue_size():
+    """Nombre de hachages pouvant attendre un thread libre avant de refuser (503)."""
+    return getattr(settings, 'VEHICULES_HASHING_QUEUE_SIZE', 2)
+
+
+MESSAGE = 'Trop de demandes d\'authentification en cours, réessayez dans un instant.'
+# En-tête Retry-After des réponses 503, en secondes
+RETRY_AFTER = 1
+
+
+class HashingUnavailable(Exception):
+    """Pool de hachage saturé : le calcul est refusé sans attendre."""
+
+
+class HashingUnavailableAPIException(APIException):
+    """HashingUnavailable dans une vue DRF."""
+    status_code = status.HTTP_503_SERVICE_UNAVAILABLE
+    default_detail = MESSAGE
+    default_code = 'hashing_unavailable'
+    # Lu par le gestionnaire d'exceptions de DRF : en-tête Retry-After
+    wait = RETRY_AFTER
+
+
+def exception_handler(exc, context):
+    """Gestionnaire d'exceptions DRF (REST_FRAMEWORK['EXCEPTION_HANDLER']) : 503 si le pool est saturé."""
+    if isinstance(exc, HashingUnavailable):
+        exc = HashingUnavailableAPIException()
+    return drf_exception_handler(exc, context)
+
+
+class HashingUnavailableMiddleware:
+    """503 pour les vues hors DRF (administration) lorsque le pool est saturé."""
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        return self.get_response(request)
+
+    def process_exception(self, request, exception):
+        if not isinstance(exception, HashingUnavailable):
+            return None
+        response = HttpResponse(MESSAGE, status=status.HTTP_503_SERVICE_UNAVAILABLE, content_type='text/plain')
+        response['Retry-After'] = str(RETRY_AFTER)
+        return response
+
+
+class HashingPool:
+    """Pool de threads borné avec refus immédiat lorsque la file est pleine."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._executor = None
+        self._slots = None
+        self._config = None
+
+    def run(self, func, *args):
+        """Exécute ``func(*args)`` dans le pool et retourne son résultat."""
+        executor, slots = self._get_executor()
+        if executor is None:
+            return func(*args)
+        # Une place par calcul en cours ou en attente
+        if not slots.acquire(blocking=False):
+            raise HashingUnavailable()
+        try:
+            future = executor.submit(func, *args)
+        except BaseException:
+            slots.release()
+            raise
+        future.add_done_callback(lambda _future: slots.release())
+        return future.result()
+
+    def _get_executor(self):
+        config = (get_workers(), get_queue_size())
+        with self._lock:
+            if config != self._config:
+                # Configuration modifiée (override_settings) : nouveau pool
+                if self._executor is not None:
+                    self._executor.shutdown(wait=False)
+                workers, queue_size = config
+                self._executor = ThreadPoolExecutor(
+                    max_workers=workers,
+                    thread_name_prefix='password-hashing'
+                ) if workers else None
+                self._slots = threading.BoundedSemaphore(workers + queue_size) if workers else None
+                self._config = config
+            return self._executor, self._slots
+
+
+pool = HashingPool()
+
+
+class PooledPBKDF2PasswordHasher(PBKDF2PasswordHasher):
+    """PBKDF2PasswordHasher dont les calculs passent par le pool de hachage."""
+
+    def encode(self, password, salt, iterations=None):
+        # verify() et harden_runtime() passent aussi par encode()
+        return pool.run(super().encode, password, salt, iterations)
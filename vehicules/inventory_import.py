@@ -0,0 +1,150 @@
+"""
+Import d'inventaires de véhicules (flux CSV ou JSONL).
+
+Utilisé par ``manage.py import_inventory``. Le fichier est lu en flux et
+découpé en paquets : la mémoire consommée ne dépend que de la taille d'un
+paquet, pas de celle du fichier. Chaque paquet est validé avec les règles de
+VehiculeSerializer puis inséré ou mis à jour (upsert sur concessionnaire +
+référence) avec ``bulk_create(update_conflicts=True)``.
+
+La validation (``validate_batch``) peut être répartie sur des processus de
+travail ; l'enregistrement (``save_batch``) reste dans le processus principal.
+Avec SQLite, des écritures parallèles sur le même fichier se disputent le
+verrou (chaque insertion alimente aussi l'index FTS5 par ses déclencheurs) et
+échouent en ``database is locked`` : un seul processus écrit.
+
+Colonnes attendues : siret, reference, type, marque, chevaux, prix_ht. Le
+concessionnaire est résolu par son siret grâce à une table chargée en mémoire
+une seule fois (transmise à chaque processus de travail).
+
+La référence est obligatoire : c'est la clé de l'upsert. Sans elle, chaque
+réimport du même fichier créerait des doublons (NULL n'entre jamais en
+conflit dans la contrainte d'unicité) ; une ligne sans référence est donc
+rejetée et comptée parmi les erreurs.
+"""
+
+import csv
+import gzip
+import io
+import itertools
+import json
+import sys
+
+from django.db import transaction
+
+from .bulk import VehiculeBulkValidator
+from .models import Concessionnaire, Vehicule
+
+UPDATE_FIELDS = ['type', 'marque', 'chevaux', 'prix_ht', 'modifie_le']
+MAX_REPORTED_ERRORS = 20
+
+# siret -> id du concessionnaire, initialisé par init_worker()
+_siret_map = {}
+_validator = None
+
+
+def load_siret_map():
+    return dict(Concessionnaire.objects.values_list('siret', 'id'))
+
+
+def init_worker(siret_map):
+    """Initialise un processus de travail (ou le processus courant)."""
+    global _siret_map, _validator
+    _siret_map = siret_map
+    _validator = VehiculeBulkValidator()
+
+
+def open_input(path):
+    """Ouvre le fichier en texte ; '-' pour l'entrée standard, .gz décompressé à la volée."""
+    if path == '-':
+        return io.TextIOWrapper(sys.stdin.buffer, encoding='utf-8', newline='')
+    if path.endswith('.gz'):
+        return gzip.open(path, 'rt', encoding='utf-8', newline='')
+    return open(path, encoding='utf-8', newline='')
+
+
+def detect_format(path):
+    name = path[:-3] if path.endswith('.gz') else path
+    return 'jsonl' if name.endswith(('.jsonl', '.ndjson')) else 'csv'
+
+
+def iter_rows(stream, input_format):
+    """Retourne (numéro de ligne, dictionnaire) pour chaque ligne du flux."""
+    if input_format == 'csv':
+        reader = csv.DictReader(stream)
+        for row in reader:
+            yield reader.line_num, row
+        return
+    for line_number, line in enumerate(stream, start=1):
+        if not line.strip():
+            continue
+        try:
+            yield line_number, json.loads(line)
+        except ValueError:
+            yield line_number, None
+
+
+def iter_batches(rows, batch_size):
+    rows = iter(rows)
+    while True:
+        batch = list(itertools.islice(rows, batch_size))
+        if not batch:
+            return
+        yield batch
+
+
+def validate_batch(batch):
+    """
+    Valide un paquet de (numéro de ligne, ligne), sans accès à la base.
+
+    Retourne (véhicules à enregistrer, nombre d'erreurs, premières erreurs) ;
+    chaque véhicule est un dictionnaire de valeurs de champs, transmis à
+    ``save_batch``.
+    """
+    errors = []
+    resolved = []
+    for line_number, row in batch:
+        if not isinstance(row, dict):
+            errors.append(f'ligne {line_number} : ligne illisible')
+            continue
+        concessionnaire_id = _siret_map.get((row.get('siret') or '').strip())
+        if concessionnaire_id is None:
+            errors.append(f'ligne {line_number} : siret inconnu {row.get("siret")!r}')
+            continue
+        reference = (row.get('reference') or '').strip()
+        if not reference:
+            errors.append(f'ligne {line_number} : reference manquante')
+            continue
+        if len(reference) > 64:
+            errors.append(f'ligne {line_number} : reference trop longue')
+            continue
+        resolved.append((line_number, concessionnaire_id, reference, row))
+
+    valid, invalid = _validator.validate([row for _, _, _, row in resolved])
+    for item in invalid:
+        line_number = resolved[item['index']][0]
+        errors.append(f'ligne {line_number} : {json.dumps(item["errors"], ensure_ascii=False)}')
+
+    # Dédoublonnage dans le paquet (la dernière ligne l'emporte) : un même
+    # véhicule ne peut pas être visé deux fois par un même INSERT ... ON CONFLICT
+    vehicules = {}
+    for index, data in valid:
+        _, concessionnaire_id, reference, _ = resolved[index]
+        vehicules[concessionnaire_id, reference] = {
+            'concessionnaire_id': concessionnaire_id,
+            'reference': reference,
+            **data
+        }
+    return list(vehicules.values()), len(errors), errors[:MAX_REPORTED_ERRORS]
+
+
+def save_batch(vehicules):
+    """Enregistre (upsert) les véhicules validés d'un paquet ; retourne les ids des concessionnaires touchés."""
+    with transaction.atomic():
+        Vehicule.objects.bulk_create(
+            [Vehicule(**values) for values in vehicules],
+            update_conflicts=True,
+            unique_fields=['concessionnaire', 'reference'],
+            update_fields=UPDATE_FIELDS,
+        )
+    return {values['concessionnaire_id'] for values in vehicules}
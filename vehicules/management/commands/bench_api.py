@@ -0,0 +1,133 @@
+"""
+Commande : python manage.py bench_api [--output benchmarks/latest.json]
+
+Rejoue chaque endpoint de l'API (routes de vehicules/urls.py et endpoints
+JWT, voir vehicules/benchmark.py) sur un jeu de données synthétique généré
+dans une transaction annulée, enregistre les mesures en JSON et les compare à
+la référence ``benchmarks/baseline.json``. Échoue (code de sortie non nul) en
+cas de régression, pour pouvoir être utilisée en CI.
+
+Par défaut le cache des réponses est désactivé : c'est le coût d'une
+reconstruction qui est mesuré (``--with-cache`` pour le comportement réel).
+"""
+
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.test.utils import override_settings
+
+from vehicules import benchmark
+from vehicules.cache import get_timeout
+from vehicules.models import Vehicule
+from vehicules.seeding import seed_inventory
+
+BENCHMARKS_DIR = Path(settings.BASE_DIR) / 'benchmarks'
+
+
+class Command(BaseCommand):
+    help = "Mesure la latence et le nombre de requêtes SQL de chaque endpoint de l'API."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--concessionnaires',
+            type=int,
+            default=50,
+            help='Nombre de concessionnaires générés (défaut : 50).'
+        )
+        parser.add_argument(
+            '--vehicules',
+            type=int,
+            default=20000,
+            help='Nombre de véhicules générés (défaut : 20000).'
+        )
+        parser.add_argument(
+            '--requests',
+            type=int,
+            default=200,
+            help='Nombre de requêtes par scénario (défaut : 200, dix fois moins pour les hachages).'
+        )
+        parser.add_argument(
+            '--seed',
+            type=int,
+            default=42,
+            help='Graine du générateur de données (défaut : 42).'
+        )
+        parser.add_argument(
+            '--with-cache',
+            action='store_true',
+            help='Mesurer avec le cache des réponses actif.'
+        )
+        parser.add_argument(
+            '--output',
+            type=Path,
+            default=BENCHMARKS_DIR / 'latest.json',
+            help='Fichier JSON des résultats (défaut : benchmarks/latest.json).'
+        )
+        parser.add_argument(
+            '--baseline',
+            type=Path,
+            default=BENCHMARKS_DIR / 'baseline.json',
+            help='Référence à comparer (défaut : benchmarks/baseline.json).'
+        )
+        parser.add_argument(
+            '--tolerance',
+            type=float,
+            default=0.5,
+            help='Hausse tolérée du p50 par rapport à la référence (défaut : 0.5, soit 50 %%).'
+        )
+        parser.add_argument(
+            '--save-baseline',
+            action='store_true',
+            help='Enregistrer aussi les résultats comme nouvelle référence.'
+        )
+
+    def handle(self, *args, **options):
+        if options['requests'] < 1:
+            raise CommandError('Au moins une requête par scénario est nécessaire.')
+
+        timeout = get_timeout() if options['with_cache'] else 0
+        with transaction.atomic(), override_settings(VEHICULES_CACHE_TIMEOUT=timeout):
+            ids = seed_inventory(options['concessionnaires'], options['vehicules'], seed=options['seed'])
+            # Le plus grand inventaire : le cas le plus coûteux
+            vehicule_ids = list(
+                Vehicule.objects.filter(concessionnaire_id=ids[0])
+                .order_by('pk').values_list('pk', flat=True)[:benchmark.BATCH_SIZE]
+            )
+            user = benchmark.create_user()
+            scenarios = benchmark.build_scenarios(ids[0], vehicule_ids, user)
+            missing = benchmark.missing_routes(scenarios)
+            if missing:
+                raise CommandError(f"Routes sans scénario de benchmark : {', '.join(missing)}")
+            results = benchmark.run(scenarios, user, options['requests'], stdout=self.stdout)
+            transaction.set_rollback(True)
+
+        meta = benchmark.metadata(
+            concessionnaires=options['concessionnaires'],
+            vehicules=options['vehicules'],
+            requests=options['requests'],
+            seed=options['seed'],
+            cache=options['with_cache'],
+        )
+        benchmark.save(options['output'], meta, results)
+        self.stdout.write(f"Résultats enregistrés dans {options['output']}.")
+        if options['save_baseline']:
+            benchmark.save(options['baseline'], meta, results)
+            self.stdout.write(f"Nouvelle référence enregistrée dans {options['baseline']}.")
+            return
+
+        if not options['baseline'].exists():
+            self.stdout.write(self.style.WARNING(
+                f"Aucune référence ({options['baseline']}) : relancer avec --save-baseline pour en créer une."
+            ))
+            return
+        baseline = benchmark.load(options['baseline'])
+        if any(baseline['meta'].get(key) != meta[key] for key in ('concessionnaires', 'vehicules', 'cache')):
+            self.stdout.write(self.style.WARNING('Paramètres différents de ceux de la référence.'))
+        lines, regressions = benchmark.compare(results, baseline, options['tolerance'])
+        for line in lines:
+            self.stdout.write(line)
+        if regressions:
+            raise CommandError('Régressions par rapport à la référence :\n' + '\n'.join(regressions))
+        self.stdout.write(self.style.SUCCESS('Aucune régression par rapport à la référence.'))
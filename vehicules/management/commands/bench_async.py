@@ -0,0 +1,107 @@
+"""
+Commande : python manage.py bench_async [--concurrency 1 50 500]
+
+Compare, sous ASGI, les vues synchrones (/api/...) et leurs variantes
+asynchrones (/api/async/..., voir vehicules/async_views.py) : pour chaque
+niveau de concurrence, les requêtes sont lancées en parallèle (asyncio) via le
+gestionnaire ASGI de Django (AsyncClient, sans serveur ni réseau), sur un jeu
+de données généré dans une transaction annulée et sans cache des réponses.
+
+Affiche la latence (p50, p95) et le débit de chaque chemin. Le chemin
+WSGI classique correspond au niveau de concurrence 1 des vues synchrones.
+"""
+
+import asyncio
+import statistics
+import time
+
+from asgiref.sync import async_to_sync
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.test import AsyncClient
+from django.test.utils import override_settings
+from rest_framework_simplejwt.tokens import AccessToken
+
+from vehicules.query_budget import create_fixtures
+
+
+class Command(BaseCommand):
+    help = 'Compare la latence et le débit des vues synchrones et asynchrones sous ASGI.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--concurrency',
+            type=int,
+            nargs='+',
+            default=[1, 50, 500],
+            help='Niveaux de concurrence (défaut : 1 50 500).'
+        )
+        parser.add_argument(
+            '--requests',
+            type=int,
+            default=1000,
+            help='Nombre minimal de requêtes par niveau et par endpoint (défaut : 1000).'
+        )
+        parser.add_argument(
+            '--size',
+            type=int,
+            default=200,
+            help='Nombre de véhicules du concessionnaire de test (défaut : 200).'
+        )
+
+    def handle(self, *args, **options):
+        with transaction.atomic(), override_settings(VEHICULES_CACHE_TIMEOUT=0):
+            kwargs = create_fixtures(options['size'], index=0)
+            user = get_user_model().objects.create_user('bench_async')
+            headers = {'Authorization': f'Bearer {AccessToken.for_user(user)}'}
+            paths = [
+                'concessionnaires/',
+                'concessionnaires/{id}/'.format(**kwargs),
+                'concessionnaires/{id}/vehicules/?ordering=-prix_ht'.format(**kwargs),
+                'concessionnaires/{id}/vehicules/{vehicule_id}/'.format(**kwargs),
+            ]
+            for path in paths:
+                self.stdout.write(path)
+                for concurrency in options['concurrency']:
+                    total = max(concurrency, options['requests'])
+                    for label, prefix in (('sync ', '/api/'), ('async', '/api/async/')):
+                        timings, elapsed = async_to_sync(_run)(
+                            prefix + path, headers, concurrency, total
+                        )
+                        self.stdout.write(
+                            f'  c={concurrency:<4} {label} p50={_ms(statistics.median(timings))} '
+                            f'p95={_ms(_percentile(timings, 95))} '
+                            f'{total / elapsed:8.0f} req/s'
+                        )
+            transaction.set_rollback(True)
+
+
+async def _run(url, headers, concurrency, total):
+    """Lance ``total`` requêtes, au plus ``concurrency`` à la fois ; retourne (latences, durée)."""
+    client = AsyncClient()
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def request():
+        async with semaphore:
+            start = time.perf_counter()
+            response = await client.get(url, headers=headers)
+            elapsed = time.perf_counter() - start
+        if response.status_code != 200:
+            raise RuntimeError(f'{url} : statut {response.status_code}')
+        return elapsed
+
+    # Requête de chauffe (cache des utilisateurs, connexions)
+    await request()
+    started = time.perf_counter()
+    timings = await asyncio.gather(*(request() for _ in range(total)))
+    return timings, time.perf_counter() - started
+
+
+def _percentile(values, percent):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * percent / 100))]
+
+
+def _ms(seconds):
+    return f'{seconds * 1000:7.2f} ms'
@@ -0,0 +1,265 @@
+"""
+Commande : python manage.py bench_db_concurrency [--readers 8 --writers 1 --duration 5]
+
+Charge mixte de lectures et d'écritures sur une copie temporaire de la base
+SQLite, pour chaque profil :
+
+- ``default`` : journal de rollback, aucun pragma, une connexion par requête
+  (réglages par défaut de Django) ;
+- ``production`` : profil ``production`` de vehicules/sqlite.py (WAL,
+  synchronous=NORMAL, cache, mmap, busy_timeout) et connexions persistantes
+  avec vérification.
+
+Pendant ``--duration`` secondes, des threads lecteurs enchaînent des
+requêtes de lecture (concessionnaire puis page de 50 véhicules, comme
+GET /api/concessionnaires/<id>/vehicules/) et des threads écrivains des
+transactions d'import (lot de véhicules insérés puis mis à jour, comme
+import_inventory). Chaque requête suit le cycle de vie des connexions de
+Django (close_if_unusable_or_obsolete en début et en fin de requête).
+
+Affiche le débit, la latence des lectures, les erreurs (« database is
+locked ») et le gain du profil ``production``.
+"""
+
+import random
+import shutil
+import sqlite3
+import statistics
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS, OperationalError, connections, transaction
+from django.db.models import F
+from django.test.utils import override_settings
+
+from vehicules import sqlite
+from vehicules.models import Concessionnaire, Vehicule
+
+ALIAS = 'bench_concurrency'
+PAGE_SIZE = 50
+# Profil -> (pragmas, CONN_MAX_AGE)
+PROFILES = {
+    'default': ({'journal_mode': 'delete'}, 0),
+    'production': (sqlite.PROFILES['production'], 60),
+}
+
+
+class Command(BaseCommand):
+    help = 'Compare les profils SQLite sous une charge mixte de lectures et d\'écritures.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--readers',
+            type=int,
+            default=8,
+            help='Nombre de threads lecteurs (défaut : 8).'
+        )
+        parser.add_argument(
+            '--writers',
+            type=int,
+            default=1,
+            help='Nombre de threads écrivains (défaut : 1).'
+        )
+        parser.add_argument(
+            '--duration',
+            type=float,
+            default=5,
+            help='Durée de chaque profil, en secondes (défaut : 5).'
+        )
+        parser.add_argument(
+            '--vehicules',
+            type=int,
+            default=20000,
+            help='Nombre de véhicules du concessionnaire lu (défaut : 20000).'
+        )
+        parser.add_argument(
+            '--batch',
+            type=int,
+            default=200,
+            help='Véhicules écrits par transaction d\'import (défaut : 200).'
+        )
+
+    def handle(self, *args, **options):
+        primary = connections[DEFAULT_DB_ALIAS]
+        if primary.vendor != 'sqlite':
+            raise CommandError('Benchmark réservé à SQLite.')
+        if options['readers'] < 1 or options['duration'] <= 0:
+            raise CommandError('Au moins un lecteur et une durée positive sont nécessaires.')
+
+        self.stdout.write(
+            f"{options['readers']} lecteurs, {options['writers']} écrivains (lots de {options['batch']}), "
+            f"{options['duration']:.0f} s par profil"
+        )
+        directory = Path(tempfile.mkdtemp(prefix='bench_db_concurrency-'))
+        results = {}
+        try:
+            for name, (pragmas, conn_max_age) in PROFILES.items():
+                path = directory / f'{name}.sqlite3'
+                self._copy_schema(primary, path)
+                connections.settings[ALIAS] = {
+                    **connections.settings[DEFAULT_DB_ALIAS],
+                    'NAME': str(path),
+                    'CONN_MAX_AGE': conn_max_age,
+                    'CONN_HEALTH_CHECKS': bool(conn_max_age),
+                }
+                try:
+                    with override_settings(VEHICULES_SQLITE_PROFILE='default', VEHICULES_SQLITE_PRAGMAS=pragmas):
+                        concessionnaire_id = self._create_fixtures(options['vehicules'])
+                        connections[ALIAS].close()
+                        results[name] = self._run(concessionnaire_id, options)
+                finally:
+                    # Connexion du thread principal créée avec les réglages de ce profil
+                    connections[ALIAS].close()
+                    del connections[ALIAS]
+                    del connections.settings[ALIAS]
+                self._report(name, results[name])
+        finally:
+            shutil.rmtree(directory, ignore_errors=True)
+
+        default, production = results['default'], results['production']
+        self.stdout.write(self.style.SUCCESS(
+            f"production / default : lectures x{_ratio(production['reads'], default['reads'])}, "
+            f"écritures x{_ratio(production['writes'], default['writes'])}"
+        ))
+
+    def _copy_schema(self, primary, path):
+        """Copie la base principale (schéma, index FTS5 et triggers) dans ``path``."""
+        primary.ensure_connection()
+        target = sqlite3.connect(path)
+        try:
+            primary.connection.backup(target)
+            # La copie d'une base en WAL l'est aussi : chaque profil part du journal par défaut
+            target.execute('PRAGMA journal_mode = delete')
+        finally:
+            target.close()
+
+    def _create_fixtures(self, size):
+        # bulk_create : pas de signaux (statistiques et cache, sur la base principale)
+        (concessionnaire,) = Concessionnaire.objects.using(ALIAS).bulk_create([Concessionnaire(
+            nom='Benchmark concurrence',
+            siret=f'98{random.randrange(10 ** 12):012d}'
+        )])
+        Vehicule.objects.using(ALIAS).bulk_create([
+            Vehicule(
+                type='auto' if i % 2 else 'moto',
+                marque=f'Marque {i % 7}',
+                chevaux=80 + i % 300,
+                prix_ht=10000.0 + i,
+                concessionnaire_id=concessionnaire.pk
+            )
+            for i in range(size)
+        ], batch_size=5000)
+        return concessionnaire.pk
+
+    def _run(self, concessionnaire_id, options):
+        stop = threading.Event()
+        lock = threading.Lock()
+        result = {'read_times': [], 'reads': 0, 'writes': 0, 'rows': 0, 'read_errors': 0, 'write_errors': 0}
+
+        def reader():
+            rng = random.Random()
+            while not stop.is_set():
+                started = time.perf_counter()
+                ok = _request(lambda: _read(concessionnaire_id, rng, options['vehicules']))
+                elapsed = time.perf_counter() - started
+                with lock:
+                    if ok:
+                        result['reads'] += 1
+                        result['read_times'].append(elapsed)
+                    else:
+                        result['read_errors'] += 1
+
+        def writer():
+            while not stop.is_set():
+                ok = _request(lambda: _write(concessionnaire_id, options['batch']))
+                with lock:
+                    if ok:
+                        result['writes'] += 1
+                        result['rows'] += options['batch']
+                    else:
+                        result['write_errors'] += 1
+
+        threads = (
+            [threading.Thread(target=_in_thread(reader)) for _ in range(options['readers'])]
+            + [threading.Thread(target=_in_thread(writer)) for _ in range(options['writers'])]
+        )
+        started = time.monotonic()
+        for thread in threads:
+            thread.start()
+        time.sleep(options['duration'])
+        stop.set()
+        for thread in threads:
+            thread.join()
+        duration = time.monotonic() - started
+        return {
+            'reads': result['reads'] / duration,
+            'writes': result['writes'] / duration,
+            'rows': result['rows'] / duration,
+            'read_p50_ms': statistics.median(result['read_times']) * 1000 if result['read_times'] else 0,
+            'read_p95_ms': _percentile(result['read_times'], 95) * 1000 if result['read_times'] else 0,
+            'read_errors': result['read_errors'],
+            'write_errors': result['write_errors'],
+        }
+
+    def _report(self, name, result):
+        self.stdout.write(
+            f"{name:12} lectures {result['reads']:8.1f} req/s  p50={result['read_p50_ms']:7.2f} ms  "
+            f"p95={result['read_p95_ms']:7.2f} ms  ({result['read_errors']} erreurs)  "
+            f"écritures {result['writes']:6.1f} tx/s = {result['rows']:8.0f} lignes/s  "
+            f"({result['write_errors']} erreurs)"
+        )
+
+
+def _read(concessionnaire_id, rng, size):
+    Concessionnaire.objects.using(ALIAS).get(pk=concessionnaire_id)
+    return list(
+        Vehicule.objects.using(ALIAS)
+        .filter(concessionnaire_id=concessionnaire_id, prix_ht__gte=10000.0 + rng.randrange(size))
+        .order_by('prix_ht', 'id')
+        .values('id', 'type', 'marque', 'chevaux', 'prix_ht', 'reference')[:PAGE_SIZE]
+    )
+
+
+def _write(concessionnaire_id, batch):
+    with transaction.atomic(using=ALIAS):
+        created = Vehicule.objects.using(ALIAS).bulk_create([
+            Vehicule(type='auto', marque='Import', chevaux=100, prix_ht=5000.0, concessionnaire_id=concessionnaire_id)
+            for _ in range(batch)
+        ])
+        Vehicule.objects.using(ALIAS).filter(pk__in=[vehicule.pk for vehicule in created]).update(
+            prix_ht=F('prix_ht') + 1
+        )
+
+
+def _request(operation):
+    """Une requête : connexions vérifiées ou fermées au début et à la fin, comme dans Django."""
+    connection = connections[ALIAS]
+    connection.close_if_unusable_or_obsolete()
+    try:
+        operation()
+        return True
+    except OperationalError:
+        return False
+    finally:
+        connection.close_if_unusable_or_obsolete()
+
+
+def _in_thread(target):
+    def run():
+        try:
+            target()
+        finally:
+            connections[ALIAS].close()
+    return run
+
+
+def _percentile(values, percent):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * percent / 100))]
+
+
+def _ratio(new, old):
+    return f'{new / old:.1f}' if old else '∞'
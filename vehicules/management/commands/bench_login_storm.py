@@ -0,0 +1,157 @@
+"""
+Commande : python manage.py bench_login_storm [--logins 64 --server-threads 8]
+
+Test de charge : latence des lectures (GET /api/concessionnaires/<id>/vehicules/)
+pendant une rafale de connexions (POST /api/token/), avec le hachage des mots
+de passe sur le thread de la requête (VEHICULES_HASHING_WORKERS=0) puis dans le
+pool borné de vehicules/hashing.py.
+
+Le serveur est simulé par un pool de ``--server-threads`` threads (comme les
+threads d'un worker gunicorn) qui traite les requêtes dans leur ordre
+d'arrivée : la latence mesurée d'une lecture inclut son attente d'un thread
+libre. Les données de test sont enregistrées (les threads ont chacun leur
+connexion) puis supprimées à la fin.
+"""
+
+import statistics
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.test import Client
+from django.test.utils import override_settings
+from rest_framework_simplejwt.tokens import AccessToken
+
+from vehicules import hashing
+from vehicules.models import Concessionnaire
+from vehicules.query_budget import create_fixtures
+
+USERNAME = 'bench_login_storm'
+PASSWORD = 'bench-login-storm-1'
+
+
+class Command(BaseCommand):
+    help = 'Mesure la latence des lectures pendant une rafale de connexions.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--logins',
+            type=int,
+            default=64,
+            help='Nombre de connexions simultanées de la rafale (défaut : 64).'
+        )
+        parser.add_argument(
+            '--server-threads',
+            type=int,
+            default=8,
+            help='Nombre de threads du serveur simulé (défaut : 8).'
+        )
+        parser.add_argument(
+            '--read-interval',
+            type=float,
+            default=0.02,
+            help='Intervalle entre deux lectures, en secondes (défaut : 0.02).'
+        )
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=hashing.get_workers() or 2,
+            help='Threads du pool de hachage pour le scénario « pool » (défaut : VEHICULES_HASHING_WORKERS).'
+        )
+        parser.add_argument(
+            '--queue-size',
+            type=int,
+            default=hashing.get_queue_size(),
+            help='File d\'attente du pool pour le scénario « pool » (défaut : VEHICULES_HASHING_QUEUE_SIZE).'
+        )
+
+    def handle(self, *args, **options):
+        kwargs = create_fixtures(50, index=0)
+        user = get_user_model().objects.create_user(USERNAME, password=PASSWORD)
+        self.read_url = '/api/concessionnaires/{id}/vehicules/'.format(**kwargs)
+        self.read_headers = {'HTTP_AUTHORIZATION': f'Bearer {AccessToken.for_user(user)}'}
+        try:
+            self.stdout.write(
+                f"{options['logins']} connexions, {options['server_threads']} threads serveur, "
+                f"une lecture toutes les {options['read_interval'] * 1000:.0f} ms"
+            )
+            self._report('sans rafale', self._run(0, options))
+            with override_settings(VEHICULES_HASHING_WORKERS=0):
+                self._report('hachage inline', self._run(options['logins'], options))
+            with override_settings(
+                VEHICULES_HASHING_WORKERS=options['workers'],
+                VEHICULES_HASHING_QUEUE_SIZE=options['queue_size']
+            ):
+                self._report(
+                    f"pool ({options['workers']}+{options['queue_size']})",
+                    self._run(options['logins'], options)
+                )
+        finally:
+            Concessionnaire.objects.filter(pk=kwargs['id']).delete()
+            user.delete()
+
+    def _run(self, logins, options):
+        """Lance la rafale et des lectures régulières jusqu'à sa fin ; retourne les mesures."""
+        server = ThreadPoolExecutor(max_workers=options['server_threads'])
+        login_statuses = [server.submit(_request, self._login) for _ in range(logins)]
+        reads = []
+        started = time.monotonic()
+        # Au moins une seconde de lectures, et jusqu'à la fin de la rafale
+        while time.monotonic() - started < 1 or not all(f.done() for f in login_statuses):
+            reads.append((time.perf_counter(), server.submit(_request, self._read)))
+            time.sleep(options['read_interval'])
+        server.shutdown(wait=True)
+        statuses = [f.result()[0] for f in login_statuses]
+        return {
+            'reads': [f.result()[1] - submitted for submitted, f in reads],
+            'read_errors': sum(f.result()[0] != 200 for _submitted, f in reads),
+            'logins': {code: statuses.count(code) for code in sorted(set(statuses))},
+            'duration': time.monotonic() - started,
+        }
+
+    def _login(self, client):
+        return client.post(
+            '/api/token/',
+            {'username': USERNAME, 'password': PASSWORD},
+            content_type='application/json'
+        )
+
+    def _read(self, client):
+        return client.get(self.read_url, **self.read_headers)
+
+    def _report(self, label, result):
+        reads = result['reads']
+        logins = ', '.join(f'{count}×{code}' for code, count in result['logins'].items()) or '-'
+        self.stdout.write(
+            f'{label:22} lectures p50={_ms(statistics.median(reads))} '
+            f'p95={_ms(_percentile(reads, 95))} max={_ms(max(reads))} '
+            f"({len(reads)}, {result['read_errors']} erreurs)  "
+            f"connexions : {logins} en {result['duration']:.1f} s"
+        )
+
+
+_local = threading.local()
+
+
+def _request(send):
+    """Exécute une requête sur le thread courant ; retourne (statut, instant de fin)."""
+    client = getattr(_local, 'client', None)
+    if client is None:
+        client = _local.client = Client()
+    try:
+        return send(client).status_code, time.perf_counter()
+    finally:
+        # Le client de test ne ferme pas les connexions en fin de requête
+        connection.close()
+
+
+def _percentile(values, percent):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * percent / 100))]
+
+
+def _ms(seconds):
+    return f'{seconds * 1000:8.1f} ms'
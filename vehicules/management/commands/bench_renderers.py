@@ -0,0 +1,101 @@
+"""
+Commande : python manage.py bench_renderers
+
+Compare le JSONRenderer / JSONParser de DRF (module json de la bibliothèque
+standard) aux codecs de vehicules/formats.py (json, orjson, MessagePack) sur
+la liste sérialisée d'un inventaire généré dans une transaction annulée
+(10 000 véhicules par défaut). Vérifie au passage que chaque codec restitue
+les données à l'identique et signale les sorties JSON qui diffèrent de celle
+de DRF.
+"""
+
+import io
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+
+from vehicules import formats
+from vehicules.fast_serializers import VehiculeValuesSerializer
+from vehicules.models import Vehicule
+from vehicules.query_budget import create_fixtures
+
+
+class Command(BaseCommand):
+    help = 'Mesure l\'encodage et le décodage JSON / MessagePack d\'une grande liste de véhicules.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--size',
+            type=int,
+            default=10000,
+            help='Nombre de véhicules générés (défaut : 10000).'
+        )
+        parser.add_argument(
+            '--repeat',
+            type=int,
+            default=5,
+            help='Nombre de répétitions, le meilleur temps est retenu (défaut : 5).'
+        )
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            kwargs = create_fixtures(options['size'], index=0)
+            data = VehiculeValuesSerializer(
+                VehiculeValuesSerializer.values(Vehicule.objects.filter(concessionnaire_id=kwargs['id'])),
+                many=True
+            ).data
+            transaction.set_rollback(True)
+
+        repeat = options['repeat']
+        renderer, parser = JSONRenderer(), JSONParser()
+        reference = renderer.render(data)
+        expected = parser.parse(io.BytesIO(reference))
+        render_time = _best_of(lambda: renderer.render(data), repeat)
+        parse_time = _best_of(lambda: parser.parse(io.BytesIO(reference)), repeat)
+        self.stdout.write(f'{len(data)} véhicules, JSON de {len(reference) / 1024:.0f} Kio')
+        self.stdout.write(self._line('DRF (json)', render_time, parse_time, len(reference)))
+
+        for name, codec in self._codecs():
+            content = codec.dumps(data)
+            if codec.loads(content) != expected:
+                raise CommandError(f'{name} : les données décodées diffèrent des données encodées.')
+            if name.startswith('json') and content != reference:
+                self.stdout.write(self.style.WARNING(f'{name} : sortie différente de celle du JSONRenderer de DRF.'))
+            codec_render = _best_of(lambda: codec.dumps(data), repeat)
+            codec_parse = _best_of(lambda: codec.loads(content), repeat)
+            self.stdout.write(
+                self._line(name, codec_render, codec_parse, len(content))
+                + f'  gain encodage=x{render_time / codec_render:.1f} décodage=x{parse_time / codec_parse:.1f}'
+            )
+
+    def _codecs(self):
+        codecs = [('json / stdlib', formats.StdlibJSONCodec())]
+        if formats.orjson is not None:
+            codecs.append(('json / orjson', formats.OrjsonCodec()))
+        else:
+            self.stdout.write('orjson non installé : codec ignoré.')
+        if formats.msgpack is not None:
+            codecs.append(('msgpack / msgpack', formats.MsgpackCodec()))
+        else:
+            self.stdout.write('msgpack non installé : implémentation en Python pur seule.')
+        codecs.append(('msgpack / python', formats.PurePythonMessagePackCodec()))
+        return codecs
+
+    def _line(self, name, render_time, parse_time, size):
+        return (
+            f'{name:18} encodage={render_time * 1000:8.1f} ms  '
+            f'décodage={parse_time * 1000:8.1f} ms  taille={size / 1024:7.0f} Kio'
+        )
+
+
+def _best_of(func, repeat):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
@@ -0,0 +1,99 @@
+"""
+Commande : python manage.py bench_search [--size 1000000]
+
+Mesure la latence de la recherche plein texte (FTS5, voir vehicules/search.py)
+sur un jeu de véhicules généré dans une transaction annulée, et la compare à
+une recherche ``icontains`` (parcours de toute la table) sur les mêmes mots.
+"""
+
+import statistics
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.db.models import Q
+
+from vehicules import search
+from vehicules.fast_serializers import VehiculeValuesSerializer
+from vehicules.models import Vehicule
+from vehicules.seeding import seed_inventory
+
+QUERIES = ['peu', 'peugeot', 'yam', 'harley', 'citroen', 'ga lyon', 'auto paris', 'aj12', 'zzz']
+
+
+class Command(BaseCommand):
+    help = 'Mesure la latence de la recherche plein texte des véhicules.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--size',
+            type=int,
+            default=100000,
+            help='Nombre de véhicules générés (défaut : 100000).'
+        )
+        parser.add_argument(
+            '--repeat',
+            type=int,
+            default=20,
+            help='Nombre de répétitions par recherche (défaut : 20).'
+        )
+        parser.add_argument(
+            '--limit',
+            type=int,
+            default=20,
+            help='Nombre de résultats par recherche (défaut : 20).'
+        )
+
+    def handle(self, *args, **options):
+        if not search.install():
+            raise CommandError('Recherche plein texte indisponible (SQLite avec FTS5 requis).')
+
+        with transaction.atomic():
+            started = time.monotonic()
+            seed_inventory(max(1, options['size'] // 2000), options['size'])
+            self.stdout.write(
+                f"{options['size']} véhicules générés et indexés en {time.monotonic() - started:.1f} s."
+            )
+            for query in QUERIES:
+                terms = search.split_terms(query)
+                fts = _timings(lambda: self._fts(terms, options['limit']), options['repeat'])
+                scan = _timings(lambda: self._scan(terms, options['limit']), 3)
+                self.stdout.write(
+                    f'{query!r:14} FTS5 p50={_ms(statistics.median(fts))} '
+                    f'p95={_ms(_percentile(fts, 95))} max={_ms(max(fts))}  '
+                    f'icontains p50={_ms(statistics.median(scan))}'
+                )
+            transaction.set_rollback(True)
+
+    def _fts(self, terms, limit):
+        # Même chemin que VehiculeSearchView
+        ids = search.search_ids(terms, limit)
+        return list(VehiculeValuesSerializer.values(Vehicule.objects.filter(pk__in=ids)))
+
+    def _scan(self, terms, limit):
+        queryset = Vehicule.objects.all()
+        for term in terms:
+            queryset = queryset.filter(
+                Q(marque__icontains=term)
+                | Q(reference__icontains=term)
+                | Q(concessionnaire__nom__icontains=term)
+            )
+        return list(VehiculeValuesSerializer.values(queryset.order_by('marque', 'id')[:limit]))
+
+
+def _timings(func, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return timings
+
+
+def _percentile(values, percent):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * percent / 100))]
+
+
+def _ms(seconds):
+    return f'{seconds * 1000:7.2f} ms'
@@ -0,0 +1,96 @@
+"""
+Commande : python manage.py bench_serializers
+
+Compare la sérialisation DRF classique (ModelSerializer) et le chemin rapide
+ValuesSerializer sur un jeu de véhicules généré dans une transaction annulée.
+Vérifie au passage que les deux sorties JSON sont identiques octet par octet.
+"""
+
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from rest_framework.renderers import JSONRenderer
+
+from vehicules.fast_serializers import (
+    ConcessionnaireValuesSerializer,
+    VehiculeValuesSerializer
+)
+from vehicules.models import Concessionnaire, Vehicule
+from vehicules.query_budget import create_fixtures
+from vehicules.serializers import ConcessionnaireSerializer, VehiculeSerializer
+
+
+class Command(BaseCommand):
+    help = 'Mesure le gain du ValuesSerializer par rapport au ModelSerializer.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--size',
+            type=int,
+            default=10000,
+            help='Nombre de véhicules générés (défaut : 10000).'
+        )
+        parser.add_argument(
+            '--repeat',
+            type=int,
+            default=5,
+            help='Nombre de répétitions, le meilleur temps est retenu (défaut : 5).'
+        )
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            kwargs = create_fixtures(options['size'], index=0)
+            cases = [
+                (
+                    'vehicules',
+                    lambda: VehiculeSerializer(
+                        Vehicule.objects.filter(concessionnaire_id=kwargs['id'])
+                        .select_related('concessionnaire'),
+                        many=True
+                    ).data,
+                    lambda: VehiculeValuesSerializer(
+                        VehiculeValuesSerializer.values(
+                            Vehicule.objects.filter(concessionnaire_id=kwargs['id'])
+                        ),
+                        many=True
+                    ).data,
+                ),
+                (
+                    'concessionnaires',
+                    lambda: ConcessionnaireSerializer(
+                        Concessionnaire.objects.all(), many=True
+                    ).data,
+                    lambda: ConcessionnaireValuesSerializer(
+                        ConcessionnaireValuesSerializer.values(Concessionnaire.objects.all()),
+                        many=True
+                    ).data,
+                ),
+            ]
+            for name, reference, fast in cases:
+                self._compare(name, reference, fast, options['repeat'])
+            transaction.set_rollback(True)
+
+    def _compare(self, name, reference, fast, repeat):
+        renderer = JSONRenderer()
+        expected = renderer.render(reference())
+        if renderer.render(fast()) != expected:
+            raise CommandError(f'{name} : la sortie du ValuesSerializer diffère du ModelSerializer.')
+
+        reference_time = _best_of(reference, repeat)
+        fast_time = _best_of(fast, repeat)
+        self.stdout.write(
+            f'{name:18} ModelSerializer={reference_time * 1000:8.1f} ms  '
+            f'ValuesSerializer={fast_time * 1000:8.1f} ms  '
+            f'gain=x{reference_time / fast_time:.1f}'
+        )
+
+
+def _best_of(func, repeat):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
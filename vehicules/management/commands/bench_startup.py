@@ -0,0 +1,89 @@
+"""
+Commande : python manage.py bench_startup [--runs 10]
+
+Mesure le démarrage à froid de concessionnaire_api/wsgi.py et asgi.py (voir
+vehicules/startup.py) : durée de l'import et de la première réponse, en
+médiane sur plusieurs processus neufs. Enregistre les mesures en JSON et les
+compare à la référence ``benchmarks/startup_baseline.json`` ; échoue (code de
+sortie non nul) en cas de régression, ou si la documentation OpenAPI est
+importée au démarrage.
+"""
+
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from vehicules import benchmark, startup
+
+BENCHMARKS_DIR = Path(settings.BASE_DIR) / 'benchmarks'
+
+
+class Command(BaseCommand):
+    help = "Mesure l'import et la première réponse des points d'entrée WSGI et ASGI."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--runs',
+            type=int,
+            default=10,
+            help='Nombre de processus lancés par point d\'entrée, la médiane est retenue (défaut : 10).'
+        )
+        parser.add_argument(
+            '--output',
+            type=Path,
+            default=BENCHMARKS_DIR / 'startup_latest.json',
+            help='Fichier JSON des résultats (défaut : benchmarks/startup_latest.json).'
+        )
+        parser.add_argument(
+            '--baseline',
+            type=Path,
+            default=BENCHMARKS_DIR / 'startup_baseline.json',
+            help='Référence à comparer (défaut : benchmarks/startup_baseline.json).'
+        )
+        parser.add_argument(
+            '--tolerance',
+            type=float,
+            default=0.3,
+            help='Hausse tolérée des médianes par rapport à la référence (défaut : 0.3, soit 30 %%).'
+        )
+        parser.add_argument(
+            '--save-baseline',
+            action='store_true',
+            help='Enregistrer aussi les résultats comme nouvelle référence.'
+        )
+
+    def handle(self, *args, **options):
+        if options['runs'] < 1:
+            raise CommandError('Au moins un processus par point d\'entrée est nécessaire.')
+
+        results = {}
+        for name in startup.ENTRY_POINTS:
+            try:
+                results[name] = startup.run(name, options['runs'], cwd=settings.BASE_DIR)
+            except RuntimeError as exc:
+                raise CommandError(str(exc))
+            self.stdout.write(startup.format_result(name, results[name]))
+
+        meta = benchmark.metadata(runs=options['runs'])
+        benchmark.save(options['output'], meta, results)
+        self.stdout.write(f"Résultats enregistrés dans {options['output']}.")
+        # Documentation OpenAPI importée au démarrage : régression quelle que soit la référence
+        regressions = startup.check(results)
+        if options['save_baseline'] and not regressions:
+            benchmark.save(options['baseline'], meta, results)
+            self.stdout.write(f"Nouvelle référence enregistrée dans {options['baseline']}.")
+            return
+
+        if options['baseline'].exists():
+            lines, slower = startup.compare(results, benchmark.load(options['baseline']), options['tolerance'])
+            for line in lines:
+                self.stdout.write(line)
+            regressions += slower
+        else:
+            self.stdout.write(self.style.WARNING(
+                f"Aucune référence ({options['baseline']}) : relancer avec --save-baseline pour en créer une."
+            ))
+        if regressions:
+            raise CommandError('Régressions du démarrage :\n' + '\n'.join(regressions))
+        self.stdout.write(self.style.SUCCESS('Aucune régression par rapport à la référence.'))
@@ -0,0 +1,50 @@
+"""
+Commande : python manage.py build_schema
+
+Génère le schéma OpenAPI servi par /api/schema/ et l'écrit en JSON et en YAML
+dans VEHICULES_SCHEMA_DIR (voir vehicules/openapi.py), pour que les
+processus du serveur le relisent au lieu de le générer. Avec --check, vérifie
+seulement que les artefacts existent et correspondent au code actuel.
+"""
+
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+
+from vehicules import openapi
+
+
+class Command(BaseCommand):
+    help = 'Génère le schéma OpenAPI précalculé (JSON et YAML).'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--directory',
+            help='Répertoire des artefacts (défaut : VEHICULES_SCHEMA_DIR).'
+        )
+        parser.add_argument(
+            '--check',
+            action='store_true',
+            help='Échoue si les artefacts sont absents ou obsolètes, sans les régénérer.'
+        )
+
+    def handle(self, *args, **options):
+        directory = options['directory'] or openapi.get_directory()
+        if not directory:
+            raise CommandError('VEHICULES_SCHEMA_DIR n\'est pas défini : utiliser --directory.')
+        directory = Path(directory)
+        current = openapi.fingerprint()
+
+        if options['check']:
+            if openapi.load(directory, current) is None:
+                raise CommandError(f'Schéma absent ou obsolète dans {directory} : lancer manage.py build_schema.')
+            self.stdout.write(self.style.SUCCESS(f'Schéma à jour dans {directory}.'))
+            return
+
+        artifact = openapi.build(current)
+        openapi.save(artifact, directory)
+        sizes = ', '.join(
+            f'openapi.{openapi.FORMATS[name][1]} ({len(content) / 1024:.0f} Kio)'
+            for name, content in artifact.contents.items()
+        )
+        self.stdout.write(self.style.SUCCESS(f'Schéma écrit dans {directory} : {sizes}.'))
@@ -0,0 +1,115 @@
+"""
+Commande : python manage.py check_import [--rows N] [--workers 1 2 4]
+
+Vérifie ``import_inventory`` avec plusieurs processus de travail : chaque
+nombre de processus importe deux fois le même fichier CSV généré, puis la
+commande contrôle le nombre de véhicules (upsert sans doublon), les lignes
+rejetées et les statistiques d'inventaire. Échoue (code de sortie non nul) en
+cas d'écart ou d'erreur d'import (ex. ``database is locked``), pour pouvoir
+être utilisée en CI.
+"""
+
+import csv
+import io
+import os
+import tempfile
+
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from vehicules import stats
+from vehicules.models import Concessionnaire, Vehicule
+
+CONCESSIONNAIRES = 3
+SIRET_PREFIX = '99'
+
+
+class Command(BaseCommand):
+    help = "Vérifie import_inventory avec plusieurs processus de travail."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--rows',
+            type=int,
+            default=5000,
+            help='Nombre de lignes valides du fichier importé (défaut : 5000).'
+        )
+        parser.add_argument(
+            '--workers',
+            type=int,
+            nargs='+',
+            default=[1, 2, 4],
+            help='Nombres de processus de travail testés (défaut : 1 2 4).'
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=500,
+            help='Nombre de lignes par lot (défaut : 500).'
+        )
+
+    def handle(self, *args, **options):
+        if options['rows'] < 1 or min(options['workers']) < 1:
+            raise CommandError('--rows et --workers doivent être strictement positifs.')
+
+        failures = []
+        for workers in options['workers']:
+            # Les données de test sont créées dans une transaction annulée à la fin
+            with transaction.atomic():
+                failures += self.check_workers(workers, options)
+                transaction.set_rollback(True)
+
+        if failures:
+            raise CommandError('Import incorrect :\n' + '\n'.join(failures))
+        self.stdout.write(self.style.SUCCESS('Import vérifié pour chaque nombre de processus.'))
+
+    def check_workers(self, workers, options):
+        concessionnaires = Concessionnaire.objects.bulk_create([
+            Concessionnaire(nom=f'Import {i}', siret=f'{SIRET_PREFIX}{i:012d}')
+            for i in range(CONCESSIONNAIRES)
+        ])
+        stats.rebuild([concessionnaire.pk for concessionnaire in concessionnaires])
+
+        handle, path = tempfile.mkstemp(suffix='.csv')
+        try:
+            with os.fdopen(handle, 'w', encoding='utf-8', newline='') as output:
+                self.write_inventory(output, concessionnaires, options['rows'])
+            failures = []
+            for attempt in ('import', 'réimport'):
+                stderr = io.StringIO()
+                try:
+                    call_command(
+                        'import_inventory', path,
+                        workers=workers,
+                        batch_size=options['batch_size'],
+                        stdout=io.StringIO(),
+                        stderr=stderr,
+                    )
+                except Exception as exc:
+                    return [f'--workers {workers}, {attempt} : {type(exc).__name__}: {exc}']
+                rejected = stderr.getvalue().count('reference manquante')
+                if rejected != 1:
+                    failures.append(f'--workers {workers}, {attempt} : {rejected} ligne(s) rejetée(s) au lieu de 1')
+        finally:
+            os.remove(path)
+
+        imported = Vehicule.objects.filter(concessionnaire__in=concessionnaires).count()
+        if imported != options['rows']:
+            failures.append(f'--workers {workers} : {imported} véhicules au lieu de {options["rows"]}')
+        failures += [f'--workers {workers} : {mismatch}' for mismatch in stats.check()]
+        self.stdout.write(f'--workers {workers:<3} {imported} véhicules, {len(failures)} écart(s)')
+        return failures
+
+    @staticmethod
+    def write_inventory(output, concessionnaires, rows):
+        writer = csv.writer(output)
+        writer.writerow(['siret', 'reference', 'type', 'marque', 'chevaux', 'prix_ht'])
+        for i in range(rows):
+            concessionnaire = concessionnaires[i % len(concessionnaires)]
+            writer.writerow([
+                concessionnaire.siret, f'CHK-{i}', 'auto' if i % 3 else 'moto',
+                'Peugeot', 50 + i % 300, 5000 + i,
+            ])
+        # Ligne sans référence : rejetée, jamais dupliquée
+        writer.writerow([concessionnaires[0].siret, '', 'auto', 'Peugeot', 90, 9000])
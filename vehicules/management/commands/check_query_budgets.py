@@ -0,0 +1,38 @@
+"""
+Commande : python manage.py check_query_budgets
+
+Vérifie que chaque endpoint GET de l'API vehicules respecte son budget de
+requêtes SQL, quel que soit le volume de données. Échoue (code de sortie non
+nul) en cas de dépassement, pour pouvoir être utilisée en CI.
+"""
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from vehicules.query_budget import check_query_budgets
+
+
+class Command(BaseCommand):
+    help = "Vérifie le budget de requêtes SQL de chaque endpoint de l'API vehicules."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--sizes',
+            type=int,
+            nargs='+',
+            default=[1, 50],
+            help='Nombres de véhicules des jeux de données testés (défaut : 1 50).'
+        )
+
+    def handle(self, *args, **options):
+        if min(options['sizes']) < 1:
+            raise CommandError('Chaque taille doit contenir au moins un véhicule.')
+
+        # Les données de test sont créées dans une transaction annulée à la fin
+        with transaction.atomic():
+            failures = check_query_budgets(options['sizes'], stdout=self.stdout)
+            transaction.set_rollback(True)
+
+        if failures:
+            raise CommandError('Budget de requêtes dépassé :\n' + '\n'.join(failures))
+        self.stdout.write(self.style.SUCCESS('Tous les budgets de requêtes sont respectés.'))
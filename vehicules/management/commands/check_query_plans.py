@@ -0,0 +1,98 @@
+"""
+Commande : python manage.py check_query_plans
+
+Vérifie avec EXPLAIN QUERY PLAN (SQLite) que chaque combinaison de filtres et
+de tris de la liste des véhicules (voir vehicules/filters.py), avec et sans
+curseur de pagination, est servie par une recherche dans un index commençant
+par concessionnaire, sans tri des lignes retenues (USE TEMP B-TREE) : le
+coût d'une page ne croît pas avec sa profondeur.
+Échoue (code de sortie non nul) dans le cas contraire.
+"""
+
+import itertools
+import re
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from vehicules.filters import ORDERINGS, VehiculeFilterSerializer
+from vehicules.models import Vehicule
+from vehicules.pagination import KeysetCursorPagination
+
+# Valeurs d'exemple : seul le plan d'exécution importe, pas les résultats
+FILTER_GROUPS = [
+    {'type': 'auto'},
+    {'marque': 'Peugeot'},
+    {'chevaux_min': 80, 'chevaux_max': 200},
+    {'prix_ht_min': 10000, 'prix_ht_max': 50000},
+]
+SAMPLE_ROW = {'marque': 'Peugeot', 'type': 'auto', 'prix_ht': 25000.0, 'chevaux': 120, 'id': 1}
+
+
+class Command(BaseCommand):
+    help = "Vérifie que chaque combinaison filtre/tri de la liste des véhicules utilise un index."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--verbose-plans',
+            action='store_true',
+            help="Affiche le plan d'exécution de chaque combinaison."
+        )
+
+    def handle(self, *args, **options):
+        if connection.vendor != 'sqlite':
+            raise CommandError('Cette vérification ne porte que sur les plans SQLite.')
+
+        expected = re.compile(
+            rf'SEARCH {Vehicule._meta.db_table} USING (COVERING )?INDEX \w+ '
+            rf'\(concessionnaire_id=\?'
+        )
+        # Tri de toutes les lignes retenues, à chaque page
+        sort = re.compile(r'USE TEMP B-TREE')
+        failures = []
+        total = 0
+        for params, with_cursor in self._combinations():
+            plan = self._explain(params, with_cursor)
+            total += 1
+            label = f'{params} curseur={with_cursor}'
+            if not expected.search(plan) or sort.search(plan):
+                failures.append(f'{label}\n    {plan}')
+            if options['verbose_plans']:
+                self.stdout.write(f'{label}\n    {plan}')
+
+        if failures:
+            raise CommandError(
+                'Combinaisons non servies par un index ou triées hors index :\n' + '\n'.join(failures)
+            )
+        self.stdout.write(self.style.SUCCESS(
+            f'{total} combinaisons filtre/tri servies par un index, sans tri.'
+        ))
+
+    def _combinations(self):
+        for size in range(len(FILTER_GROUPS) + 1):
+            for groups in itertools.combinations(FILTER_GROUPS, size):
+                for ordering in [None, *ORDERINGS]:
+                    params = {}
+                    for group in groups:
+                        params.update(group)
+                    if ordering:
+                        params['ordering'] = ordering
+                    yield params, False
+                    yield params, True
+
+    def _explain(self, params, with_cursor):
+        filters = VehiculeFilterSerializer(data=params)
+        filters.is_valid(raise_exception=True)
+        queryset = filters.filter_queryset(Vehicule.objects.filter(concessionnaire_id=1))
+
+        # Même tri et même condition de curseur que la pagination de la vue
+        paginator = KeysetCursorPagination()
+        paginator.ordering = filters.get_ordering()
+        paginator.ordering = paginator.get_ordering(None, queryset, None)
+        queryset = queryset.order_by(*paginator.ordering)
+        if with_cursor:
+            position = [SAMPLE_ROW[field.lstrip('-')] for field in paginator.ordering]
+            queryset = queryset.filter(paginator._build_keyset_filter(position, False))
+
+        plan = queryset[:paginator.page_size + 1].explain()
+        return ' / '.join(line.strip() for line in plan.splitlines())
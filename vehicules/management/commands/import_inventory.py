@@ -0,0 +1,126 @@
+"""
+Commande : python manage.py import_inventory <fichier> [--workers N]
+
+Importe un inventaire de véhicules au format CSV ou JSONL (éventuellement
+compressé en .gz, '-' pour l'entrée standard), en flux et par paquets, avec
+upsert sur (concessionnaire, reference). Voir vehicules/inventory_import.py.
+
+Avec --workers N, les processus de travail lisent et valident les lots ; le
+processus principal les enregistre un par un (un seul écrivain SQLite).
+"""
+
+import multiprocessing
+import time
+from collections import deque
+
+from django.core.management.base import BaseCommand, CommandError
+
+from vehicules import inventory_import
+from vehicules.signals import inventaires_modifies_en_masse
+
+
+class Command(BaseCommand):
+    help = "Importe un inventaire de véhicules (CSV ou JSONL) en flux, avec upsert par lots."
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help="Fichier à importer ('-' pour l'entrée standard).")
+        parser.add_argument(
+            '--format',
+            choices=['csv', 'jsonl'],
+            help="Format du fichier (déduit de l'extension par défaut)."
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=2000,
+            help='Nombre de lignes par lot (défaut : 2000).'
+        )
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=1,
+            help='Nombre de processus de travail (défaut : 1).'
+        )
+        parser.add_argument(
+            '--progress-every',
+            type=int,
+            default=100000,
+            help='Affiche la progression toutes les N lignes (défaut : 100000).'
+        )
+
+    def handle(self, *args, **options):
+        if options['batch_size'] < 1 or options['workers'] < 1:
+            raise CommandError('--batch-size et --workers doivent être strictement positifs.')
+
+        path = options['path']
+        input_format = options['format'] or inventory_import.detect_format(path)
+        siret_map = inventory_import.load_siret_map()
+        self.stdout.write(f'{len(siret_map)} concessionnaires chargés, format {input_format}.')
+
+        self.started = time.monotonic()
+        self.processed = self.saved = self.failed = 0
+        self.next_progress = options['progress_every']
+        self.concessionnaire_ids = set()
+
+        try:
+            with inventory_import.open_input(path) as stream:
+                batches = inventory_import.iter_batches(
+                    inventory_import.iter_rows(stream, input_format),
+                    options['batch_size']
+                )
+                if options['workers'] == 1:
+                    inventory_import.init_worker(siret_map)
+                    for batch in batches:
+                        self._record(len(batch), inventory_import.validate_batch(batch), options)
+                else:
+                    self._run_pool(batches, siret_map, options)
+        except OSError as exc:
+            raise CommandError(f'Lecture impossible : {exc}')
+        finally:
+            # Les lots ont été écrits sans signaux : marqueurs d'inventaire,
+            # statistiques et cache, y compris pour les lots enregistrés avant
+            # une erreur
+            if self.concessionnaire_ids:
+                inventaires_modifies_en_masse(self.concessionnaire_ids, vehicules_modifies=True)
+
+        elapsed = time.monotonic() - self.started
+        self.stdout.write(self.style.SUCCESS(
+            f'Terminé : {self.processed} lignes, {self.saved} véhicules enregistrés, '
+            f'{self.failed} erreurs en {elapsed:.1f} s '
+            f'({self.processed / elapsed if elapsed else 0:.0f} lignes/s).'
+        ))
+
+    def _run_pool(self, batches, siret_map, options):
+        # Les processus de travail valident sans accéder à la base
+        max_pending = options['workers'] * 2
+        with multiprocessing.Pool(
+            options['workers'],
+            initializer=inventory_import.init_worker,
+            initargs=(siret_map,)
+        ) as pool:
+            # Nombre de lots en attente borné : la lecture ne prend pas d'avance illimitée
+            pending = deque()
+            for batch in batches:
+                pending.append((len(batch), pool.apply_async(inventory_import.validate_batch, (batch,))))
+                if len(pending) >= max_pending:
+                    size, result = pending.popleft()
+                    self._record(size, result.get(), options)
+            while pending:
+                size, result = pending.popleft()
+                self._record(size, result.get(), options)
+
+    def _record(self, size, result, options):
+        vehicules, failed, errors = result
+        self.concessionnaire_ids |= inventory_import.save_batch(vehicules)
+        self.processed += size
+        self.saved += len(vehicules)
+        self.failed += failed
+        for error in errors:
+            self.stderr.write(error)
+        if self.processed >= self.next_progress:
+            self.next_progress += options['progress_every']
+            elapsed = time.monotonic() - self.started
+            self.stdout.write(
+                f'{self.processed} lignes traitées, {self.failed} erreurs, '
+                f'{self.processed / elapsed:.0f} lignes/s'
+            )
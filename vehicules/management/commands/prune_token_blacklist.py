@@ -0,0 +1,19 @@
+"""
+Commande : python manage.py prune_token_blacklist
+
+Supprime de la liste noire les tokens expirés (voir vehicules/blacklist.py).
+Chaque processus du serveur le fait déjà en arrière-plan ; la commande permet
+de le planifier (cron) lorsque cette purge est désactivée.
+"""
+
+from django.core.management.base import BaseCommand
+
+from vehicules import blacklist
+
+
+class Command(BaseCommand):
+    help = 'Supprime les tokens expirés de la liste noire.'
+
+    def handle(self, *args, **options):
+        deleted = blacklist.prune()
+        self.stdout.write(self.style.SUCCESS(f'{deleted} tokens expirés supprimés.'))
@@ -0,0 +1,40 @@
+"""
+Commande : python manage.py rebuild_inventory_stats [--check-only]
+
+Reconstruit entièrement la table InventaireStats à partir des véhicules, puis
+la compare aux données réelles (GROUP BY). Avec --check-only, la table n'est
+pas modifiée : seuls les écarts sont rapportés. Échoue (code de sortie non
+nul) si des écarts subsistent, pour pouvoir être utilisée en CI.
+"""
+
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from vehicules import stats
+
+
+class Command(BaseCommand):
+    help = "Reconstruit les statistiques d'inventaire des concessionnaires et les vérifie."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--check-only',
+            action='store_true',
+            help='Vérifie la table sans la reconstruire.'
+        )
+
+    def handle(self, *args, **options):
+        if not options['check_only']:
+            started = time.monotonic()
+            count = stats.rebuild()
+            self.stdout.write(
+                f'{count} concessionnaires reconstruits en {time.monotonic() - started:.2f} s.'
+            )
+
+        mismatches = stats.check()
+        if mismatches:
+            raise CommandError(
+                f'{len(mismatches)} écarts avec les données réelles :\n' + '\n'.join(mismatches)
+            )
+        self.stdout.write(self.style.SUCCESS('Statistiques conformes aux données réelles.'))
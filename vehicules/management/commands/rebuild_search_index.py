@@ -0,0 +1,37 @@
+"""
+Commande : python manage.py rebuild_search_index
+
+Reconstruit l'index de recherche plein texte des véhicules (table FTS5 et
+triggers SQLite, voir vehicules/search.py) à partir des tables. À lancer si
+l'index a été désynchronisé (écriture hors SQLite, restauration partielle...).
+"""
+
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS, transaction
+
+from vehicules import search
+
+
+class Command(BaseCommand):
+    help = "Reconstruit l'index de recherche plein texte des véhicules (SQLite FTS5)."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--database',
+            default=DEFAULT_DB_ALIAS,
+            help='Base de données à indexer (défaut : default).'
+        )
+
+    def handle(self, *args, **options):
+        using = options['database']
+        if not search.install(using):
+            raise CommandError('Recherche plein texte indisponible (SQLite avec FTS5 requis).')
+
+        started = time.monotonic()
+        with transaction.atomic(using=using):
+            count = search.rebuild(using)
+        self.stdout.write(self.style.SUCCESS(
+            f'{count} véhicules indexés en {time.monotonic() - started:.1f} s.'
+        ))
@@ -0,0 +1,68 @@
+"""
+Commande : python manage.py seed_inventory [--concessionnaires 100 --vehicules 100000]
+
+Génère des concessionnaires et des véhicules synthétiques, répartis de façon
+déséquilibrée (voir vehicules/seeding.py), pour les tests de charge et les
+benchmarks. Les données sont enregistrées dans la base configurée.
+"""
+
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from vehicules.models import Vehicule
+from vehicules.seeding import seed_inventory
+
+
+class Command(BaseCommand):
+    help = 'Génère des concessionnaires et des véhicules synthétiques.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--concessionnaires',
+            type=int,
+            default=100,
+            help='Nombre de concessionnaires (défaut : 100).'
+        )
+        parser.add_argument(
+            '--vehicules',
+            type=int,
+            default=100000,
+            help='Nombre total de véhicules (défaut : 100000).'
+        )
+        parser.add_argument(
+            '--skew',
+            type=float,
+            default=1.1,
+            help='Exposant de Zipf de la répartition par concessionnaire et par marque, 0 pour uniforme (défaut : 1.1).'
+        )
+        parser.add_argument(
+            '--seed',
+            type=int,
+            default=42,
+            help='Graine du générateur aléatoire (défaut : 42).'
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=5000,
+            help='Taille des paquets de bulk_create (défaut : 5000).'
+        )
+
+    def handle(self, *args, **options):
+        if options['concessionnaires'] < 1 or options['vehicules'] < 0:
+            raise CommandError('Au moins un concessionnaire et un nombre de véhicules positif sont requis.')
+
+        started = time.monotonic()
+        ids = seed_inventory(
+            options['concessionnaires'],
+            options['vehicules'],
+            seed=options['seed'],
+            skew=options['skew'],
+            batch_size=options['batch_size']
+        )
+        largest = Vehicule.objects.filter(concessionnaire_id=ids[0]).count()
+        self.stdout.write(self.style.SUCCESS(
+            f"{len(ids)} concessionnaires et {options['vehicules']} véhicules créés "
+            f'en {time.monotonic() - started:.1f} s (le plus grand inventaire : {largest} véhicules).'
+        ))
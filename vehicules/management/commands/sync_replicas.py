@@ -0,0 +1,61 @@
+"""
+Commande : python manage.py sync_replicas [--interval 5]
+
+Copie la base principale SQLite vers chaque réplique déclarée
+(``VEHICULES_DB_REPLICAS``, voir vehicules/db_router.py) avec l'API de
+sauvegarde de SQLite : copie cohérente, même pendant des écritures. Permet
+d'essayer le routage des lectures en local avec plusieurs fichiers SQLite ;
+avec ``--interval``, la copie est répétée, ce qui simule une réplication
+asynchrone (et son retard).
+
+En production, la réplication est assurée par le SGBD (ou par un outil comme
+Litestream pour SQLite), pas par cette commande.
+"""
+
+import sqlite3
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+
+from vehicules import db_router, sqlite
+
+
+class Command(BaseCommand):
+    help = 'Copie la base principale SQLite vers les répliques en lecture.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--interval',
+            type=float,
+            default=0,
+            help='Répéter la copie toutes les N secondes (défaut : 0, une seule copie).'
+        )
+
+    def handle(self, *args, **options):
+        primary = connections[db_router.PRIMARY]
+        # L'alias readonly désigne le fichier principal lui-même
+        replicas = [
+            alias for alias in db_router.get_replicas()
+            if sqlite.database_path(connections[alias].settings_dict) != sqlite.database_path(primary.settings_dict)
+        ]
+        if not replicas:
+            raise CommandError('Aucune réplique déclarée (variable VEHICULES_DB_REPLICA_FILES).')
+        if any(connections[alias].vendor != 'sqlite' for alias in [db_router.PRIMARY, *replicas]):
+            raise CommandError('Copie possible uniquement entre bases SQLite.')
+
+        while True:
+            started = time.monotonic()
+            primary.ensure_connection()
+            for alias in replicas:
+                target = sqlite3.connect(connections[alias].settings_dict['NAME'])
+                try:
+                    primary.connection.backup(target)
+                finally:
+                    target.close()
+            self.stdout.write(
+                f"{len(replicas)} réplique(s) synchronisée(s) en {(time.monotonic() - started) * 1000:.0f} ms."
+            )
+            if not options['interval']:
+                return
+            time.sleep(options['interval'])
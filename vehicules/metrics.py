@@ -0,0 +1,353 @@
+"""
+Métriques HTTP par route, agrégées entre les processus, au format Prometheus.
+
+MetricsMiddleware enregistre, pour chaque route nommée (``url_name`` et
+namespace de l'URL résolue) et chaque méthode :
+
+- le nombre de requêtes par classe de statut (2xx, 3xx, 4xx, 5xx) ;
+- le nombre d'erreurs (réponses 5xx, exceptions comprises) ;
+- un histogramme des latences (secondes) ;
+- un histogramme des tailles de réponse (octets, réponses non streamées).
+
+Stockage : chaque processus écrit ses compteurs dans son propre fichier
+``metrics-<pid>.bin`` du répertoire ``VEHICULES_METRICS_DIR`` (de préférence
+un tmpfs, ex. /dev/shm), projeté en mémoire (mmap) : un enregistrement coûte
+un verrou et quelques écritures en mémoire, sans appel système. La vue
+``metrics_view`` (GET /internal/metrics/, servie par n'importe quel worker)
+lit et additionne les fichiers de tous les processus. Les fichiers des
+processus arrêtés sont conservés (les compteurs restent monotones) : vider le
+répertoire au démarrage du serveur (ex. hook ``on_starting`` de gunicorn).
+Sans ``VEHICULES_METRICS_DIR``, les métriques restent en mémoire et ne
+couvrent que le processus qui répond.
+
+Format d'un fichier : un en-tête de 8 octets (taille utilisée, écrite après
+chaque nouvelle entrée complète), puis des entrées ``[longueur de la clé
+(uint32), clé UTF-8, bourrage à 8 octets, valeurs float64]``.
+"""
+
+import glob
+import ipaddress
+import mmap
+import os
+import struct
+import threading
+import time
+from bisect import bisect_left
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.http import Http404, HttpResponse
+
+# Bornes supérieures des histogrammes (la dernière case, +Inf, est implicite)
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576)
+STATUS_CLASSES = ('2xx', '3xx', '4xx', '5xx')
+
+# Position des valeurs d'une entrée
+_STATUS = 0
+_LATENCY = _STATUS + len(STATUS_CLASSES)
+_LATENCY_SUM = _LATENCY + len(LATENCY_BUCKETS) + 1
+_SIZE = _LATENCY_SUM + 1
+_SIZE_SUM = _SIZE + len(SIZE_BUCKETS) + 1
+_SIZE_COUNT = _SIZE_SUM + 1
+VALUE_COUNT = _SIZE_COUNT + 1
+
+_HEADER = struct.Struct('<Q')
+_KEY_LENGTH = struct.Struct('<I')
+_VALUE = struct.Struct('<d')
+_INITIAL_SIZE = 64 * 1024
+# Route des requêtes qui ne correspondent à aucune URL (cardinalité bornée)
+UNMATCHED = '<unmatched>'
+
+
+def is_enabled():
+    return getattr(settings, 'VEHICULES_METRICS', True)
+
+
+def get_directory():
+    """Répertoire partagé par les workers ; None : métriques en mémoire, par processus."""
+    return getattr(settings, 'VEHICULES_METRICS_DIR', None)
+
+
+def get_allowed_ips():
+    """Réseaux autorisés à lire /internal/metrics/ (adresses ou notations CIDR)."""
+    return getattr(settings, 'VEHICULES_METRICS_ALLOWED_IPS', ['127.0.0.1', '::1'])
+
+
+def _align(offset):
+    return (offset + 7) & ~7
+
+
+def _entry_size(key_bytes):
+    return _align(_KEY_LENGTH.size + len(key_bytes)) + VALUE_COUNT * _VALUE.size
+
+
+def iter_entries(data):
+    """Parcourt le contenu d'un fichier de métriques : (clé, valeurs)."""
+    if len(data) < _HEADER.size:
+        return
+    used = min(_HEADER.unpack_from(data, 0)[0], len(data))
+    offset = _HEADER.size
+    while offset + _KEY_LENGTH.size <= used:
+        (length,) = _KEY_LENGTH.unpack_from(data, offset)
+        key = bytes(data[offset + _KEY_LENGTH.size:offset + _KEY_LENGTH.size + length]).decode()
+        values_offset = offset + _align(_KEY_LENGTH.size + length)
+        values = struct.unpack_from(f'<{VALUE_COUNT}d', data, values_offset)
+        yield key, values
+        offset = values_offset + VALUE_COUNT * _VALUE.size
+
+
+class MetricsStore:
+    """Compteurs du processus courant, dans un fichier projeté en mémoire (ou en mémoire anonyme)."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._mm = None
+        self._file = None
+        self._offsets = {}
+        self._used = _HEADER.size
+
+    def path(self):
+        directory = get_directory()
+        return os.path.join(directory, f'metrics-{os.getpid()}.bin') if directory else None
+
+    def observe(self, key, status_class, duration, size):
+        with self._lock:
+            if self._mm is None:
+                self._open()
+            offset = self._offsets.get(key)
+            if offset is None:
+                offset = self._add_key(key)
+            self._increment(offset, _STATUS + status_class)
+            self._increment(offset, _LATENCY + bisect_left(LATENCY_BUCKETS, duration))
+            self._increment(offset, _LATENCY_SUM, duration)
+            if size is not None:
+                self._increment(offset, _SIZE + bisect_left(SIZE_BUCKETS, size))
+                self._increment(offset, _SIZE_SUM, size)
+                self._increment(offset, _SIZE_COUNT)
+
+    def snapshot(self):
+        """Contenu courant (copie), au format des fichiers."""
+        with self._lock:
+            return bytes(self._mm[:self._used]) if self._mm is not None else b''
+
+    def reset(self):
+        """Oublie le fichier ouvert (processus enfant après un fork, tests)."""
+        with self._lock:
+            if self._mm is not None:
+                self._mm.close()
+            if self._file is not None:
+                self._file.close()
+            self._mm = self._file = None
+            self._offsets = {}
+            self._used = _HEADER.size
+
+    def _increment(self, offset, index, amount=1):
+        position = offset + index * _VALUE.size
+        _VALUE.pack_into(self._mm, position, _VALUE.unpack_from(self._mm, position)[0] + amount)
+
+    def _open(self):
+        path = self.path()
+        if path is None:
+            self._mm = mmap.mmap(-1, _INITIAL_SIZE)
+            return
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._file = open(path, 'a+b')
+        size = max(os.fstat(self._file.fileno()).st_size, _INITIAL_SIZE)
+        self._file.truncate(size)
+        self._mm = mmap.mmap(self._file.fileno(), size)
+        # Fichier d'un processus précédent de même pid : ses compteurs sont repris
+        offset = _HEADER.size
+        for key, _values in iter_entries(self._mm):
+            self._offsets[key] = offset + _align(_KEY_LENGTH.size + len(key.encode()))
+            offset += _entry_size(key.encode())
+        self._used = offset
+        _HEADER.pack_into(self._mm, 0, self._used)
+
+    def _add_key(self, key):
+        key_bytes = key.encode()
+        needed = self._used + _entry_size(key_bytes)
+        if needed > len(self._mm):
+            self._grow(max(needed, 2 * len(self._mm)))
+        _KEY_LENGTH.pack_into(self._mm, self._used, len(key_bytes))
+        start = self._used + _KEY_LENGTH.size
+        self._mm[start:start + len(key_bytes)] = key_bytes
+        offset = self._used + _align(_KEY_LENGTH.size + len(key_bytes))
+        self._mm[offset:offset + VALUE_COUNT * _VALUE.size] = bytes(VALUE_COUNT * _VALUE.size)
+        self._used = needed
+        # Taille écrite en dernier : les lecteurs ne voient que des entrées complètes
+        _HEADER.pack_into(self._mm, 0, self._used)
+        self._offsets[key] = offset
+        return offset
+
+    def _grow(self, size):
+        if self._file is not None:
+            self._mm.close()
+            self._file.truncate(size)
+            self._mm = mmap.mmap(self._file.fileno(), size)
+        else:
+            grown = mmap.mmap(-1, size)
+            grown[:self._used] = self._mm[:self._used]
+            self._mm.close()
+            self._mm = grown
+
+
+store = MetricsStore()
+if hasattr(os, 'register_at_fork'):
+    # gunicorn --preload : chaque worker doit écrire dans son propre fichier
+    os.register_at_fork(after_in_child=store.reset)
+
+
+def collect():
+    """Additionne les compteurs de tous les processus : {clé: valeurs}."""
+    directory = get_directory()
+    if directory:
+        contents = []
+        for path in glob.glob(os.path.join(directory, 'metrics-*.bin')):
+            try:
+                with open(path, 'rb') as metrics_file:
+                    contents.append(metrics_file.read())
+            except FileNotFoundError:
+                continue
+    else:
+        contents = [store.snapshot()]
+
+    totals = {}
+    for data in contents:
+        for key, values in iter_entries(data):
+            current = totals.setdefault(key, [0.0] * VALUE_COUNT)
+            for index, value in enumerate(values):
+                current[index] += value
+    return totals
+
+
+def render_prometheus(totals):
+    """Format texte d'exposition de Prometheus (version 0.0.4)."""
+    requests, errors, latency, sizes = [], [], [], []
+    for key in sorted(totals):
+        values = totals[key]
+        namespace, route, method = key.split('\t')
+        labels = f'namespace="{_escape(namespace)}",route="{_escape(route)}",method="{method}"'
+        for index, status_class in enumerate(STATUS_CLASSES):
+            if values[_STATUS + index]:
+                requests.append(
+                    f'vehicules_http_requests_total{{{labels},status="{status_class}"}} '
+                    f'{_number(values[_STATUS + index])}'
+                )
+        errors.append(f'vehicules_http_errors_total{{{labels}}} {_number(values[_STATUS + 3])}')
+        latency += _histogram(
+            'vehicules_http_request_duration_seconds', labels, LATENCY_BUCKETS,
+            values[_LATENCY:_LATENCY_SUM], values[_LATENCY_SUM]
+        )
+        if values[_SIZE_COUNT]:
+            sizes += _histogram(
+                'vehicules_http_response_size_bytes', labels, SIZE_BUCKETS,
+                values[_SIZE:_SIZE_SUM], values[_SIZE_SUM]
+            )
+
+    lines = [
+        '# HELP vehicules_http_requests_total Requêtes HTTP par route, méthode et classe de statut.',
+        '# TYPE vehicules_http_requests_total counter',
+        *requests,
+        '# HELP vehicules_http_errors_total Réponses 5xx par route et méthode.',
+        '# TYPE vehicules_http_errors_total counter',
+        *errors,
+        '# HELP vehicules_http_request_duration_seconds Latence des requêtes HTTP.',
+        '# TYPE vehicules_http_request_duration_seconds histogram',
+        *latency,
+        '# HELP vehicules_http_response_size_bytes Taille des réponses HTTP (hors streaming).',
+        '# TYPE vehicules_http_response_size_bytes histogram',
+        *sizes,
+    ]
+    return '\n'.join(lines) + '\n'
+
+
+def _histogram(name, labels, bounds, buckets, total):
+    lines, cumulative = [], 0
+    for bound, count in zip(bounds + (None,), buckets):
+        cumulative += count
+        le = '+Inf' if bound is None else _number(bound)
+        lines.append(f'{name}_bucket{{{labels},le="{le}"}} {_number(cumulative)}')
+    lines.append(f'{name}_sum{{{labels}}} {_number(total)}')
+    lines.append(f'{name}_count{{{labels}}} {_number(cumulative)}')
+    return lines
+
+
+def _number(value):
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+
+def _escape(value):
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def route_key(request):
+    match = getattr(request, 'resolver_match', None)
+    if match is None:
+        namespace, route = '', UNMATCHED
+    else:
+        # Routes sans nom : motif de l'URL (borné lui aussi)
+        namespace, route = match.namespace, match.url_name or match.route
+    return f'{namespace}\t{route}\t{request.method}'
+
+
+class MetricsMiddleware:
+    """Voir la docstring du module ; à placer en tête de MIDDLEWARE."""
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not is_enabled():
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        started = time.perf_counter()
+        response = self.get_response(request)
+        self.record(request, response, time.perf_counter() - started)
+        return response
+
+    async def __acall__(self, request):
+        started = time.perf_counter()
+        response = await self.get_response(request)
+        self.record(request, response, time.perf_counter() - started)
+        return response
+
+    def record(self, request, response, duration):
+        if response.streaming:
+            # Taille inconnue sans parcourir le flux
+            size = None
+        else:
+            size = len(response.content)
+        status_class = min(max(response.status_code // 100, 2), 5) - 2
+        store.observe(route_key(request), status_class, duration, size)
+
+
+def metrics_view(request):
+    """
+    Métriques au format Prometheus (GET /internal/metrics/).
+
+    Réservée aux adresses de VEHICULES_METRICS_ALLOWED_IPS (404 pour les
+    autres). Derrière un proxy, REMOTE_ADDR est l'adresse du proxy : ne pas
+    exposer cette URL publiquement.
+    """
+    if not _is_allowed(request.META.get('REMOTE_ADDR', '')):
+        raise Http404
+    return HttpResponse(
+        render_prometheus(collect()),
+        content_type='text/plain; version=0.0.4; charset=utf-8'
+    )
+
+
+def _is_allowed(address):
+    try:
+        ip = ipaddress.ip_address(address)
+    except ValueError:
+        return False
+    return any(ip in ipaddress.ip_network(network, strict=False) for network in get_allowed_ips())
@@ -3,9 +3,12 @@ Modèles pour l'API Concessionnaire & Véhicules.
 
 Concessionnaire : représente un concessionnaire avec nom et siret (non exposé dans l'API)
 Véhicule : représente un véhicule lié à un concessionnaire
+InventaireStats : statistiques d'inventaire d'un concessionnaire, tenues à jour
+incrémentalement (voir stats.py)
+TokenRevoque : token JWT révoqué (liste noire, voir blacklist.py)
 """
 
-from django.db import models
+from django.db import models, router, transaction
 
 
 class Concessionnaire(models.Model):
@@ -22,11 +25,28 @@ class Concessionnaire(models.Model):
         verbose_name="SIRET",
         help_text="Numéro SIRET unique (non exposé dans l'API)"
     )
+    # Marqueurs de modification (ETag / Last-Modified, voir conditional.py)
+    modifie_le = models.DateTimeField(auto_now=True, verbose_name="Modifié le")
+    inventaire_version = models.PositiveBigIntegerField(
+        default=0,
+        editable=False,
+        verbose_name="Version de l'inventaire",
+        help_text="Incrémentée à chaque création, modification ou suppression d'un véhicule"
+    )
+    inventaire_modifie_le = models.DateTimeField(
+        null=True,
+        editable=False,
+        verbose_name="Inventaire modifié le"
+    )
     
     class Meta:
         verbose_name = "Concessionnaire"
         verbose_name_plural = "Concessionnaires"
         ordering = ['nom']
+        indexes = [
+            # Sert la pagination par curseur (nom, id)
+            models.Index(fields=['nom', 'id'], name='concessionnaire_nom_id_idx'),
+        ]
     
     def __str__(self):
         return self.nom
@@ -55,14 +75,125 @@ class Vehicule(models.Model):
         Concessionnaire,
         on_delete=models.CASCADE,
         related_name='vehicules',
-        verbose_name="Concessionnaire"
+        verbose_name="Concessionnaire",
+        # Couvert par les index composites de Meta.indexes, qui commencent tous par ce champ
+        db_index=False
+    )
+    reference = models.CharField(
+        max_length=64,
+        null=True,
+        blank=True,
+        verbose_name="Référence",
+        help_text="Référence du véhicule chez le concessionnaire (clé des imports d'inventaire)"
     )
+    modifie_le = models.DateTimeField(auto_now=True, verbose_name="Modifié le")
     
     class Meta:
         verbose_name = "Véhicule"
         verbose_name_plural = "Véhicules"
         ordering = ['marque', 'type']
+        # Un index par tri de la liste des véhicules d'un concessionnaire (voir
+        # filters.py) : pagination par curseur et filtres servis par l'index.
+        indexes = [
+            models.Index(
+                fields=['concessionnaire', 'marque', 'type', 'id'],
+                name='vehicule_conc_marque_type_idx'
+            ),
+            models.Index(
+                fields=['concessionnaire', 'type', 'marque', 'id'],
+                name='vehicule_conc_type_marque_idx'
+            ),
+            models.Index(
+                fields=['concessionnaire', 'prix_ht', 'id'],
+                name='vehicule_conc_prix_idx'
+            ),
+            models.Index(
+                fields=['concessionnaire', 'chevaux', 'id'],
+                name='vehicule_conc_chevaux_idx'
+            ),
+        ]
+        constraints = [
+            # Clé de l'upsert de manage.py import_inventory
+            models.UniqueConstraint(
+                fields=['concessionnaire', 'reference'],
+                name='vehicule_conc_reference_uniq'
+            ),
+        ]
     
     def __str__(self):
         return f"{self.marque} ({self.get_type_display()}) - {self.chevaux}ch"
 
+    def save(self, force_insert=False, force_update=False, using=None, update_fields=None):
+        # pre_save / post_save (marqueurs d'inventaire et statistiques, voir
+        # signals.py) dans la même transaction que l'écriture : une erreur
+        # annule l'ensemble au lieu de laisser des statistiques fausses. Les
+        # suppressions le sont déjà (Collector.delete).
+        using = using or router.db_for_write(type(self), instance=self)
+        with transaction.atomic(using=using):
+            super().save(
+                force_insert=force_insert,
+                force_update=force_update,
+                using=using,
+                update_fields=update_fields,
+            )
+
+
+class InventaireStats(models.Model):
+    """
+    Statistiques de l'inventaire d'un concessionnaire.
+
+    Table de synthèse mise à jour incrémentalement à chaque création,
+    modification ou suppression d'un véhicule (voir stats.py) ; les moyennes
+    sont calculées à partir des totaux.
+    """
+    concessionnaire = models.OneToOneField(
+        Concessionnaire,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='stats',
+        verbose_name="Concessionnaire"
+    )
+    nombre = models.PositiveIntegerField(default=0, verbose_name="Nombre de véhicules")
+    nombre_autos = models.PositiveIntegerField(default=0, verbose_name="Nombre d'autos")
+    nombre_motos = models.PositiveIntegerField(default=0, verbose_name="Nombre de motos")
+    prix_ht_total = models.FloatField(default=0, verbose_name="Somme des prix HT")
+    prix_ht_min = models.FloatField(null=True, verbose_name="Prix HT minimal")
+    prix_ht_max = models.FloatField(null=True, verbose_name="Prix HT maximal")
+    chevaux_total = models.BigIntegerField(default=0, verbose_name="Somme des chevaux")
+    chevaux_min = models.IntegerField(null=True, verbose_name="Puissance minimale")
+    chevaux_max = models.IntegerField(null=True, verbose_name="Puissance maximale")
+    
+    class Meta:
+        verbose_name = "Statistiques d'inventaire"
+        verbose_name_plural = "Statistiques d'inventaire"
+    
+    def __str__(self):
+        return f"Statistiques de {self.concessionnaire_id}"
+    
+    @property
+    def prix_ht_moyen(self):
+        return self.prix_ht_total / self.nombre if self.nombre else None
+    
+    @property
+    def chevaux_moyen(self):
+        return self.chevaux_total / self.nombre if self.nombre else None
+
+
+class TokenRevoque(models.Model):
+    """
+    Token JWT révoqué (liste noire), identifié par son claim ``jti``.
+    
+    Les entrées expirées ne servent plus à rien (le token est de toute façon
+    refusé) et sont purgées en arrière-plan (voir blacklist.py).
+    """
+    jti = models.CharField(max_length=255, unique=True, verbose_name="Identifiant du token (jti)")
+    token_type = models.CharField(max_length=16, verbose_name="Type de token")
+    expire_le = models.DateTimeField(db_index=True, verbose_name="Expire le")
+    revoque_le = models.DateTimeField(auto_now_add=True, verbose_name="Révoqué le")
+    
+    class Meta:
+        verbose_name = "Token révoqué"
+        verbose_name_plural = "Tokens révoqués"
+    
+    def __str__(self):
+        return f"{self.token_type} {self.jti}"
@@ -0,0 +1,104 @@
+"""
+Lecture groupée de véhicules par identifiants (GET/POST /api/vehicules/).
+
+Une liste d'ids (jusqu'à ``VEHICULES_MULTIGET_MAX_IDS``) est résolue en une
+seule requête SQL (``pk IN (...)``, comme ``QuerySet.in_bulk`` mais sans le
+découpage en paquets de 999 paramètres de SQLite) au lieu d'un appel à
+ConcessionnaireVehiculeDetailView par id, chacun avec son authentification,
+ses permissions et ses deux requêtes.
+
+Les résultats suivent l'ordre de la demande (doublons compris) ; un id
+inconnu donne ``null`` à sa position et figure dans ``missing``. Avec
+``concessionnaire``, les véhicules d'un autre concessionnaire sont traités
+comme inconnus.
+"""
+
+from django.conf import settings
+from rest_framework import serializers
+from rest_framework.utils import html
+
+from .fast_serializers import VehiculeDetailValuesSerializer
+from .models import Vehicule
+
+# Plus grand entier de SQLite (INTEGER signé sur 64 bits) : au-delà, l'ORM
+# lève OverflowError au lieu de ne rien trouver
+MAX_ID = 2 ** 63 - 1
+
+
+def get_max_ids():
+    """Nombre maximal d'ids par appel."""
+    return getattr(settings, 'VEHICULES_MULTIGET_MAX_IDS', 5000)
+
+
+class IdListField(serializers.Field):
+    """
+    Liste d'ids : liste JSON (corps POST), ``?ids=1,2,3`` ou ``?ids=1&ids=2``.
+
+    Conversion sans un IntegerField par élément : plusieurs milliers d'ids
+    sont validés en une passe.
+    """
+    default_error_messages = {
+        'invalid': 'Liste d\'identifiants entiers positifs attendue.',
+        'empty': 'Au moins un identifiant est requis.',
+        'max_length': 'Au plus {max_length} identifiants par appel.',
+    }
+
+    def get_value(self, dictionary):
+        if html.is_html_input(dictionary) and self.field_name in dictionary:
+            return ','.join(dictionary.getlist(self.field_name))
+        return super().get_value(dictionary)
+
+    def to_internal_value(self, data):
+        if isinstance(data, str):
+            data = [value for value in data.split(',') if value.strip()]
+        if not isinstance(data, list):
+            self.fail('invalid')
+        try:
+            ids = [_to_id(value) for value in data]
+        except (TypeError, ValueError):
+            self.fail('invalid')
+        if not ids:
+            self.fail('empty')
+        if len(ids) > get_max_ids():
+            self.fail('max_length', max_length=get_max_ids())
+        return ids
+
+    def to_representation(self, value):
+        return value
+
+
+def _to_id(value):
+    # bool est un int : refusé, comme les flottants (1.5), les ids négatifs et
+    # ceux qui dépassent MAX_ID
+    if isinstance(value, (bool, float)):
+        raise TypeError(value)
+    value = int(value)
+    if not 1 <= value <= MAX_ID:
+        raise ValueError(value)
+    return value
+
+
+class VehiculeBatchSerializer(serializers.Serializer):
+    """Paramètres de /api/vehicules/ (query string en GET, corps JSON en POST)."""
+    ids = IdListField(help_text='Identifiants des véhicules, séparés par des virgules en GET')
+    concessionnaire = serializers.IntegerField(
+        min_value=1,
+        max_value=MAX_ID,
+        required=False,
+        help_text='Ne renvoyer que les véhicules de ce concessionnaire'
+    )
+
+
+def resolve(ids, concessionnaire_id=None, fields=None):
+    """Retourne (résultats dans l'ordre de ``ids``, None pour un id inconnu ; ids inconnus)."""
+    queryset = Vehicule.objects.filter(pk__in=set(ids))
+    if concessionnaire_id is not None:
+        queryset = queryset.filter(concessionnaire_id=concessionnaire_id)
+    rows = VehiculeDetailValuesSerializer.values(queryset.order_by(), extra=('id',), fields=fields)
+    by_id = {row['id']: row for row in rows}
+    data = VehiculeDetailValuesSerializer(list(by_id.values()), many=True, fields=fields).data
+    representations = dict(zip(by_id, data))
+    return (
+        [representations.get(pk) for pk in ids],
+        [pk for pk in dict.fromkeys(ids) if pk not in representations],
+    )
@@ -0,0 +1,261 @@
+"""
+Schéma OpenAPI précalculé, servi depuis la mémoire (GET /api/schema/).
+
+SpectacularAPIView régénère le schéma à chaque requête : parcours de toutes
+les vues, de leurs ``extend_schema`` et de leurs exemples. Ici, le schéma est
+généré une seule fois, rendu en JSON et en YAML (mêmes renderers que
+drf-spectacular) et compressé (gzip) ; les requêtes suivantes servent ces
+octets depuis la mémoire, avec un ETag (réponse 304 sur If-None-Match).
+
+Les artefacts sont aussi écrits dans ``VEHICULES_SCHEMA_DIR``
+(``openapi.json``, ``openapi.yaml`` et ``openapi.meta.json``) : un nouveau
+processus les relit au lieu de régénérer le schéma. ``manage.py
+build_schema`` les produit à l'avance (étape de déploiement).
+
+drf-spectacular et la documentation des vues (docs.py) ne sont importés qu'à
+la génération du schéma ; ``lazy_view`` diffère de même l'import des vues
+Swagger UI et ReDoc jusqu'à leur première requête.
+
+Chaque artefact porte une empreinte : routes de l'URLconf (motif et vue),
+contenu des fichiers Python du projet (applications locales et URLconf),
+versions de Django, DRF et drf-spectacular et SPECTACULAR_SETTINGS. Un
+artefact dont l'empreinte ne correspond plus (code ou URLconf modifiés) est
+régénéré automatiquement à la première requête.
+"""
+
+import gzip
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import threading
+from importlib import import_module
+from pathlib import Path
+
+import django
+import rest_framework
+from django.apps import apps
+from django.conf import settings
+from django.http import HttpResponse, HttpResponseNotModified
+from django.urls import URLPattern, URLResolver, get_resolver
+from django.utils.module_loading import import_string
+from django.views import View
+
+logger = logging.getLogger(__name__)
+
+# Format -> (type de contenu, extension)
+FORMATS = {
+    'yaml': ('application/vnd.oai.openapi; charset=utf-8', 'yaml'),
+    'json': ('application/vnd.oai.openapi+json; charset=utf-8', 'json'),
+}
+# Valeurs de ?format= et types de l'en-tête Accept acceptés par SpectacularAPIView
+_FORMAT_ALIASES = {'yaml': 'yaml', 'openapi': 'yaml', 'json': 'json', 'openapi-json': 'json'}
+_MEDIA_TYPES = {
+    'application/vnd.oai.openapi': 'yaml',
+    'application/yaml': 'yaml',
+    'application/vnd.oai.openapi+json': 'json',
+    'application/json': 'json',
+}
+META_FILE = 'openapi.meta.json'
+
+
+def get_directory():
+    """Répertoire des artefacts ; None : schéma conservé en mémoire uniquement."""
+    return getattr(settings, 'VEHICULES_SCHEMA_DIR', None)
+
+
+def _iter_routes(patterns, prefix=''):
+    for pattern in patterns:
+        if isinstance(pattern, URLResolver):
+            yield from _iter_routes(pattern.url_patterns, prefix + str(pattern.pattern))
+        elif isinstance(pattern, URLPattern):
+            view = getattr(pattern.callback, 'view_class', pattern.callback)
+            yield f'{prefix}{pattern.pattern} {view.__module__}.{view.__qualname__}'
+
+
+def _source_files():
+    """Fichiers Python du projet : applications locales et package de l'URLconf."""
+    base_dir = Path(settings.BASE_DIR).resolve()
+    directories = {
+        Path(config.path).resolve() for config in apps.get_app_configs()
+        if Path(config.path).resolve().is_relative_to(base_dir)
+    }
+    directories.add(Path(import_module(settings.ROOT_URLCONF).__file__).resolve().parent)
+    return sorted(path for directory in directories for path in directory.rglob('*.py'))
+
+
+def fingerprint():
+    """Empreinte du code et de l'URLconf dont dépend le schéma."""
+    import drf_spectacular
+
+    digest = hashlib.sha256()
+    for part in (django.__version__, rest_framework.__version__, drf_spectacular.__version__,
+                 repr(getattr(settings, 'SPECTACULAR_SETTINGS', {})), settings.ROOT_URLCONF):
+        digest.update(part.encode() + b'\0')
+    for route in _iter_routes(get_resolver().url_patterns):
+        digest.update(route.encode() + b'\0')
+    for path in _source_files():
+        digest.update(str(path).encode() + b'\0' + path.read_bytes() + b'\0')
+    return digest.hexdigest()
+
+
+class SchemaArtifact:
+    """Schéma rendu dans chaque format, ses versions compressées et ses ETags."""
+
+    def __init__(self, fingerprint, contents):
+        self.fingerprint = fingerprint
+        self.contents = contents
+        self.gzipped = {name: gzip.compress(content, mtime=0) for name, content in contents.items()}
+        self.etags = {
+            name: '"{}"'.format(hashlib.sha256(content).hexdigest()[:32])
+            for name, content in contents.items()
+        }
+
+
+def build(current_fingerprint=None):
+    """Génère le schéma (comme ``manage.py spectacular``) et le rend en JSON et en YAML."""
+    from drf_spectacular.renderers import OpenApiJsonRenderer, OpenApiYamlRenderer
+    from drf_spectacular.settings import spectacular_settings
+
+    generator = spectacular_settings.DEFAULT_GENERATOR_CLASS()
+    schema = generator.get_schema(request=None, public=True)
+    return SchemaArtifact(current_fingerprint or fingerprint(), {
+        'json': OpenApiJsonRenderer().render(schema, renderer_context={}),
+        'yaml': OpenApiYamlRenderer().render(schema, renderer_context={}),
+    })
+
+
+def save(artifact, directory):
+    """Écrit les artefacts ; chaque fichier est remplacé atomiquement."""
+    directory = Path(directory)
+    directory.mkdir(parents=True, exist_ok=True)
+    for name, content in artifact.contents.items():
+        _write_atomic(directory / f'openapi.{FORMATS[name][1]}', content)
+    # Écrit en dernier : il ne désigne que des fichiers complets
+    _write_atomic(directory / META_FILE, json.dumps({'fingerprint': artifact.fingerprint}).encode())
+
+
+def load(directory, expected_fingerprint):
+    """Relit les artefacts de ``directory`` s'ils correspondent à l'empreinte, sinon None."""
+    directory = Path(directory)
+    try:
+        meta = json.loads((directory / META_FILE).read_bytes())
+        if meta.get('fingerprint') != expected_fingerprint:
+            return None
+        contents = {
+            name: (directory / f'openapi.{extension}').read_bytes()
+            for name, (_content_type, extension) in FORMATS.items()
+        }
+    except (OSError, ValueError):
+        return None
+    return SchemaArtifact(expected_fingerprint, contents)
+
+
+def _write_atomic(path, content):
+    descriptor, temporary = tempfile.mkstemp(dir=path.parent, prefix=f'.{path.name}.')
+    try:
+        with os.fdopen(descriptor, 'wb') as temporary_file:
+            temporary_file.write(content)
+        os.replace(temporary, path)
+    except BaseException:
+        os.unlink(temporary)
+        raise
+
+
+class SchemaStore:
+    """Artefact du processus, chargé ou généré à la première demande."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._artifact = None
+        self._urlconf = None
+
+    def get(self):
+        with self._lock:
+            # Le code ne change pas sans redémarrage : seul l'URLconf est revérifié
+            if self._artifact is None or self._urlconf != settings.ROOT_URLCONF:
+                self._artifact = self._load_or_build()
+                self._urlconf = settings.ROOT_URLCONF
+            return self._artifact
+
+    def clear(self):
+        with self._lock:
+            self._artifact = None
+
+    def _load_or_build(self):
+        current = fingerprint()
+        directory = get_directory()
+        artifact = load(directory, current) if directory else None
+        if artifact is None:
+            artifact = build(current)
+            if directory:
+                try:
+                    save(artifact, directory)
+                except OSError:
+                    # Système de fichiers en lecture seule : schéma servi depuis la mémoire
+                    logger.warning('Impossible d\'écrire le schéma OpenAPI dans %s', directory, exc_info=True)
+        return artifact
+
+
+store = SchemaStore()
+
+
+def _negotiate(request):
+    requested = request.GET.get('format')
+    if requested:
+        return _FORMAT_ALIASES.get(requested)
+    for media_range in request.headers.get('Accept', '*/*').split(','):
+        media_type = media_range.split(';')[0].strip().lower()
+        if media_type in _MEDIA_TYPES:
+            return _MEDIA_TYPES[media_type]
+        if media_type in ('*/*', 'application/*'):
+            return 'yaml'
+    return None
+
+
+class SchemaView(View):
+    """
+    Schéma OpenAPI précalculé (GET /api/schema/), en remplacement de SpectacularAPIView.
+
+    Même négociation que cette dernière : YAML par défaut, JSON via
+    ``?format=json`` ou l'en-tête Accept.
+    """
+    http_method_names = ['get', 'head']
+
+    def get(self, request):
+        name = _negotiate(request)
+        if name is None:
+            return HttpResponse(status=406)
+        artifact = store.get()
+        use_gzip = 'gzip' in request.headers.get('Accept-Encoding', '')
+        etag = artifact.etags[name][:-1] + ('-gzip"' if use_gzip else '"')
+
+        if etag in [tag.strip() for tag in request.headers.get('If-None-Match', '').split(',')]:
+            response = HttpResponseNotModified()
+        else:
+            content_type, extension = FORMATS[name]
+            response = HttpResponse(
+                artifact.gzipped[name] if use_gzip else artifact.contents[name],
+                content_type=content_type
+            )
+            title = getattr(settings, 'SPECTACULAR_SETTINGS', {}).get('TITLE') or 'schema'
+            response['Content-Disposition'] = f'inline; filename="{title}.{extension}"'
+            if use_gzip:
+                response['Content-Encoding'] = 'gzip'
+        response['ETag'] = etag
+        response['Vary'] = 'Accept, Accept-Encoding'
+        return response
+
+
+def lazy_view(view_path, **initkwargs):
+    """Vue ``view_path`` (classe de vue) importée et instanciée à sa première requête."""
+    view = None
+
+    def wrapper(request, *args, **kwargs):
+        nonlocal view
+        if view is None:
+            view = import_string(view_path).as_view(**initkwargs)
+        return view(request, *args, **kwargs)
+
+    return wrapper
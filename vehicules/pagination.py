@@ -0,0 +1,200 @@
+"""
+Pagination pour l'API Concessionnaire & Véhicules.
+
+KeysetCursorPagination : pagination par curseur opaque sur un tri composite
+(keyset). Le curseur encode les valeurs de tri du dernier élément renvoyé, ce
+qui permet de filtrer directement sur l'index au lieu d'utiliser un OFFSET :
+la latence reste constante quelle que soit la profondeur de la page, et aucun
+COUNT(*) n'est exécuté.
+"""
+
+import json
+from functools import reduce
+from operator import or_
+
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import Cursor, CursorPagination, _reverse_ordering
+
+
+class KeysetCursorPagination(CursorPagination):
+    """
+    Pagination par curseur sur l'ensemble des champs de tri.
+
+    Contrairement à ``CursorPagination`` de DRF, qui ne positionne le curseur
+    que sur le premier champ de tri puis complète avec un offset, le curseur
+    contient ici la valeur de chaque champ de tri du dernier élément. Le tri
+    par défaut est celui de ``Meta.ordering`` du modèle, complété par ``id``
+    pour garantir un ordre total.
+    """
+    page_size_query_param = 'page_size'
+    max_page_size = 500
+    ordering = None
+
+    def paginate_queryset(self, queryset, request, view=None):
+        queryset = self._page_queryset(queryset, request, view)
+        if queryset is None:
+            return None
+        return self._set_page(list(queryset))
+
+    async def apaginate_queryset(self, queryset, request, view=None):
+        """Variante asynchrone de ``paginate_queryset`` (ORM asynchrone)."""
+        queryset = self._page_queryset(queryset, request, view)
+        if queryset is None:
+            return None
+        return self._set_page([item async for item in queryset])
+
+    def _page_queryset(self, queryset, request, view):
+        """Queryset de la page demandée (non évalué), ou None sans pagination."""
+        self.page_size = self.get_page_size(request)
+        if not self.page_size:
+            return None
+
+        self.base_url = request.build_absolute_uri()
+        self.ordering = self.get_ordering(request, queryset, view)
+        self.model = queryset.model
+
+        self.cursor = self.decode_cursor(request)
+        if self.cursor is None:
+            self.reverse, self.current_position = False, None
+        else:
+            _, self.reverse, self.current_position = self.cursor
+
+        if self.reverse:
+            queryset = queryset.order_by(*_reverse_ordering(self.ordering))
+        else:
+            queryset = queryset.order_by(*self.ordering)
+
+        if self.current_position is not None:
+            queryset = queryset.filter(
+                self._build_keyset_filter(self.current_position, self.reverse)
+            )
+
+        # Un élément supplémentaire est lu pour savoir s'il existe une page suivante
+        return queryset[:self.page_size + 1]
+
+    def _set_page(self, results):
+        self.page = results[:self.page_size]
+        has_following_position = len(results) > len(self.page)
+
+        if self.reverse:
+            self.page = list(reversed(self.page))
+            self.has_next = self.current_position is not None
+            self.has_previous = has_following_position
+        else:
+            self.has_next = has_following_position
+            self.has_previous = self.current_position is not None
+
+        if (self.has_previous or self.has_next) and self.template is not None:
+            self.display_page_controls = True
+
+        return self.page
+
+    def get_ordering(self, request, queryset, view):
+        """
+        Retourne le tri à appliquer.
+
+        Priorité à l'attribut ``ordering`` de la vue, puis à celui de la
+        pagination, puis à ``Meta.ordering`` du modèle. ``id`` est toujours
+        ajouté en dernier critère pour départager les ex aequo.
+        """
+        ordering = (
+            getattr(view, 'ordering', None)
+            or self.ordering
+            or queryset.model._meta.ordering
+        )
+        if isinstance(ordering, str):
+            ordering = (ordering,)
+        ordering = tuple(ordering)
+        if not any(field.lstrip('-') in ('id', 'pk') for field in ordering):
+            ordering += ('id',)
+        return ordering
+
+    def get_ordering_fields(self, request, queryset, view):
+        """Champs lus par le curseur, à inclure dans les colonnes de ``.values()``."""
+        return [field.lstrip('-') for field in self.get_ordering(request, queryset, view)]
+
+    def get_next_link(self):
+        if not self.has_next:
+            return None
+        position = self._get_edge_position(-1)
+        return self.encode_cursor(Cursor(offset=0, reverse=False, position=position))
+
+    def get_previous_link(self):
+        if not self.has_previous:
+            return None
+        position = self._get_edge_position(0)
+        return self.encode_cursor(Cursor(offset=0, reverse=True, position=position))
+
+    def _get_edge_position(self, index):
+        """
+        Position du premier (0) ou du dernier (-1) élément de la page.
+
+        Une page vide (curseur valide au-delà des dernières lignes, lignes
+        supprimées depuis) n'a pas d'élément : le lien repart de la position
+        du curseur courant, qui sépare les deux pages voisines.
+        """
+        if not self.page:
+            return json.dumps(self.current_position, separators=(',', ':'))
+        return self._get_position_from_instance(self.page[index], self.ordering)
+
+    def get_paginated_response_schema(self, schema):
+        response_schema = super().get_paginated_response_schema(schema)
+        properties = response_schema['properties']
+        properties['next']['example'] = 'http://api.example.org/accounts/?cursor=cD0lNUIlMjJQZXVnZW90JTIyJTVE'
+        properties['previous']['example'] = None
+        return response_schema
+
+    def decode_cursor(self, request):
+        cursor = super().decode_cursor(request)
+        if cursor is None or cursor.position is None:
+            return cursor
+        try:
+            position = json.loads(cursor.position)
+            if not isinstance(position, list) or len(position) != len(self.ordering):
+                raise ValueError(cursor.position)
+            # Chaque valeur est convertie par le champ de tri : une valeur d'un
+            # autre type (ex. une chaîne pour id) n'atteint jamais l'ORM
+            position = [
+                self._to_python(field.lstrip('-'), value)
+                for field, value in zip(self.ordering, position)
+            ]
+        except (ValueError, ValidationError):
+            raise NotFound(self.invalid_cursor_message)
+        return Cursor(offset=0, reverse=cursor.reverse, position=position)
+
+    def _to_python(self, field_name, value):
+        field = self.model._meta.pk if field_name == 'pk' else self.model._meta.get_field(field_name)
+        value = field.to_python(value)
+        if value is None:
+            raise ValueError(field_name)
+        return value
+
+    def _get_position_from_instance(self, instance, ordering):
+        values = []
+        for field in ordering:
+            field_name = field.lstrip('-')
+            if isinstance(instance, dict):
+                values.append(instance[field_name])
+            else:
+                values.append(getattr(instance, field_name))
+        return json.dumps(values, separators=(',', ':'))
+
+    def _build_keyset_filter(self, position, reverse):
+        """
+        Construit la condition « strictement après la position » sur le tri
+        composite : (a > x) OU (a = x ET b > y) OU (a = x ET b = y ET id > z).
+        """
+        clauses = []
+        for index, field in enumerate(self.ordering):
+            field_name = field.lstrip('-')
+            descending = field.startswith('-')
+            lookup = 'lt' if descending != reverse else 'gt'
+            equal = {
+                previous.lstrip('-'): position[i]
+                for i, previous in enumerate(self.ordering[:index])
+            }
+            clauses.append(Q(**equal, **{f'{field_name}__{lookup}': position[index]}))
+        return reduce(or_, clauses)
+
@@ -0,0 +1,40 @@
+"""
+Parsers pour l'API Concessionnaire & Véhicules.
+
+FastJSONParser : JSON décodé par le codec configuré (orjson si disponible,
+voir formats.py).
+
+MessagePackParser : corps MessagePack (Content-Type: application/msgpack).
+"""
+
+import codecs
+
+from django.conf import settings
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import BaseParser, JSONParser
+
+from . import formats
+
+
+class FastJSONParser(JSONParser):
+    """JSONParser dont le décodage passe par le codec JSON configuré."""
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        encoding = (parser_context or {}).get('encoding', settings.DEFAULT_CHARSET)
+        if codecs.lookup(encoding).name != 'utf-8':
+            return super().parse(stream, media_type, parser_context)
+        try:
+            return formats.get_json_codec().loads(stream.read())
+        except ValueError as exc:
+            raise ParseError(f'JSON parse error - {exc}')
+
+
+class MessagePackParser(BaseParser):
+    """Parser MessagePack."""
+    media_type = 'application/msgpack'
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        try:
+            return formats.get_msgpack_codec().loads(stream.read())
+        except (ValueError, TypeError, RecursionError) as exc:
+            raise ParseError(f'MessagePack parse error - {exc}')
@@ -0,0 +1,218 @@
+"""
+Profilage des requêtes (optionnel) : en-tête Server-Timing et requêtes lentes.
+
+ProfilingMiddleware mesure, pour chaque requête, le temps passé dans :
+
+- ``db`` : les requêtes SQL (nombre et durée, via un execute wrapper
+  installé sur chaque connexion) ;
+- ``auth`` : l'authentification JWT ;
+- ``serialize`` : la sérialisation (ValuesSerializer) ;
+- ``render`` : le rendu JSON de la réponse ;
+- ``app`` : le reste (vue, cache, middlewares) ;
+
+et les retourne dans l'en-tête ``Server-Timing`` (affiché par l'onglet Réseau
+des navigateurs). Les durées des phases excluent le SQL exécuté pendant la
+phase (ex. la lecture paresseuse d'un queryset pendant la sérialisation).
+Un execute wrapper ne mesure que ``execute`` : la lecture des lignes suivantes
+(fetch), qui sous SQLite fait une partie du travail, reste comptée dans la
+phase qui parcourt les résultats.
+
+Les requêtes plus lentes que ``VEHICULES_PROFILING_SLOW_MS`` sont conservées,
+avec leurs requêtes SQL les plus lentes, dans un tampon circulaire de
+``VEHICULES_PROFILING_BUFFER_SIZE`` entrées, propre au processus, consultable
+par le staff : GET /api/profiling/slow-requests/ (SlowRequestsView, views.py).
+
+Le middleware est déclaré dans MIDDLEWARE mais inactif tant que
+``VEHICULES_PROFILING`` est faux : Django le retire alors de la chaîne
+(MiddlewareNotUsed) et aucun execute wrapper n'est installé ; il ne reste que
+la lecture d'une ContextVar par phase.
+"""
+
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+from django.db.backends.signals import connection_created
+from django.utils import timezone
+
+# Requêtes SQL conservées par requête HTTP pour le tampon des requêtes lentes
+MAX_RECORDED_QUERIES = 200
+SLOWEST_QUERIES = 5
+SQL_PREVIEW_LENGTH = 300
+
+_current = ContextVar('vehicules_profile', default=None)
+
+
+def is_enabled():
+    return getattr(settings, 'VEHICULES_PROFILING', False)
+
+
+def get_slow_threshold():
+    """Durée (ms) à partir de laquelle une requête est conservée dans le tampon."""
+    return getattr(settings, 'VEHICULES_PROFILING_SLOW_MS', 200)
+
+
+def get_buffer_size():
+    return getattr(settings, 'VEHICULES_PROFILING_BUFFER_SIZE', 100)
+
+
+class RequestProfile:
+    """Mesures d'une requête en cours."""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.phases = {}
+        self.sql_count = 0
+        self.sql_time = 0.0
+        self.queries = []
+
+    def add_phase(self, name, duration):
+        self.phases[name] = self.phases.get(name, 0.0) + duration
+
+    def add_query(self, sql, duration):
+        self.sql_count += 1
+        self.sql_time += duration
+        if len(self.queries) < MAX_RECORDED_QUERIES:
+            self.queries.append((duration, sql))
+
+
+@contextmanager
+def phase(name):
+    """Attribue la durée du bloc (hors SQL) à la phase ``name`` de la requête profilée."""
+    profile = _current.get()
+    if profile is None:
+        yield
+        return
+    start = time.perf_counter()
+    sql_before = profile.sql_time
+    try:
+        yield
+    finally:
+        profile.add_phase(name, time.perf_counter() - start - (profile.sql_time - sql_before))
+
+
+def _record_sql(execute, sql, params, many, context):
+    profile = _current.get()
+    if profile is None:
+        return execute(sql, params, many, context)
+    start = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        profile.add_query(sql, time.perf_counter() - start)
+
+
+def _install_wrapper(connection, **kwargs):
+    if _record_sql not in connection.execute_wrappers:
+        connection.execute_wrappers.append(_record_sql)
+
+
+class SlowRequestBuffer:
+    """Tampon circulaire des requêtes lentes, partagé par les threads du processus."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._entries = deque(maxlen=get_buffer_size())
+
+    def add(self, entry):
+        with self._lock:
+            if self._entries.maxlen != get_buffer_size():
+                self._entries = deque(self._entries, maxlen=get_buffer_size())
+            self._entries.append(entry)
+
+    def entries(self):
+        """Entrées de la plus récente à la plus ancienne."""
+        with self._lock:
+            return list(reversed(self._entries))
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+slow_requests = SlowRequestBuffer()
+
+
+class ProfilingMiddleware:
+    """Voir la docstring du module ; à placer en tête de MIDDLEWARE."""
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not is_enabled():
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+        # Connexions déjà ouvertes, puis chaque nouvelle connexion (tous threads)
+        for connection in connections.all(initialized_only=True):
+            _install_wrapper(connection)
+        connection_created.connect(_install_wrapper, dispatch_uid='vehicules_profiling')
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        profile = RequestProfile()
+        token = _current.set(profile)
+        try:
+            response = self.get_response(request)
+        finally:
+            _current.reset(token)
+        return self.finish(request, response, profile)
+
+    async def __acall__(self, request):
+        profile = RequestProfile()
+        token = _current.set(profile)
+        try:
+            response = await self.get_response(request)
+        finally:
+            _current.reset(token)
+        return self.finish(request, response, profile)
+
+    def process_template_response(self, request, response):
+        # Réponses DRF : rendues par Django après la vue, juste avant le retour
+        render = response.render
+
+        def timed_render():
+            with phase('render'):
+                return render()
+
+        response.render = timed_render
+        return response
+
+    def finish(self, request, response, profile):
+        total = time.perf_counter() - profile.started
+        phases = dict(profile.phases)
+        phases['app'] = max(0.0, total - profile.sql_time - sum(phases.values()))
+        metrics = [
+            f'total;dur={total * 1000:.1f}',
+            f'db;dur={profile.sql_time * 1000:.1f};desc="{profile.sql_count} SQL"',
+        ] + [f'{name};dur={duration * 1000:.1f}' for name, duration in phases.items()]
+        response['Server-Timing'] = ', '.join(metrics)
+
+        if total * 1000 >= get_slow_threshold():
+            slow_requests.add({
+                'date': timezone.now().isoformat(),
+                'method': request.method,
+                'path': request.get_full_path(),
+                'status': response.status_code,
+                'duration_ms': round(total * 1000, 1),
+                'phases_ms': {name: round(duration * 1000, 1) for name, duration in phases.items()},
+                'sql': {
+                    'count': profile.sql_count,
+                    'duration_ms': round(profile.sql_time * 1000, 1),
+                    'slowest': [
+                        {'duration_ms': round(duration * 1000, 2), 'sql': sql[:SQL_PREVIEW_LENGTH]}
+                        for duration, sql in sorted(profile.queries, key=lambda query: query[0], reverse=True)[:SLOWEST_QUERIES]
+                    ],
+                },
+            })
+        return response
+
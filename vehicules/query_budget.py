@@ -0,0 +1,122 @@
+"""
+Budget de requêtes SQL des endpoints de l'API vehicules.
+
+Chaque vue GET de vehicules/urls.py déclare un attribut ``query_budget`` :
+le nombre maximal de requêtes SQL qu'elle peut exécuter, quel que soit le
+nombre de résultats (et, si nécessaire, ``query_budget_params`` : les
+paramètres de requête à utiliser). Ce module rejoue chaque endpoint sur des jeux de données
+de tailles différentes et signale tout dépassement ou toute dérive (N+1).
+
+Utilisé par la commande ``manage.py check_query_budgets``.
+"""
+
+from urllib.parse import urlencode
+
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test.utils import CaptureQueriesContext, override_settings
+from django.urls import reverse
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
+
+from . import urls as vehicules_urls
+from .models import Concessionnaire, Vehicule
+
+
+def create_fixtures(size, index=0):
+    """Crée un concessionnaire avec ``size`` véhicules et retourne les kwargs d'URL."""
+    concessionnaire = Concessionnaire.objects.create(
+        nom=f'Budget {index}',
+        siret=f'99{index:012d}'
+    )
+    Vehicule.objects.bulk_create([
+        Vehicule(
+            type='auto' if i % 2 else 'moto',
+            marque=f'Marque {i % 7}',
+            chevaux=80 + i,
+            prix_ht=10000.0 + i,
+            concessionnaire=concessionnaire
+        )
+        for i in range(size)
+    ])
+    vehicule = concessionnaire.vehicules.order_by('id').first()
+    return {
+        'id': concessionnaire.pk,
+        'vehicule_id': vehicule.pk if vehicule else 0,
+    }
+
+
+def iter_endpoints():
+    """Retourne (nom de route, classe de vue) pour chaque endpoint GET de l'application."""
+    for pattern in vehicules_urls.urlpatterns:
+        view_class = getattr(pattern.callback, 'view_class', None)
+        if view_class is None or not hasattr(view_class, 'get'):
+            continue
+        yield pattern.name, view_class
+
+
+def measure(client, url):
+    """
+    Exécute un GET et retourne (status, nombre de requêtes SQL).
+
+    Le cache des réponses est désactivé : c'est le coût d'une reconstruction
+    qui est mesuré.
+    """
+    with override_settings(VEHICULES_CACHE_TIMEOUT=0), \
+            CaptureQueriesContext(connection) as context:
+        response = client.get(url)
+    return response.status_code, len(context.captured_queries)
+
+
+def check_query_budgets(sizes=(1, 50), stdout=None):
+    """
+    Vérifie le budget de chaque endpoint et retourne la liste des échecs.
+
+    À appeler dans une transaction annulée ensuite : des données de test sont
+    créées en base.
+    """
+    user = User.objects.create_user(username='query-budget', password=None)
+    client = APIClient()
+    # Vraie authentification JWT : l'utilisateur est résolu par le cache de
+    # CachedJWTAuthentication, rempli par cette première requête non mesurée
+    client.credentials(HTTP_AUTHORIZATION=f'Bearer {AccessToken.for_user(user)}')
+    client.get(reverse(f'{vehicules_urls.app_name}:concessionnaire-list'))
+    fixtures = [create_fixtures(size, index) for index, size in enumerate(sizes)]
+
+    failures = []
+    for name, view_class in iter_endpoints():
+        budget = getattr(view_class, 'query_budget', None)
+        if budget is None:
+            failures.append(f'{name} : aucun query_budget déclaré sur {view_class.__name__}')
+            continue
+
+        counts = []
+        for size, kwargs in zip(sizes, fixtures):
+            route_kwargs = {
+                key: value for key, value in kwargs.items()
+                if key in _route_arguments(name)
+            }
+            url = reverse(f'{vehicules_urls.app_name}:{name}', kwargs=route_kwargs)
+            params = getattr(view_class, 'query_budget_params', None)
+            if params:
+                url = f'{url}?{urlencode(params)}'
+            status_code, count = measure(client, url)
+            if status_code != 200:
+                failures.append(f'{name} ({size} véhicules) : statut HTTP {status_code}')
+            counts.append(count)
+
+        if max(counts) > budget:
+            failures.append(f'{name} : {max(counts)} requêtes pour un budget de {budget}')
+        if len(set(counts)) > 1:
+            failures.append(f'{name} : le nombre de requêtes dépend du volume ({counts})')
+        if stdout is not None:
+            stdout.write(f'{name:40} budget={budget} mesuré={counts}')
+
+    return failures
+
+
+def _route_arguments(name):
+    for pattern in vehicules_urls.urlpatterns:
+        if pattern.name == name:
+            return pattern.pattern.converters.keys()
+    return ()
@@ -0,0 +1,67 @@
+"""
+Renderers pour l'API Concessionnaire & Véhicules.
+
+FastJSONRenderer : JSON encodé par le codec configuré (orjson si disponible,
+voir formats.py), même sortie que le JSONRenderer de DRF.
+
+MessagePackRenderer : MessagePack (application/msgpack), choisi par l'en-tête
+Accept ou ``?format=msgpack``.
+
+NDJSONRenderer : un objet JSON par ligne (application/x-ndjson), utilisé par
+le mode streaming des listes (voir streaming.py).
+"""
+
+from rest_framework.renderers import BaseRenderer, JSONRenderer
+
+from . import formats
+
+
+class FastJSONRenderer(JSONRenderer):
+    """JSONRenderer dont l'encodage passe par le codec JSON configuré."""
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        # Sortie indentée (ex. Accept: application/json; indent=4) : rendu de DRF
+        if self.get_indent(accepted_media_type, renderer_context or {}) is not None:
+            return super().render(data, accepted_media_type, renderer_context)
+        try:
+            return formats.get_json_codec().dumps(data)
+        except TypeError:
+            # Valeur refusée par le codec (ex. entier de plus de 64 bits pour
+            # orjson) : encodeur de la bibliothèque standard
+            return super().render(data, accepted_media_type, renderer_context)
+
+
+class MessagePackRenderer(BaseRenderer):
+    """Renderer MessagePack (binaire)."""
+    media_type = 'application/msgpack'
+    format = 'msgpack'
+    charset = None
+    render_style = 'binary'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        return formats.get_msgpack_codec().dumps(data)
+
+
+class NDJSONRenderer(FastJSONRenderer):
+    """
+    Renderer NDJSON (newline-delimited JSON).
+
+    Une liste est rendue avec un élément par ligne ; tout autre payload
+    (ex. une erreur) est rendu sur une seule ligne.
+    """
+    media_type = 'application/x-ndjson'
+    format = 'ndjson'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        if isinstance(data, list):
+            return b''.join(self.render_line(item) for item in data)
+        return self.render_line(data)
+
+    def render_line(self, item):
+        return super().render(item) + b'\n'
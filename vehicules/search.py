@@ -0,0 +1,269 @@
+"""
+Recherche plein texte sur les véhicules (SQLite FTS5).
+
+La table virtuelle ``vehicules_vehicule_fts`` indexe, pour chaque véhicule
+(rowid = id du véhicule), sa marque, sa référence et le nom de son
+concessionnaire. Elle est tenue à jour par des triggers SQLite et non par des
+signaux Django : les écritures en masse (bulk_create, upsert de
+``import_inventory``, QuerySet.update) sont donc couvertes elles aussi.
+
+La table et les triggers sont (ré)installés après chaque ``migrate`` (signal
+post_migrate, voir apps.py) ; la commande ``manage.py rebuild_search_index``
+reconstruit l'index à partir des tables.
+
+Chaque mot de la recherche est cherché comme préfixe (``"peu"*``), tous les
+mots doivent correspondre, et les résultats sont classés par pertinence
+(bm25, la marque pesant plus que le nom du concessionnaire). Pour borner le
+coût des mots très courants, le classement porte sur des paliers : les
+véhicules dont la marque contient tous les mots, puis la référence, puis le
+nom du concessionnaire, puis les autres correspondances ; chaque palier est
+borné à MAX_CANDIDATES lignes. Dans un palier, les documents (quelques mots
+dans la même colonne) ont des scores proches : la borne y coûte peu en
+pertinence, contrairement à une borne sur l'ensemble des correspondances,
+qui retiendrait les premiers ids quelle que soit la colonne. Les index de
+préfixes à 2, 3 et 4 caractères évitent de fusionner les listes de tous les
+mots commençant par le préfixe saisi.
+
+Sur une autre base que SQLite, ou sans table FTS5, la recherche se replie
+sur des filtres ``istartswith`` (sans classement).
+"""
+
+import logging
+import re
+
+from django.db import DatabaseError, connection as default_connection, connections, router
+from django.db.models import Q
+from django.db.models.expressions import RawSQL
+from rest_framework import serializers
+
+from .models import Concessionnaire, Vehicule
+
+logger = logging.getLogger(__name__)
+
+FTS_TABLE = 'vehicules_vehicule_fts'
+# Poids bm25 des colonnes (marque, reference, concessionnaire_nom)
+RANK = 'bm25(4.0, 2.0, 1.0)'
+MAX_TERMS = 8
+# Paliers de search_ids : tous les mots dans une même colonne, par poids bm25
+# décroissant, puis les correspondances réparties entre plusieurs colonnes
+TIER_COLUMNS = ('marque', 'reference', 'concessionnaire_nom')
+# Nombre maximal de correspondances classées par palier (voir search_ids)
+MAX_CANDIDATES = 200
+_TERM_RE = re.compile(r'\w+')
+
+
+class VehiculeSearchSerializer(serializers.Serializer):
+    """Paramètres de GET /api/vehicules/search/."""
+    q = serializers.CharField(
+        max_length=100,
+        help_text='Mots recherchés (préfixes) dans la marque, la référence et le nom du concessionnaire'
+    )
+    limit = serializers.IntegerField(
+        min_value=1,
+        max_value=100,
+        default=20,
+        help_text='Nombre maximal de résultats (défaut : 20)'
+    )
+
+    def validate_q(self, value):
+        terms = split_terms(value)
+        if not terms:
+            raise serializers.ValidationError('Au moins un mot est requis.')
+        return terms
+
+
+def split_terms(value):
+    """Découpe une recherche en mots (au plus MAX_TERMS)."""
+    return _TERM_RE.findall(value)[:MAX_TERMS]
+
+
+def is_enabled(connection=None):
+    """La recherche FTS5 n'est disponible qu'avec SQLite."""
+    return (connection or default_connection).vendor == 'sqlite'
+
+
+def match_expression(terms):
+    """Expression FTS5 : chaque mot comme préfixe, tous requis."""
+    # Les mots sont mis entre guillemets : aucun opérateur FTS5 ne peut être injecté
+    return ' '.join('"{}"*'.format(term.replace('"', '""')) for term in terms)
+
+
+def tier_expressions(terms):
+    """Expressions FTS5 des paliers de search_ids, chacune excluant les précédentes."""
+    expression = match_expression(terms)
+    tiers = [f'({{{column}}} : ({expression}))' for column in TIER_COLUMNS]
+    tiers.append(f'({expression})')
+    return [' NOT '.join([tier, *tiers[:index]]) for index, tier in enumerate(tiers)]
+
+
+def search_ids(terms, limit):
+    """Retourne les ids des véhicules correspondants, du plus pertinent au moins pertinent."""
+    # Un palier par bras du UNION ALL, classé par bm25 parmi au plus
+    # MAX_CANDIDATES correspondances : sans cette borne, un mot très courant
+    # (« peugeot ») ferait classer des centaines de milliers de lignes. SQLite
+    # évalue les bras dans l'ordre et s'arrête dès que LIMIT est atteint : les
+    # paliers suivants ne sont pas lus quand le premier suffit.
+    tiers = tier_expressions(terms)
+    sql = ' UNION ALL '.join(
+        f'SELECT rowid FROM ('
+        f'SELECT rowid FROM ('
+        f'SELECT rowid, rank FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s LIMIT %s'
+        f') ORDER BY rank)'
+        for _ in tiers
+    )
+    params = []
+    for tier in tiers:
+        params += [tier, MAX_CANDIDATES]
+    # Même base que les lectures ORM de Vehicule (réplique éventuelle, voir db_router.py)
+    with connections[router.db_for_read(Vehicule)].cursor() as cursor:
+        cursor.execute(f'{sql} LIMIT %s', params + [limit])
+        return [row[0] for row in cursor.fetchall()]
+
+
+def ranked_ids(terms, limit):
+    """
+    ``search_ids``, ou None si l'index FTS5 est indisponible : autre base que
+    SQLite, ou table absente (``migrate`` non lancé, réplique non
+    synchronisée). L'appelant se replie alors sur ``fallback_queryset``.
+    """
+    if not is_enabled():
+        return None
+    try:
+        return search_ids(terms, limit)
+    except DatabaseError as exc:
+        logger.warning('Recherche plein texte indisponible, repli sans index : %s', exc)
+        return None
+
+
+def matching_ids(terms):
+    """Sous-requête des ids correspondants, sans classement (ex. ``pk__in=``)."""
+    return RawSQL(
+        f'SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s',
+        [match_expression(terms)]
+    )
+
+
+def fallback_queryset(terms):
+    """Recherche sans FTS5 (autres bases) : préfixes sur chaque mot, sans classement."""
+    queryset = Vehicule.objects.all()
+    for term in terms:
+        queryset = queryset.filter(
+            Q(marque__istartswith=term)
+            | Q(reference__istartswith=term)
+            | Q(concessionnaire__nom__istartswith=term)
+        )
+    return queryset
+
+
+def _tables():
+    vehicule = Vehicule._meta
+    return {
+        'fts': FTS_TABLE,
+        'vehicule': vehicule.db_table,
+        'concessionnaire': Concessionnaire._meta.db_table,
+        'concessionnaire_id': vehicule.get_field('concessionnaire').column,
+    }
+
+
+_CREATE_TABLE = """
+CREATE VIRTUAL TABLE {fts} USING fts5(
+    marque, reference, concessionnaire_nom,
+    tokenize = 'unicode61 remove_diacritics 2',
+    prefix = '2 3 4'
+)
+"""
+
+_POPULATE = """
+INSERT INTO {fts} (rowid, marque, reference, concessionnaire_nom)
+SELECT v.id, v.marque, v.reference, c.nom
+FROM {vehicule} v JOIN {concessionnaire} c ON c.id = v.{concessionnaire_id}
+"""
+
+_TRIGGERS = {
+    'vehicules_vehicule_fts_insert': """
+        CREATE TRIGGER vehicules_vehicule_fts_insert AFTER INSERT ON {vehicule} BEGIN
+            INSERT INTO {fts} (rowid, marque, reference, concessionnaire_nom)
+            SELECT new.id, new.marque, new.reference, nom
+            FROM {concessionnaire} WHERE id = new.{concessionnaire_id};
+        END
+    """,
+    'vehicules_vehicule_fts_update': """
+        CREATE TRIGGER vehicules_vehicule_fts_update
+        AFTER UPDATE OF marque, reference, {concessionnaire_id} ON {vehicule} BEGIN
+            DELETE FROM {fts} WHERE rowid = old.id;
+            INSERT INTO {fts} (rowid, marque, reference, concessionnaire_nom)
+            SELECT new.id, new.marque, new.reference, nom
+            FROM {concessionnaire} WHERE id = new.{concessionnaire_id};
+        END
+    """,
+    'vehicules_vehicule_fts_delete': """
+        CREATE TRIGGER vehicules_vehicule_fts_delete AFTER DELETE ON {vehicule} BEGIN
+            DELETE FROM {fts} WHERE rowid = old.id;
+        END
+    """,
+    # Renommage d'un concessionnaire : tous ses véhicules sont réindexés
+    'vehicules_concessionnaire_fts_update': """
+        CREATE TRIGGER vehicules_concessionnaire_fts_update
+        AFTER UPDATE OF nom ON {concessionnaire} BEGIN
+            UPDATE {fts} SET concessionnaire_nom = new.nom
+            WHERE rowid IN (SELECT id FROM {vehicule} WHERE {concessionnaire_id} = new.id);
+        END
+    """,
+}
+
+
+def install(using='default'):
+    """
+    Crée la table FTS5 (remplie à partir des tables existantes) et
+    (re)crée les triggers. Idempotent ; sans effet hors SQLite.
+
+    Les triggers sont recréés à chaque appel : une migration qui reconstruit
+    la table des véhicules (ALTER TABLE sous SQLite) les supprime.
+    """
+    connection = connections[using]
+    if not is_enabled(connection):
+        return False
+    tables = _tables()
+    with connection.cursor() as cursor:
+        existing = connection.introspection.table_names(cursor)
+        if tables['vehicule'] not in existing:
+            return False
+        try:
+            if FTS_TABLE not in existing:
+                cursor.execute(_CREATE_TABLE.format(**tables))
+                cursor.execute(
+                    f"INSERT INTO {FTS_TABLE} ({FTS_TABLE}, rank) VALUES ('rank', %s)",
+                    [RANK]
+                )
+                cursor.execute(_POPULATE.format(**tables))
+        except DatabaseError as exc:
+            # SQLite compilé sans FTS5
+            logger.warning('Recherche plein texte indisponible : %s', exc)
+            return False
+        for name, sql in _TRIGGERS.items():
+            cursor.execute(f'DROP TRIGGER IF EXISTS {name}')
+            cursor.execute(sql.format(**tables))
+    return True
+
+
+def rebuild(using='default'):
+    """
+    Recrée la table (avec la configuration actuelle) et tout l'index à partir
+    des tables ; retourne le nombre de véhicules indexés.
+    """
+    connection = connections[using]
+    if not is_enabled(connection):
+        return 0
+    with connection.cursor() as cursor:
+        cursor.execute(f'DROP TABLE IF EXISTS {FTS_TABLE}')
+    if not install(using):
+        return 0
+    with connection.cursor() as cursor:
+        cursor.execute(f"INSERT INTO {FTS_TABLE} ({FTS_TABLE}) VALUES ('optimize')")
+        cursor.execute(f'SELECT count(*) FROM {FTS_TABLE}')
+        return cursor.fetchone()[0]
+
+
+def install_after_migrate(sender, using='default', **kwargs):
+    """Récepteur post_migrate (voir apps.py)."""
+    install(using)
@@ -0,0 +1,96 @@
+"""
+Génération de données synthétiques (concessionnaires et véhicules).
+
+Les volumes suivent une distribution réaliste et déséquilibrée (loi de Zipf) :
+quelques grands concessionnaires concentrent une grande partie du parc et
+quelques marques dominent. La puissance dépend du type et le prix de la
+puissance. La génération est déterministe pour une même graine.
+
+Les insertions se font par ``bulk_create`` en paquets ; les marqueurs
+d'inventaire, les statistiques et le cache sont mis à jour ensuite en une
+seule fois (``inventaires_modifies_en_masse``). L'index de recherche plein
+texte est tenu à jour par ses triggers.
+
+Utilisé par ``manage.py seed_inventory`` et les benchmarks.
+"""
+
+import random
+
+from django.db import transaction
+
+from . import cache
+from .models import Concessionnaire, Vehicule
+from .signals import inventaires_modifies_en_masse
+
+MARQUES = [
+    'Peugeot', 'Renault', 'Citroën', 'Dacia', 'Volkswagen', 'Audi', 'BMW', 'Mercedes',
+    'Toyota', 'Honda', 'Nissan', 'Mazda', 'Suzuki', 'Kawasaki', 'Yamaha', 'Ducati',
+    'Triumph', 'Harley-Davidson', 'Fiat', 'Alfa Romeo', 'Opel', 'Ford', 'Kia', 'Hyundai',
+    'Skoda', 'Seat', 'Volvo', 'Tesla', 'Porsche', 'Lancia', 'Aprilia', 'KTM',
+]
+VILLES = [
+    'Paris', 'Lyon', 'Marseille', 'Toulouse', 'Nice', 'Nantes', 'Strasbourg', 'Montpellier',
+    'Bordeaux', 'Lille', 'Rennes', 'Reims', 'Grenoble', 'Dijon', 'Angers', 'Brest',
+]
+ENSEIGNES = ['Garage', 'Auto', 'Moto', 'Espace']
+# Préfixe des SIRET générés (les SIRET réels ne commencent pas par 97)
+SIRET_PREFIX = '97'
+# Part des motos dans le parc
+MOTO_RATIO = 0.3
+
+
+def zipf_weights(count, skew):
+    """Poids de rang 1..count selon une loi de Zipf d'exposant ``skew`` (0 : uniforme)."""
+    return [1 / rank ** skew for rank in range(1, count + 1)]
+
+
+def seed_inventory(concessionnaires, vehicules, seed=42, skew=1.1, batch_size=5000):
+    """
+    Crée ``concessionnaires`` concessionnaires et ``vehicules`` véhicules
+    répartis entre eux ; retourne les ids des concessionnaires, par taille
+    d'inventaire attendue décroissante (rang de Zipf).
+    """
+    rng = random.Random(seed)
+    with transaction.atomic():
+        # Les SIRET doivent rester uniques d'un appel à l'autre
+        start = Concessionnaire.objects.filter(siret__startswith=SIRET_PREFIX).count()
+        created = Concessionnaire.objects.bulk_create([
+            Concessionnaire(
+                nom=f'{rng.choice(ENSEIGNES)} {rng.choice(VILLES)} {start + i}',
+                siret=f'{SIRET_PREFIX}{start + i:012d}'
+            )
+            for i in range(concessionnaires)
+        ], batch_size=batch_size)
+        ids = [concessionnaire.pk for concessionnaire in created]
+
+        owners = rng.choices(ids, weights=zipf_weights(len(ids), skew), k=vehicules)
+        marques = rng.choices(MARQUES, weights=zipf_weights(len(MARQUES), skew), k=vehicules)
+        batch = []
+        for i in range(vehicules):
+            type_ = 'moto' if rng.random() < MOTO_RATIO else 'auto'
+            chevaux = _chevaux(rng, type_)
+            batch.append(Vehicule(
+                type=type_,
+                marque=marques[i],
+                chevaux=chevaux,
+                prix_ht=round(chevaux * rng.uniform(80, 220), -1),
+                # Unique par concessionnaire : les concessionnaires sont nouveaux
+                reference=f"{rng.choice('ABCDEFGH')}{rng.choice('JKLMNPRS')}{i}",
+                concessionnaire_id=owners[i]
+            ))
+            if len(batch) == batch_size:
+                Vehicule.objects.bulk_create(batch)
+                batch = []
+        Vehicule.objects.bulk_create(batch)
+
+        # bulk_create n'émet pas de signaux : marqueurs, statistiques et cache
+        inventaires_modifies_en_masse(ids)
+        transaction.on_commit(cache.invalidate_concessionnaires)
+    return ids
+
+
+def _chevaux(rng, type_):
+    # Distributions log-normales : beaucoup de petites cylindrées, quelques sportives
+    if type_ == 'moto':
+        return max(5, min(220, round(rng.lognormvariate(4.0, 0.5))))
+    return max(40, min(800, round(rng.lognormvariate(4.8, 0.4))))
@@ -3,10 +3,11 @@ Serializers pour l'API Concessionnaire & Véhicules.
 
 ConcessionnaireSerializer : expose tous les champs sauf 'siret'
 VehiculeSerializer : expose tous les champs du véhicule
+InventaireStatsSerializer : statistiques d'inventaire d'un concessionnaire
 """
 
 from rest_framework import serializers
-from .models import Concessionnaire, Vehicule
+from .models import Concessionnaire, InventaireStats, Vehicule
 
 
 class ConcessionnaireSerializer(serializers.ModelSerializer):
@@ -74,3 +75,34 @@ class VehiculeDetailSerializer(serializers.ModelSerializer):
         ]
         read_only_fields = ['id', 'concessionnaire_nom']
 
+
+class InventaireStatsSerializer(serializers.ModelSerializer):
+    """
+    Serializer pour les statistiques d'inventaire d'un concessionnaire.
+    
+    Les moyennes sont calculées à partir des totaux de la table de synthèse ;
+    elles valent null (comme les minimums et maximums) sans aucun véhicule.
+    """
+    concessionnaire_nom = serializers.CharField(
+        source='concessionnaire.nom',
+        read_only=True
+    )
+    prix_ht_moyen = serializers.FloatField(read_only=True, allow_null=True)
+    chevaux_moyen = serializers.FloatField(read_only=True, allow_null=True)
+    
+    class Meta:
+        model = InventaireStats
+        fields = [
+            'concessionnaire',
+            'concessionnaire_nom',
+            'nombre',
+            'nombre_autos',
+            'nombre_motos',
+            'prix_ht_moyen',
+            'prix_ht_min',
+            'prix_ht_max',
+            'chevaux_moyen',
+            'chevaux_min',
+            'chevaux_max'
+        ]
+        read_only_fields = fields
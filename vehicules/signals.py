@@ -0,0 +1,158 @@
+"""
+Signaux de l'application vehicules.
+
+Mise à jour des marqueurs d'inventaire des concessionnaires (version et date
+de modification, utilisés pour les ETag / Last-Modified) et des statistiques
+d'inventaire (voir stats.py) à chaque écriture sur un Vehicule.
+
+Invalidation du cache des réponses GET (voir cache.py) à chaque écriture sur
+Concessionnaire ou Vehicule, y compris lors des suppressions en cascade d'un
+concessionnaire (Django émet alors post_delete pour chacun de ses véhicules).
+
+L'invalidation est différée à la validation de la transaction : une requête
+concurrente ne peut pas remettre en cache les anciennes données entre
+l'invalidation et le commit.
+"""
+
+from django.db import transaction
+from django.db.models import F, QuerySet
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+from django.utils import timezone
+
+from . import cache, stats
+from .models import Concessionnaire, InventaireStats, Vehicule
+
+
+@receiver(post_save, sender=Concessionnaire)
+@receiver(post_delete, sender=Concessionnaire)
+def invalidate_concessionnaire_cache(sender, instance, **kwargs):
+    """Liste des concessionnaires, détail du concessionnaire et de ses véhicules."""
+    # Lu immédiatement : Django remet la clé primaire à None après une suppression
+    concessionnaire_id = instance.pk
+
+    def invalidate():
+        cache.invalidate_concessionnaires()
+        cache.invalidate_concessionnaire(concessionnaire_id)
+
+    transaction.on_commit(invalidate)
+
+
+@receiver(post_save, sender=Concessionnaire)
+def create_inventaire_stats(sender, instance, created, raw=False, **kwargs):
+    """Statistiques vides pour un nouveau concessionnaire."""
+    if created and not raw:
+        InventaireStats.objects.get_or_create(concessionnaire=instance)
+
+
+@receiver(pre_save, sender=Vehicule)
+def remember_previous_values(sender, instance, **kwargs):
+    """
+    Mémorise l'état d'origine d'un véhicule modifié : concessionnaire
+    (changement de concessionnaire) et valeurs entrant dans les statistiques.
+    """
+    instance._previous_values = None
+    if instance.pk is None or kwargs.get('raw'):
+        return
+    instance._previous_values = (
+        Vehicule.objects.filter(pk=instance.pk)
+        .values('concessionnaire_id', *stats.TRACKED_FIELDS)
+        .first()
+    )
+
+
+def touch_inventaires(concessionnaire_ids):
+    """Incrémente la version et la date de modification de l'inventaire des concessionnaires."""
+    Concessionnaire.objects.filter(pk__in=concessionnaire_ids).update(
+        inventaire_version=F('inventaire_version') + 1,
+        inventaire_modifie_le=timezone.now()
+    )
+
+
+def inventaires_modifies_en_masse(concessionnaire_ids, vehicules_modifies=False):
+    """
+    À appeler après une écriture en masse sur des véhicules (bulk_create,
+    bulk_update...), qui n'émet aucun signal : met à jour les marqueurs
+    d'inventaire, reconstruit les statistiques des concessionnaires concernés
+    et invalide le cache des listes après le commit.
+
+    ``vehicules_modifies`` : des véhicules existants ont été modifiés ; le
+    cache de leur détail est alors invalidé aussi (via la version du
+    concessionnaire).
+    """
+    concessionnaire_ids = set(concessionnaire_ids)
+    touch_inventaires(concessionnaire_ids)
+    stats.rebuild(concessionnaire_ids)
+
+    def invalidate():
+        for concessionnaire_id in concessionnaire_ids:
+            cache.invalidate_inventaire(concessionnaire_id)
+            if vehicules_modifies:
+                cache.invalidate_concessionnaire(concessionnaire_id)
+
+    transaction.on_commit(invalidate)
+
+
+def _previous_and_current_concessionnaires(instance):
+    previous = getattr(instance, '_previous_values', None)
+    concessionnaire_ids = {
+        instance.concessionnaire_id,
+        previous['concessionnaire_id'] if previous else None,
+    }
+    concessionnaire_ids.discard(None)
+    return concessionnaire_ids
+
+
+def _is_concessionnaire_cascade(origin):
+    """Suppression en cascade d'un concessionnaire : ses marqueurs et statistiques disparaissent avec lui."""
+    return isinstance(origin, Concessionnaire) or (
+        isinstance(origin, QuerySet) and origin.model is Concessionnaire
+    )
+
+
+@receiver(post_save, sender=Vehicule)
+@receiver(post_delete, sender=Vehicule)
+def touch_inventaire(sender, instance, origin=None, **kwargs):
+    """Incrémente la version d'inventaire de l'ancien et du nouveau concessionnaire."""
+    if _is_concessionnaire_cascade(origin):
+        return
+    touch_inventaires(_previous_and_current_concessionnaires(instance))
+
+
+@receiver(post_save, sender=Vehicule)
+def update_stats_on_save(sender, instance, created, raw=False, **kwargs):
+    """Retire l'ancienne valeur du véhicule des statistiques et ajoute la nouvelle."""
+    if raw:
+        return
+    previous = None if created else getattr(instance, '_previous_values', None)
+    added = stats.tracked_values(instance)
+    if previous is None:
+        stats.apply_change(instance.concessionnaire_id, added=added)
+    elif previous['concessionnaire_id'] != instance.concessionnaire_id:
+        stats.apply_change(previous['concessionnaire_id'], removed=previous)
+        stats.apply_change(instance.concessionnaire_id, added=added)
+    elif any(previous[field] != added[field] for field in stats.TRACKED_FIELDS):
+        stats.apply_change(instance.concessionnaire_id, removed=previous, added=added)
+
+
+@receiver(post_delete, sender=Vehicule)
+def update_stats_on_delete(sender, instance, origin=None, **kwargs):
+    """Retire le véhicule supprimé des statistiques."""
+    if _is_concessionnaire_cascade(origin):
+        return
+    stats.apply_change(instance.concessionnaire_id, removed=stats.tracked_values(instance))
+
+
+@receiver(post_save, sender=Vehicule)
+@receiver(post_delete, sender=Vehicule)
+def invalidate_vehicule_cache(sender, instance, **kwargs):
+    """Liste des véhicules et détail du véhicule, chez l'ancien et le nouveau concessionnaire."""
+    concessionnaire_ids = _previous_and_current_concessionnaires(instance)
+    vehicule_id = instance.pk
+
+    def invalidate():
+        for concessionnaire_id in concessionnaire_ids:
+            cache.invalidate_inventaire(concessionnaire_id)
+            cache.invalidate_vehicule(concessionnaire_id, vehicule_id)
+
+    transaction.on_commit(invalidate)
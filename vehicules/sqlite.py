@@ -0,0 +1,77 @@
+"""
+Profil SQLite : pragmas appliqués à chaque nouvelle connexion.
+
+Le profil ``VEHICULES_SQLITE_PROFILE`` est appliqué par un récepteur du
+signal ``connection_created`` (connecté dans apps.py), complété par les
+surcharges de ``VEHICULES_SQLITE_PRAGMAS`` :
+
+- ``'production'`` (défaut) : journal WAL (les lectures ne bloquent plus
+  pendant une écriture, ni l'inverse), ``synchronous=NORMAL`` (sûr en WAL :
+  seule la dernière transaction peut être perdue en cas de coupure
+  d'alimentation, jamais la cohérence de la base), cache de pages de 64 Mio
+  par connexion, lecture des fichiers par mmap (256 Mio) et attente d'un
+  verrou jusqu'à 5 s ;
+- ``'default'`` : aucun pragma (journal de rollback, réglages de SQLite).
+
+Le mode WAL est enregistré dans le fichier de la base : il reste actif pour
+toutes les connexions, même avec le profil ``'default'``. Les connexions en
+lecture seule (``mode=ro``, alias ``readonly`` de settings.py) ne modifient
+pas le mode du journal.
+
+Connexions persistantes (``CONN_MAX_AGE``, ``CONN_HEALTH_CHECKS``) : voir
+settings.py. ``manage.py bench_db_concurrency`` compare les profils sous une
+charge mixte de lectures et d'écritures.
+"""
+
+from django.conf import settings
+
+PROFILES = {
+    'default': {},
+    'production': {
+        # En premier : le passage en WAL attend lui aussi les verrous
+        'busy_timeout': 5000,
+        'journal_mode': 'wal',
+        'synchronous': 'normal',
+        # Valeur négative : taille en Kio (64 Mio)
+        'cache_size': -65536,
+        'mmap_size': 268435456,
+        'temp_store': 'memory',
+    },
+}
+# Pragmas qui modifient le fichier : ignorés sur une connexion en lecture seule
+_WRITE_PRAGMAS = {'journal_mode'}
+
+
+def get_pragmas():
+    """Pragmas du profil configuré, avec les surcharges de VEHICULES_SQLITE_PRAGMAS."""
+    profile = getattr(settings, 'VEHICULES_SQLITE_PROFILE', 'production')
+    return {**PROFILES[profile], **getattr(settings, 'VEHICULES_SQLITE_PRAGMAS', {})}
+
+
+def is_read_only(settings_dict):
+    return 'mode=ro' in str(settings_dict['NAME'])
+
+
+def database_path(settings_dict):
+    """Chemin du fichier de la base, sans le préfixe ``file:`` ni les paramètres d'URI."""
+    name = str(settings_dict['NAME'])
+    if name.startswith('file:'):
+        name = name[len('file:'):].split('?')[0]
+    return name
+
+
+def apply_pragmas(connection, pragmas):
+    read_only = is_read_only(connection.settings_dict)
+    # Connexion sqlite3 sous-jacente : hors journal des requêtes et execute wrappers
+    for name, value in pragmas.items():
+        if not (read_only and name in _WRITE_PRAGMAS):
+            connection.connection.execute(f'PRAGMA {name} = {value}')
+
+
+def configure_connection(sender, connection, **kwargs):
+    """Récepteur de ``connection_created`` : applique le profil aux connexions SQLite."""
+    if connection.vendor != 'sqlite':
+        return
+    pragmas = get_pragmas()
+    if pragmas:
+        apply_pragmas(connection, pragmas)
@@ -0,0 +1,182 @@
+"""
+Benchmark du démarrage à froid : import de wsgi.py / asgi.py et première réponse.
+
+Chaque mesure est faite dans un nouveau processus Python (``python -m
+vehicules.startup wsgi|asgi``), comme le démarrage d'un worker :
+
+- ``import_ms`` : import du module (réglages, applications, django.setup()) ;
+- ``first_response_ms`` : première requête GET /api/concessionnaires/ sans
+  authentification (réponse 401) : chargement de l'URLconf, des vues et des
+  middlewares, sans dépendre du contenu de la base ;
+- ``modules`` : nombre de modules importés après la première réponse.
+
+Le processus vérifie aussi qu'aucun module de ``DEFERRED_MODULES`` n'a été
+importé : la documentation OpenAPI (drf-spectacular, docs.py) n'est chargée
+qu'à la première demande du schéma.
+
+Les médianes de plusieurs processus sont comparées à une référence
+(``benchmarks/startup_baseline.json``), comme pour benchmark.py. Utilisé par
+la commande ``manage.py bench_startup``.
+"""
+
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+ENTRY_POINTS = {
+    'wsgi': 'concessionnaire_api.wsgi',
+    'asgi': 'concessionnaire_api.asgi',
+}
+FIRST_REQUEST_PATH = '/api/concessionnaires/'
+# Modules qui ne doivent pas être importés au démarrage d'un worker
+DEFERRED_MODULES = (
+    'drf_spectacular.utils',
+    'drf_spectacular.openapi',
+    'drf_spectacular.generators',
+    'vehicules.docs',
+)
+METRICS = ('import_ms', 'first_response_ms')
+# En dessous de cet écart (ms), une hausse de la médiane est considérée comme du bruit
+NOISE_FLOOR_MS = 25.0
+
+
+def measure(entry):
+    """Mesure le démarrage de ``entry`` ; à appeler dans un processus neuf."""
+    from importlib import import_module
+
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'concessionnaire_api.settings')
+    start = time.perf_counter()
+    application = import_module(ENTRY_POINTS[entry]).application
+    imported = time.perf_counter()
+    status = _call_wsgi(application) if entry == 'wsgi' else _call_asgi(application)
+    responded = time.perf_counter()
+    return {
+        'import_ms': round((imported - start) * 1000, 1),
+        'first_response_ms': round((responded - imported) * 1000, 1),
+        'status': status,
+        'modules': len(sys.modules),
+        'deferred_loaded': [name for name in DEFERRED_MODULES if name in sys.modules],
+    }
+
+
+def _call_wsgi(application):
+    import io
+
+    statuses = []
+    environ = {
+        'REQUEST_METHOD': 'GET',
+        'PATH_INFO': FIRST_REQUEST_PATH,
+        'QUERY_STRING': '',
+        'SERVER_NAME': 'localhost',
+        'SERVER_PORT': '80',
+        'SERVER_PROTOCOL': 'HTTP/1.1',
+        'HTTP_HOST': 'localhost',
+        'wsgi.url_scheme': 'http',
+        'wsgi.input': io.BytesIO(),
+        'wsgi.errors': sys.stderr,
+    }
+    response = application(environ, lambda status, headers, exc_info=None: statuses.append(status))
+    try:
+        b''.join(response)
+    finally:
+        if hasattr(response, 'close'):
+            response.close()
+    return int(statuses[0].split()[0])
+
+
+def _call_asgi(application):
+    import asyncio
+
+    statuses = []
+    scope = {
+        'type': 'http',
+        'asgi': {'version': '3.0'},
+        'http_version': '1.1',
+        'method': 'GET',
+        'scheme': 'http',
+        'path': FIRST_REQUEST_PATH,
+        'raw_path': FIRST_REQUEST_PATH.encode(),
+        'query_string': b'',
+        'headers': [(b'host', b'localhost')],
+        'server': ('localhost', 80),
+        'client': ('127.0.0.1', 0),
+    }
+
+    async def receive():
+        return {'type': 'http.request', 'body': b'', 'more_body': False}
+
+    async def send(message):
+        if message['type'] == 'http.response.start':
+            statuses.append(message['status'])
+
+    asyncio.run(application(scope, receive, send))
+    return statuses[0]
+
+
+def run(entry, runs, cwd=None):
+    """Lance ``runs`` processus pour ``entry`` ; retourne les médianes et le dernier relevé."""
+    env = dict(os.environ)
+    env.setdefault('DJANGO_SETTINGS_MODULE', 'concessionnaire_api.settings')
+    samples = []
+    for _ in range(runs):
+        completed = subprocess.run(
+            [sys.executable, '-m', __name__, entry],
+            cwd=cwd, env=env, capture_output=True, text=True
+        )
+        if completed.returncode != 0:
+            raise RuntimeError(f'{entry} : échec du démarrage\n{completed.stderr}')
+        samples.append(json.loads(completed.stdout.strip().splitlines()[-1]))
+    last = samples[-1]
+    return {
+        'runs': runs,
+        **{metric: round(statistics.median(sample[metric] for sample in samples), 1) for metric in METRICS},
+        'status': last['status'],
+        'modules': last['modules'],
+        'deferred_loaded': last['deferred_loaded'],
+    }
+
+
+def format_result(name, result):
+    return (
+        f"{name:6} import={result['import_ms']:8.1f} ms  première réponse={result['first_response_ms']:8.1f} ms  "
+        f"statut {result['status']}  {result['modules']} modules"
+    )
+
+
+def check(results):
+    """Modules de DEFERRED_MODULES importés au démarrage, par point d'entrée."""
+    return [
+        f"{name} : modules importés au démarrage : {', '.join(result['deferred_loaded'])}"
+        for name, result in sorted(results.items()) if result['deferred_loaded']
+    ]
+
+
+def compare(results, baseline, tolerance):
+    """
+    Compare les médianes à la référence ; retourne (lignes du rapport, régressions).
+
+    Régression : médiane supérieure de plus de ``tolerance`` (fraction) et de
+    plus de NOISE_FLOOR_MS.
+    """
+    lines, regressions = [], []
+    for name, reference in sorted(baseline['results'].items()):
+        current = results.get(name)
+        if current is None:
+            lines.append(f'{name:6} absent des résultats')
+            continue
+        parts = []
+        for metric in METRICS:
+            before, after = reference[metric], current[metric]
+            delta = (after - before) / before if before else 0
+            parts.append(f'{metric} {before:8.1f} → {after:8.1f} ms ({delta:+.0%})')
+            if delta > tolerance and after - before > NOISE_FLOOR_MS:
+                regressions.append(f'{name} : {metric} de {after:.1f} ms au lieu de {before:.1f} ms')
+        lines.append(f"{name:6} {'  '.join(parts)}  modules {reference['modules']} → {current['modules']}")
+    return lines, regressions
+
+
+if __name__ == '__main__':
+    print(json.dumps(measure(sys.argv[1])))
@@ -0,0 +1,161 @@
+"""
+Statistiques d'inventaire par concessionnaire.
+
+La table InventaireStats est tenue à jour incrémentalement (voir signals.py) :
+chaque création, modification ou suppression de véhicule retire l'ancienne
+valeur et ajoute la nouvelle aux totaux, sans parcourir l'inventaire. Seule
+la suppression d'un véhicule portant le minimum ou le maximum courant
+oblige à relire l'extremum, via les index (concessionnaire, prix_ht) et
+(concessionnaire, chevaux).
+
+Les écritures en masse (bulk_create, import) reconstruisent les statistiques
+des concessionnaires concernés avec ``rebuild``. La commande
+``manage.py rebuild_inventory_stats`` reconstruit et vérifie toute la table.
+"""
+
+import math
+
+from django.db import transaction
+from django.db.models import Count, Max, Min, Q, Sum
+
+from .models import Concessionnaire, InventaireStats, Vehicule
+
+TRACKED_FIELDS = ('type', 'chevaux', 'prix_ht')
+# Statistiques d'un concessionnaire sans véhicule
+EMPTY_STATS = {
+    'nombre': 0, 'nombre_autos': 0, 'nombre_motos': 0,
+    'prix_ht_total': 0, 'prix_ht_min': None, 'prix_ht_max': None,
+    'chevaux_total': 0, 'chevaux_min': None, 'chevaux_max': None,
+}
+STATS_FIELDS = list(EMPTY_STATS)
+
+
+def tracked_values(vehicule):
+    """Valeurs d'un véhicule qui entrent dans les statistiques."""
+    return {field: getattr(vehicule, field) for field in TRACKED_FIELDS}
+
+
+def apply_change(concessionnaire_id, removed=None, added=None):
+    """
+    Retire ``removed`` et ajoute ``added`` (valeurs de ``tracked_values``)
+    aux statistiques du concessionnaire.
+
+    Appelée par les signaux de Vehicule, dans la transaction de l'écriture du
+    véhicule (voir Vehicule.save) : un échec annule aussi cette écriture.
+    """
+    with transaction.atomic():
+        stats = InventaireStats.objects.select_for_update().filter(
+            concessionnaire_id=concessionnaire_id
+        ).first()
+        if stats is None:
+            rebuild([concessionnaire_id])
+            return
+
+        stale_extrema = []
+        if removed is not None:
+            stats.nombre -= 1
+            _count_type(stats, removed['type'], -1)
+            for field in ('prix_ht', 'chevaux'):
+                value = removed[field]
+                setattr(stats, f'{field}_total', getattr(stats, f'{field}_total') - value)
+                if value in (getattr(stats, f'{field}_min'), getattr(stats, f'{field}_max')):
+                    stale_extrema.append(field)
+        if added is not None:
+            stats.nombre += 1
+            _count_type(stats, added['type'], 1)
+            for field in ('prix_ht', 'chevaux'):
+                value = added[field]
+                setattr(stats, f'{field}_total', getattr(stats, f'{field}_total') + value)
+                current_min = getattr(stats, f'{field}_min')
+                current_max = getattr(stats, f'{field}_max')
+                setattr(stats, f'{field}_min', value if current_min is None else min(current_min, value))
+                setattr(stats, f'{field}_max', value if current_max is None else max(current_max, value))
+
+        for field in stale_extrema:
+            # Une requête MIN/MAX par champ : chacune est servie par un index
+            vehicules = Vehicule.objects.filter(concessionnaire_id=concessionnaire_id)
+            setattr(stats, f'{field}_min', vehicules.aggregate(value=Min(field))['value'])
+            setattr(stats, f'{field}_max', vehicules.aggregate(value=Max(field))['value'])
+        if stats.nombre == 0:
+            # Évite de conserver des résidus d'arrondi sur les sommes de flottants
+            stats.prix_ht_total = 0
+            stats.chevaux_total = 0
+
+        stats.save()
+
+
+def compute_live(concessionnaire_ids=None):
+    """Calcule les statistiques à partir des véhicules (GROUP BY), par concessionnaire."""
+    vehicules = Vehicule.objects.all()
+    if concessionnaire_ids is not None:
+        vehicules = vehicules.filter(concessionnaire_id__in=concessionnaire_ids)
+    rows = vehicules.order_by().values('concessionnaire_id').annotate(
+        nombre=Count('id'),
+        nombre_autos=Count('id', filter=Q(type='auto')),
+        nombre_motos=Count('id', filter=Q(type='moto')),
+        prix_ht_total=Sum('prix_ht'),
+        prix_ht_min=Min('prix_ht'),
+        prix_ht_max=Max('prix_ht'),
+        chevaux_total=Sum('chevaux'),
+        chevaux_min=Min('chevaux'),
+        chevaux_max=Max('chevaux'),
+    )
+    return {row.pop('concessionnaire_id'): row for row in rows}
+
+
+def rebuild(concessionnaire_ids=None):
+    """Reconstruit les statistiques (de tous les concessionnaires si None) ; retourne leur nombre."""
+    concessionnaires = Concessionnaire.objects.all()
+    if concessionnaire_ids is not None:
+        concessionnaires = concessionnaires.filter(pk__in=concessionnaire_ids)
+    live = compute_live(concessionnaire_ids)
+    stats = [
+        InventaireStats(concessionnaire_id=concessionnaire_id, **live.get(concessionnaire_id, EMPTY_STATS))
+        for concessionnaire_id in concessionnaires.values_list('pk', flat=True).order_by()
+    ]
+    with transaction.atomic():
+        InventaireStats.objects.bulk_create(
+            stats,
+            batch_size=1000,
+            update_conflicts=True,
+            unique_fields=['concessionnaire'],
+            update_fields=STATS_FIELDS,
+        )
+    return len(stats)
+
+
+def check():
+    """Compare la table aux données réelles ; retourne la liste des écarts."""
+    live = compute_live()
+    stored = {
+        row.pop('concessionnaire_id'): row
+        for row in InventaireStats.objects.values('concessionnaire_id', *STATS_FIELDS)
+    }
+    mismatches = []
+    for concessionnaire_id in Concessionnaire.objects.values_list('pk', flat=True).order_by():
+        expected = live.get(concessionnaire_id, EMPTY_STATS)
+        actual = stored.get(concessionnaire_id)
+        if actual is None:
+            mismatches.append(f'concessionnaire {concessionnaire_id} : statistiques absentes')
+            continue
+        for field in STATS_FIELDS:
+            if not _same(expected[field], actual[field]):
+                mismatches.append(
+                    f'concessionnaire {concessionnaire_id} : {field} = {actual[field]} '
+                    f'(attendu {expected[field]})'
+                )
+    return mismatches
+
+
+def _count_type(stats, type_, delta):
+    if type_ == 'auto':
+        stats.nombre_autos += delta
+    elif type_ == 'moto':
+        stats.nombre_motos += delta
+
+
+def _same(expected, actual):
+    if expected is None or actual is None:
+        return expected is None and actual is None
+    # Les sommes de prix sont des flottants accumulés : tolérance relative
+    return math.isclose(expected, actual, rel_tol=1e-9, abs_tol=1e-6)
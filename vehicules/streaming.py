@@ -0,0 +1,80 @@
+"""
+Mode streaming des listes de l'API Concessionnaire & Véhicules.
+
+Au lieu de construire toute la liste en mémoire (``serializer.data``) avant
+le rendu, les lignes sont lues par paquets avec ``QuerySet.iterator()``,
+sérialisées avec un ValuesSerializer puis envoyées au fur et à mesure via
+une StreamingHttpResponse : la mémoire consommée par un worker ne dépend plus
+de la taille de l'inventaire.
+
+Le mode est activé par ``?stream=1`` (tableau JSON complet, non paginé) ou
+par l'en-tête ``Accept: application/x-ndjson`` (un objet JSON par ligne).
+"""
+
+from django.conf import settings
+from django.http import StreamingHttpResponse
+
+from .renderers import FastJSONRenderer, NDJSONRenderer
+
+STREAM_QUERY_PARAM = 'stream'
+
+
+def get_chunk_size():
+    """Nombre de lignes lues en base (et encodées) par paquet."""
+    return getattr(settings, 'VEHICULES_STREAM_CHUNK_SIZE', 2000)
+
+
+def is_streaming_requested(request):
+    """Le client a-t-il demandé le mode streaming (paramètre ou en-tête Accept) ?"""
+    if request.query_params.get(STREAM_QUERY_PARAM) in ('1', 'true'):
+        return True
+    return isinstance(getattr(request, 'accepted_renderer', None), NDJSONRenderer)
+
+
+def streaming_response(request, values_serializer_class, queryset, fields=None):
+    """
+    Retourne une StreamingHttpResponse sur ``queryset``.
+
+    ``queryset`` doit être trié ; les colonnes lues sont celles du plan du
+    ``values_serializer_class`` (le champ 'siret' n'est donc jamais lu),
+    restreint à ``fields`` le cas échéant.
+    """
+    plan = values_serializer_class.get_plan(fields)
+    rows = plan.values(queryset).iterator(chunk_size=get_chunk_size())
+    if isinstance(getattr(request, 'accepted_renderer', None), NDJSONRenderer):
+        content, content_type = _ndjson_chunks(plan, rows), NDJSONRenderer.media_type
+    else:
+        content, content_type = _json_array_chunks(plan, rows), FastJSONRenderer.media_type
+    response = StreamingHttpResponse(content, content_type=content_type)
+    response['Vary'] = 'Accept'
+    return response
+
+
+def _chunks(plan, rows):
+    chunk_size = get_chunk_size()
+    chunk = []
+    for row in rows:
+        chunk.append(plan.to_representation(row))
+        if len(chunk) >= chunk_size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def _json_array_chunks(plan, rows):
+    # Un paquet est rendu comme une liste JSON dont on retire les crochets :
+    # un seul appel à l'encodeur par paquet, même format que FastJSONRenderer.
+    renderer = FastJSONRenderer()
+    yield b'['
+    separator = b''
+    for chunk in _chunks(plan, rows):
+        yield separator + renderer.render(chunk)[1:-1]
+        separator = b','
+    yield b']'
+
+
+def _ndjson_chunks(plan, rows):
+    renderer = NDJSONRenderer()
+    for chunk in _chunks(plan, rows):
+        yield renderer.render(chunk)
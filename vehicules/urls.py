@@ -8,8 +8,13 @@ from django.urls import path
 from .views import (
     ConcessionnaireListView,
     ConcessionnaireDetailView,
+    ConcessionnaireStatsListView,
+    ConcessionnaireStatsView,
     ConcessionnaireVehiculesListView,
+    ConcessionnaireVehiculesBulkView,
     ConcessionnaireVehiculeDetailView,
+    VehiculeBatchView,
+    VehiculeSearchView,
 )
 
 app_name = 'vehicules'
@@ -19,16 +24,30 @@ urlpatterns = [
     path('concessionnaires/', ConcessionnaireListView.as_view(), name='concessionnaire-list'),
     path('concessionnaires/<int:id>/', ConcessionnaireDetailView.as_view(), name='concessionnaire-detail'),
     
+    # Statistiques d'inventaire
+    path('concessionnaires/stats/', ConcessionnaireStatsListView.as_view(), name='concessionnaire-stats-list'),
+    path('concessionnaires/<int:id>/stats/', ConcessionnaireStatsView.as_view(), name='concessionnaire-stats'),
+    
     # Endpoints pour les véhicules d'un concessionnaire
     path(
         'concessionnaires/<int:id>/vehicules/',
         ConcessionnaireVehiculesListView.as_view(),
         name='concessionnaire-vehicules-list'
     ),
+    path(
+        'concessionnaires/<int:id>/vehicules/bulk/',
+        ConcessionnaireVehiculesBulkView.as_view(),
+        name='concessionnaire-vehicules-bulk'
+    ),
     path(
         'concessionnaires/<int:id>/vehicules/<int:vehicule_id>/',
         ConcessionnaireVehiculeDetailView.as_view(),
         name='concessionnaire-vehicule-detail'
     ),
+    
+    # Recherche plein texte parmi tous les véhicules
+    path('vehicules/search/', VehiculeSearchView.as_view(), name='vehicule-search'),
+    
+    # Lecture groupée de véhicules par identifiants
+    path('vehicules/', VehiculeBatchView.as_view(), name='vehicule-batch'),
 ]
-
@@ -1,17 +1,19 @@
 """
-Vues pour la gestion des utilisateurs (création).
+Vues pour la gestion des utilisateurs (création, déconnexion).
 
 Endpoint bonus : POST /api/users/ pour créer un nouvel utilisateur.
+POST /api/token/revoke/ pour révoquer un token de rafraîchissement.
 """
 
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import status
 from rest_framework.permissions import AllowAny
-from drf_spectacular.utils import extend_schema, OpenApiExample
-from drf_spectacular.types import OpenApiTypes
 from django.contrib.auth.models import User
 from django.contrib.auth.hashers import make_password
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from . import blacklist
+from .hashing import HashingUnavailable
 
 
 class UserCreateView(APIView):
@@ -23,80 +25,6 @@ class UserCreateView(APIView):
     """
     permission_classes = [AllowAny]
     
-    @extend_schema(
-        tags=['Authentification'],
-        summary='Créer un nouvel utilisateur',
-        description='Crée un nouveau compte utilisateur. Cet endpoint est public et ne nécessite pas d\'authentification.',
-        request={
-            'application/json': {
-                'type': 'object',
-                'properties': {
-                    'username': {
-                        'type': 'string',
-                        'description': 'Nom d\'utilisateur unique',
-                        'example': 'john_doe'
-                    },
-                    'email': {
-                        'type': 'string',
-                        'format': 'email',
-                        'description': 'Adresse email',
-                        'example': 'john@example.com'
-                    },
-                    'password': {
-                        'type': 'string',
-                        'format': 'password',
-                        'description': 'Mot de passe',
-                        'example': 'motdepasse123'
-                    }
-                },
-                'required': ['username', 'email', 'password']
-            }
-        },
-        responses={
-            201: {
-                'description': 'Utilisateur créé avec succès',
-                'content': {
-                    'application/json': {
-                        'example': {
-                            'message': 'Utilisateur créé avec succès.',
-                            'username': 'john_doe',
-                            'email': 'john@example.com'
-                        }
-                    }
-                }
-            },
-            400: {
-                'description': 'Erreur de validation',
-                'content': {
-                    'application/json': {
-                        'example': {
-                            'error': 'Les champs username, email et password sont requis.'
-                        }
-                    }
-                }
-            }
-        },
-        examples=[
-            OpenApiExample(
-                'Requête valide',
-                value={
-                    'username': 'john_doe',
-                    'email': 'john@example.com',
-                    'password': 'motdepasse123'
-                },
-                request_only=True,
-            ),
-            OpenApiExample(
-                'Réponse succès',
-                value={
-                    'message': 'Utilisateur créé avec succès.',
-                    'username': 'john_doe',
-                    'email': 'john@example.com'
-                },
-                response_only=True,
-            ),
-        ],
-    )
     def post(self, request):
         """
         Crée un nouvel utilisateur.
@@ -136,9 +64,32 @@ class UserCreateView(APIView):
                 },
                 status=status.HTTP_201_CREATED
             )
+        except HashingUnavailable:
+            # 503 : pool de hachage saturé (voir hashing.py)
+            raise
         except Exception as e:
             return Response(
                 {'error': f'Erreur lors de la création de l\'utilisateur: {str(e)}'},
                 status=status.HTTP_400_BAD_REQUEST
             )
 
+
+class TokenRevokeView(APIView):
+    """
+    Vue pour révoquer un token de rafraîchissement (déconnexion).
+    
+    POST /api/token/revoke/
+    Endpoint public : la possession du token de rafraîchissement suffit. Si
+    la requête est authentifiée par un token d'accès, celui-ci est révoqué
+    aussi (pris en compte si VEHICULES_BLACKLIST_CHECK_ACCESS est activé).
+    """
+    permission_classes = [AllowAny]
+    
+    def post(self, request):
+        """Révoque le token de rafraîchissement fourni."""
+        serializer = blacklist.TokenRevokeSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        blacklist.revoke(serializer.validated_data['token'])
+        if isinstance(request.successful_authenticator, JWTAuthentication):
+            blacklist.revoke(request.auth)
+        return Response(status=status.HTTP_204_NO_CONTENT)
@@ -3,21 +3,43 @@ Views API pour l'API Concessionnaire & Véhicules.
 
 Utilisation d'APIView (pas de ViewSet) comme demandé.
 Tous les endpoints sont protégés par authentification JWT.
+Les GET renvoient ETag et Last-Modified et répondent 304 aux requêtes
+conditionnelles lorsque rien n'a changé (voir conditional.py).
+La documentation OpenAPI des vues est déclarée dans docs.py.
 """
 
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import status
-from rest_framework.permissions import IsAuthenticated
+from rest_framework.permissions import DjangoModelPermissions, IsAdminUser, IsAuthenticated
+from rest_framework.settings import api_settings
 from django.shortcuts import get_object_or_404
-from drf_spectacular.utils import extend_schema, OpenApiParameter, OpenApiExample
-from drf_spectacular.types import OpenApiTypes
-from .models import Concessionnaire, Vehicule
-from .serializers import (
-    ConcessionnaireSerializer,
-    VehiculeSerializer,
-    VehiculeDetailSerializer
+from django.utils.decorators import method_decorator
+from . import cache as response_cache
+from . import multiget
+from . import profiling
+from . import search
+from . import stats as inventaire_stats
+from .bulk import VehiculeBulkValidator, bulk_create_vehicules, get_batch_size, get_max_items
+from .conditional import (
+    concessionnaires_condition,
+    concessionnaire_condition,
+    inventaire_condition,
+    vehicule_condition
 )
+from .models import Concessionnaire, InventaireStats, Vehicule
+from .filters import VehiculeFilterSerializer
+from .fast_serializers import (
+    ConcessionnaireValuesSerializer,
+    VehiculeValuesSerializer,
+    VehiculeDetailValuesSerializer,
+    requested_fields
+)
+from .pagination import KeysetCursorPagination
+from .renderers import NDJSONRenderer
+from .search import VehiculeSearchSerializer
+from .serializers import InventaireStatsSerializer
+from .streaming import is_streaming_requested, streaming_response
 
 
 class ConcessionnaireListView(APIView):
@@ -25,39 +47,40 @@ class ConcessionnaireListView(APIView):
     Vue pour lister tous les concessionnaires.
     
     GET /api/concessionnaires/
+    Résultats paginés par curseur (tri : nom, id), ou liste complète en
+    streaming avec ?stream=1 ou Accept: application/x-ndjson.
     """
     permission_classes = [IsAuthenticated]
+    pagination_class = KeysetCursorPagination
+    renderer_classes = api_settings.DEFAULT_RENDERER_CLASSES + [NDJSONRenderer]
+    query_budget = 2
     
-    @extend_schema(
-        tags=['Concessionnaires'],
-        summary='Liste tous les concessionnaires',
-        description='Retourne la liste complète de tous les concessionnaires enregistrés.',
-        responses={
-            200: ConcessionnaireSerializer(many=True),
-            401: {'description': 'Non authentifié - Token JWT requis'},
-        },
-        examples=[
-            OpenApiExample(
-                'Exemple de réponse',
-                value=[
-                    {
-                        'id': 1,
-                        'nom': 'AutoPlus Paris'
-                    },
-                    {
-                        'id': 2,
-                        'nom': 'MotoCenter Lyon'
-                    }
-                ],
-                response_only=True,
-            ),
-        ],
-    )
+    @method_decorator(concessionnaires_condition)
     def get(self, request):
         """Retourne la liste de tous les concessionnaires."""
-        concessionnaires = Concessionnaire.objects.all()
-        serializer = ConcessionnaireSerializer(concessionnaires, many=True)
-        return Response(serializer.data, status=status.HTTP_200_OK)
+        if is_streaming_requested(request):
+            concessionnaires = Concessionnaire.objects.all()
+            ordering = self.pagination_class().get_ordering(request, concessionnaires, self)
+            return streaming_response(
+                request,
+                ConcessionnaireValuesSerializer,
+                concessionnaires.order_by(*ordering)
+            )
+        data = response_cache.get_or_build(
+            response_cache.concessionnaires_list_key(request),
+            lambda: self.get_payload(request)
+        )
+        return Response(data, status=status.HTTP_200_OK)
+
+    def get_payload(self, request):
+        """Construit la page demandée (appelé uniquement si absente du cache)."""
+        concessionnaires = ConcessionnaireValuesSerializer.values(
+            Concessionnaire.objects.all()
+        )
+        paginator = self.pagination_class()
+        page = paginator.paginate_queryset(concessionnaires, request, view=self)
+        serializer = ConcessionnaireValuesSerializer(page, many=True)
+        return paginator.get_paginated_response(serializer.data).data
 
 
 class ConcessionnaireDetailView(APIView):
@@ -67,41 +90,84 @@ class ConcessionnaireDetailView(APIView):
     GET /api/concessionnaires/<id>/
     """
     permission_classes = [IsAuthenticated]
+    query_budget = 2
     
-    @extend_schema(
-        tags=['Concessionnaires'],
-        summary='Détails d\'un concessionnaire',
-        description='Retourne les informations détaillées d\'un concessionnaire spécifique.',
-        parameters=[
-            OpenApiParameter(
-                name='id',
-                type=OpenApiTypes.INT,
-                location=OpenApiParameter.PATH,
-                description='ID du concessionnaire',
-                required=True,
-            ),
-        ],
-        responses={
-            200: ConcessionnaireSerializer,
-            401: {'description': 'Non authentifié - Token JWT requis'},
-            404: {'description': 'Concessionnaire non trouvé'},
-        },
-        examples=[
-            OpenApiExample(
-                'Exemple de réponse',
-                value={
-                    'id': 1,
-                    'nom': 'AutoPlus Paris'
-                },
-                response_only=True,
-            ),
-        ],
-    )
+    @method_decorator(concessionnaire_condition)
     def get(self, request, id):
         """Retourne les détails d'un concessionnaire spécifique."""
-        concessionnaire = get_object_or_404(Concessionnaire, pk=id)
-        serializer = ConcessionnaireSerializer(concessionnaire)
-        return Response(serializer.data, status=status.HTTP_200_OK)
+        data = response_cache.get_or_build(
+            response_cache.concessionnaire_detail_key(id),
+            lambda: self.get_payload(id)
+        )
+        return Response(data, status=status.HTTP_200_OK)
+
+    def get_payload(self, id):
+        """Construit le détail (appelé uniquement s'il est absent du cache)."""
+        concessionnaire = get_object_or_404(
+            ConcessionnaireValuesSerializer.values(Concessionnaire.objects.all()),
+            pk=id
+        )
+        return ConcessionnaireValuesSerializer(concessionnaire).data
+
+
+class ConcessionnaireStatsListView(APIView):
+    """
+    Vue pour lister les statistiques d'inventaire de tous les concessionnaires.
+    
+    GET /api/concessionnaires/stats/
+    Lues dans la table de synthèse InventaireStats (voir stats.py), sans
+    parcourir les véhicules ; paginées par curseur (tri : id du concessionnaire).
+    """
+    permission_classes = [IsAuthenticated]
+    pagination_class = KeysetCursorPagination
+    ordering = ('pk',)
+    query_budget = 1
+    
+    def get(self, request):
+        """Retourne les statistiques d'inventaire de tous les concessionnaires."""
+        paginator = self.pagination_class()
+        page = paginator.paginate_queryset(
+            InventaireStats.objects.select_related('concessionnaire'),
+            request,
+            view=self
+        )
+        serializer = InventaireStatsSerializer(page, many=True)
+        return paginator.get_paginated_response(serializer.data)
+
+
+class ConcessionnaireStatsView(APIView):
+    """
+    Vue pour obtenir les statistiques d'inventaire d'un concessionnaire.
+    
+    GET /api/concessionnaires/<id>/stats/
+    Lues dans la table de synthèse InventaireStats (voir stats.py), sans
+    parcourir les véhicules. La ligne est créée avec le concessionnaire
+    (signal post_save) ; un GET n'écrit jamais.
+    """
+    permission_classes = [IsAuthenticated]
+    query_budget = 2
+    
+    @method_decorator(inventaire_condition)
+    def get(self, request, id):
+        """Retourne les statistiques d'inventaire d'un concessionnaire."""
+        data = response_cache.get_or_build(
+            response_cache.concessionnaire_stats_key(id),
+            lambda: self.get_payload(id)
+        )
+        return Response(data, status=status.HTTP_200_OK)
+
+    def get_payload(self, id):
+        """Construit les statistiques (appelé uniquement si absentes du cache)."""
+        queryset = InventaireStats.objects.select_related('concessionnaire')
+        statistiques = queryset.filter(pk=id).first()
+        if statistiques is None:
+            # Concessionnaire créé sans signal (fixtures, bulk_create, import SQL) :
+            # statistiques vides jusqu'à manage.py rebuild_inventory_stats
+            statistiques = InventaireStats(
+                concessionnaire=get_object_or_404(Concessionnaire, pk=id),
+                **inventaire_stats.EMPTY_STATS
+            )
+        return InventaireStatsSerializer(statistiques).data
 
 
 class ConcessionnaireVehiculesListView(APIView):
@@ -109,64 +175,60 @@ class ConcessionnaireVehiculesListView(APIView):
     Vue pour lister tous les véhicules d'un concessionnaire.
     
     GET /api/concessionnaires/<id>/vehicules/
+    Résultats filtrables (voir filters.py) et paginés par curseur (tri par
+    défaut : marque, type, id), ou liste complète en streaming avec ?stream=1
+    ou Accept: application/x-ndjson.
     """
     permission_classes = [IsAuthenticated]
+    pagination_class = KeysetCursorPagination
+    renderer_classes = api_settings.DEFAULT_RENDERER_CLASSES + [NDJSONRenderer]
+    query_budget = 3
     
-    @extend_schema(
-        tags=['Véhicules'],
-        summary='Liste des véhicules d\'un concessionnaire',
-        description='Retourne la liste complète de tous les véhicules appartenant à un concessionnaire spécifique.',
-        parameters=[
-            OpenApiParameter(
-                name='id',
-                type=OpenApiTypes.INT,
-                location=OpenApiParameter.PATH,
-                description='ID du concessionnaire',
-                required=True,
-            ),
-        ],
-        responses={
-            200: VehiculeSerializer(many=True),
-            401: {'description': 'Non authentifié - Token JWT requis'},
-            404: {'description': 'Concessionnaire non trouvé'},
-        },
-        examples=[
-            OpenApiExample(
-                'Exemple de réponse',
-                value=[
-                    {
-                        'id': 1,
-                        'type': 'auto',
-                        'marque': 'Peugeot',
-                        'chevaux': 120,
-                        'prix_ht': 25000.0,
-                        'concessionnaire': 1,
-                        'concessionnaire_nom': 'AutoPlus Paris'
-                    },
-                    {
-                        'id': 2,
-                        'type': 'moto',
-                        'marque': 'Yamaha',
-                        'chevaux': 80,
-                        'prix_ht': 12000.0,
-                        'concessionnaire': 1,
-                        'concessionnaire_nom': 'AutoPlus Paris'
-                    }
-                ],
-                response_only=True,
-            ),
-        ],
-    )
+    @method_decorator(inventaire_condition)
     def get(self, request, id):
         """
         Retourne la liste de tous les véhicules d'un concessionnaire spécifique.
         """
+        filters = VehiculeFilterSerializer(data=request.query_params)
+        filters.is_valid(raise_exception=True)
+        # Lu par la pagination (et le streaming) ; None : tri par défaut du modèle
+        self.ordering = filters.get_ordering()
+        fields = requested_fields(request, VehiculeValuesSerializer)
+
+        if is_streaming_requested(request):
+            concessionnaire = get_object_or_404(Concessionnaire, pk=id)
+            vehicules = filters.filter_queryset(
+                Vehicule.objects.filter(concessionnaire=concessionnaire)
+            )
+            ordering = self.pagination_class().get_ordering(request, vehicules, self)
+            return streaming_response(
+                request,
+                VehiculeValuesSerializer,
+                vehicules.order_by(*ordering),
+                fields
+            )
+        data = response_cache.get_or_build(
+            response_cache.vehicules_list_key(request, id),
+            lambda: self.get_payload(request, id, filters, fields)
+        )
+        return Response(data, status=status.HTTP_200_OK)
+
+    def get_payload(self, request, id, filters, fields=None):
+        """Construit la page demandée (appelé uniquement si absente du cache)."""
         # Vérifier que le concessionnaire existe
         concessionnaire = get_object_or_404(Concessionnaire, pk=id)
-        # Récupérer tous les véhicules de ce concessionnaire
-        vehicules = Vehicule.objects.filter(concessionnaire=concessionnaire)
-        serializer = VehiculeSerializer(vehicules, many=True)
-        return Response(serializer.data, status=status.HTTP_200_OK)
+        # Véhicules filtrés de ce concessionnaire (jointure pour concessionnaire_nom,
+        # s'il est demandé) ; les champs de tri sont lus pour le curseur
+        queryset = filters.filter_queryset(Vehicule.objects.filter(concessionnaire=concessionnaire))
+        paginator = self.pagination_class()
+        vehicules = VehiculeValuesSerializer.values(
+            queryset,
+            extra=paginator.get_ordering_fields(request, queryset, self),
+            fields=fields
+        )
+        page = paginator.paginate_queryset(vehicules, request, view=self)
+        serializer = VehiculeValuesSerializer(page, many=True, fields=fields)
+        return paginator.get_paginated_response(serializer.data).data
 
 
 class ConcessionnaireVehiculeDetailView(APIView):
@@ -176,61 +238,178 @@ class ConcessionnaireVehiculeDetailView(APIView):
     GET /api/concessionnaires/<id>/vehicules/<vehicule_id>/
     """
     permission_classes = [IsAuthenticated]
+    query_budget = 2
     
-    @extend_schema(
-        tags=['Véhicules'],
-        summary='Détails d\'un véhicule',
-        description='Retourne les informations détaillées d\'un véhicule spécifique appartenant à un concessionnaire.',
-        parameters=[
-            OpenApiParameter(
-                name='id',
-                type=OpenApiTypes.INT,
-                location=OpenApiParameter.PATH,
-                description='ID du concessionnaire',
-                required=True,
-            ),
-            OpenApiParameter(
-                name='vehicule_id',
-                type=OpenApiTypes.INT,
-                location=OpenApiParameter.PATH,
-                description='ID du véhicule',
-                required=True,
-            ),
-        ],
-        responses={
-            200: VehiculeDetailSerializer,
-            401: {'description': 'Non authentifié - Token JWT requis'},
-            404: {'description': 'Concessionnaire ou véhicule non trouvé'},
-        },
-        examples=[
-            OpenApiExample(
-                'Exemple de réponse',
-                value={
-                    'id': 1,
-                    'type': 'auto',
-                    'marque': 'Peugeot',
-                    'chevaux': 120,
-                    'prix_ht': 25000.0,
-                    'concessionnaire': 1,
-                    'concessionnaire_nom': 'AutoPlus Paris'
-                },
-                response_only=True,
-            ),
-        ],
-    )
+    @method_decorator(vehicule_condition)
     def get(self, request, id, vehicule_id):
         """
         Retourne les détails d'un véhicule spécifique d'un concessionnaire.
         Vérifie que le véhicule appartient bien au concessionnaire.
         """
-        # Vérifier que le concessionnaire existe
-        concessionnaire = get_object_or_404(Concessionnaire, pk=id)
-        # Vérifier que le véhicule existe et appartient au concessionnaire
+        fields = requested_fields(request, VehiculeDetailValuesSerializer)
+        if fields is not None and not response_cache.get_timeout():
+            return Response(self.get_payload(id, vehicule_id, fields), status=status.HTTP_200_OK)
+        # Le détail complet est mis en cache (une seule clé à invalider, voir
+        # cache.py) puis réduit aux champs demandés
+        data = response_cache.get_or_build(
+            response_cache.vehicule_detail_key(id, vehicule_id),
+            lambda: self.get_payload(id, vehicule_id)
+        )
+        if fields is not None:
+            data = {key: value for key, value in data.items() if key in fields}
+        return Response(data, status=status.HTTP_200_OK)
+
+    def get_payload(self, id, vehicule_id, fields=None):
+        """Construit le détail (appelé uniquement s'il est absent du cache)."""
+        # Une seule requête : le véhicule doit exister et appartenir au concessionnaire
         vehicule = get_object_or_404(
-            Vehicule,
+            VehiculeDetailValuesSerializer.values(Vehicule.objects.all(), fields=fields),
             pk=vehicule_id,
-            concessionnaire=concessionnaire
+            concessionnaire_id=id
         )
-        serializer = VehiculeDetailSerializer(vehicule)
-        return Response(serializer.data, status=status.HTTP_200_OK)
+        return VehiculeDetailValuesSerializer(vehicule, fields=fields).data
+
+
+class ConcessionnaireVehiculesBulkView(APIView):
+    """
+    Vue pour créer des véhicules en masse chez un concessionnaire.
 
+    POST /api/concessionnaires/<id>/vehicules/bulk/
+    Requiert la permission vehicules.add_vehicule.
+    """
+    permission_classes = [IsAuthenticated, DjangoModelPermissions]
+    # Utilisé par DjangoModelPermissions pour déterminer le modèle
+    queryset = Vehicule.objects.none()
+    validator = VehiculeBulkValidator()
+
+    def post(self, request, id):
+        """
+        Valide puis crée les véhicules reçus pour le concessionnaire.
+        """
+        concessionnaire = get_object_or_404(Concessionnaire, pk=id)
+
+        items = request.data
+        if not isinstance(items, list):
+            return Response(
+                {'error': 'Le corps de la requête doit être une liste de véhicules.'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        if len(items) > get_max_items():
+            return Response(
+                {'error': f'Au plus {get_max_items()} véhicules par appel.'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        try:
+            batch_size = int(request.query_params.get('batch_size', get_batch_size()))
+        except ValueError:
+            batch_size = 0
+        if batch_size < 1:
+            return Response(
+                {'error': 'batch_size doit être un entier strictement positif.'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        valid, errors = self.validator.validate(items)
+        partial = request.query_params.get('partial') in ('1', 'true')
+        if errors and not partial:
+            return Response(
+                {'created': 0, 'errors': errors},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        created = bulk_create_vehicules(
+            concessionnaire,
+            [data for _, data in valid],
+            batch_size=batch_size
+        )
+        return Response(
+            {'created': len(created), 'errors': errors},
+            status=status.HTTP_201_CREATED
+        )
+
+
+class VehiculeSearchView(APIView):
+    """
+    Vue de recherche plein texte parmi les véhicules de tous les concessionnaires.
+    
+    GET /api/vehicules/search/?q=<mots>
+    Recherche par préfixes dans la marque, la référence et le nom du
+    concessionnaire, servie par l'index FTS5 (voir search.py) ; résultats
+    classés par pertinence.
+    """
+    permission_classes = [IsAuthenticated]
+    query_budget = 2
+    # Paramètres utilisés par manage.py check_query_budgets
+    query_budget_params = {'q': 'marq'}
+    
+    def get(self, request):
+        """Retourne les véhicules correspondant à la recherche, les plus pertinents en premier."""
+        params = VehiculeSearchSerializer(data=request.query_params)
+        params.is_valid(raise_exception=True)
+        terms, limit = params.validated_data['q'], params.validated_data['limit']
+        fields = requested_fields(request, VehiculeValuesSerializer)
+
+        ids = search.ranked_ids(terms, limit)
+        if ids is not None:
+            rows = VehiculeValuesSerializer.values(
+                Vehicule.objects.filter(pk__in=ids), extra=('id',), fields=fields
+            )
+            by_id = {row['id']: row for row in rows}
+            results = [by_id[pk] for pk in ids if pk in by_id]
+        else:
+            results = VehiculeValuesSerializer.values(
+                search.fallback_queryset(terms).order_by('marque', 'type', 'id')[:limit],
+                fields=fields
+            )
+        serializer = VehiculeValuesSerializer(results, many=True, fields=fields)
+        return Response({'results': serializer.data}, status=status.HTTP_200_OK)
+
+
+class VehiculeBatchView(APIView):
+    """
+    Vue de lecture groupée de véhicules par identifiants.
+
+    GET /api/vehicules/?ids=1,2,3[&concessionnaire=<id>]
+    POST /api/vehicules/ avec {"ids": [...], "concessionnaire": <id>}
+    (listes longues, qui dépasseraient la taille maximale d'une URL).
+    Une seule requête SQL quel que soit le nombre d'ids (voir multiget.py) ;
+    résultats dans l'ordre demandé, null et ``missing`` pour les ids inconnus.
+    """
+    permission_classes = [IsAuthenticated]
+    query_budget = 1
+    # Paramètres utilisés par manage.py check_query_budgets
+    query_budget_params = {'ids': ','.join(str(pk) for pk in range(1, 101))}
+
+    def get(self, request):
+        """Retourne les véhicules des ids passés dans la query string."""
+        return self.resolve(request, request.query_params)
+
+    def post(self, request):
+        """Retourne les véhicules des ids passés dans le corps de la requête."""
+        return self.resolve(request, request.data)
+
+    def resolve(self, request, data):
+        params = multiget.VehiculeBatchSerializer(data=data)
+        params.is_valid(raise_exception=True)
+        results, missing = multiget.resolve(
+            params.validated_data['ids'],
+            params.validated_data.get('concessionnaire'),
+            fields=requested_fields(request, VehiculeDetailValuesSerializer)
+        )
+        return Response({'results': results, 'missing': missing}, status=status.HTTP_200_OK)
+
+
+class SlowRequestsView(APIView):
+    """
+    Requêtes lentes récentes de ce processus (staff uniquement).
+
+    GET /api/profiling/slow-requests/
+    """
+    permission_classes = [IsAdminUser]
+
+    def get(self, request):
+        return Response({
+            'enabled': profiling.is_enabled(),
+            'threshold_ms': profiling.get_slow_threshold(),
+            'results': profiling.slow_requests.entries(),
+        })